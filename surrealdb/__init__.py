@@ -3,26 +3,107 @@
 
 Exports:
     SurrealDB: The SurrealDB client class to query a SurrealDB database.
+    AsyncSurrealDB: The asynchronous version of the SurrealDB client class.
     Reference: Used to reference a SurrealDB row of a table.
     SurrealQueryError: The error class raised for query errors.
     SurrealAuthenticationError: The error class raised for authentication errors.
+    DeadlineExceeded: The error class raised when a timeout or deadline passes.
+    deadline: Context manager bounding every query made inside it.
+    Session: Unit of work tracking changes to records loaded with SurrealDB.
+    AsyncSession: Unit of work tracking changes to records for AsyncSurrealDB.
+    SlowQueryLog: Records slow queries and latency per statement fingerprint.
+    Mirror: Keeps a small table in memory, in sync through its change feed.
+    AsyncMirror: The asynchronous version of Mirror.
+    HedgePolicy: Sends slow reads again to another node of a cluster.
+    AdaptiveLimiter: Adapts the concurrency of AsyncSurrealDB to the server.
+    Overloaded: The error class raised when too many requests are queued.
+    ChunkResult: The outcome of one chunk of a bulk update or delete.
+    RecordingTransport: Records exchanges with SurrealDB to a cassette file.
+    ReplayTransport: Answers requests from a cassette file, without a server.
+
+The client classes, and the `httpx` transports and value encoder they
+depend on, are only imported when first accessed, so `import surrealdb`
+stays cheap for processes that never open a connection.
 """
 from __future__ import annotations
+import importlib
+from typing import Any, List, TYPE_CHECKING
 
 
 __all__ = [
     "__description__",
     "__title__",
     "__version__",
+    "AdaptiveLimiter",
     "AuthenticationError",
+    "AsyncMirror",
+    "AsyncSession",
     "AsyncSurrealDB",
+    "ChunkResult",
+    "DeadlineExceeded",
+    "HedgePolicy",
+    "Mirror",
+    "Overloaded",
     "QueryError",
+    "Record",
+    "RecordingTransport",
     "Reference",
+    "ReplayTransport",
+    "Session",
+    "SlowQueryLog",
     "SurrealDB",
+    "deadline",
 ]
 
 from surrealdb.__version__ import __description__, __title__, __version__
-from surrealdb.async_surrealdb import AsyncSurrealDB
-from surrealdb.error import AuthenticationError, QueryError
+from surrealdb.deadline import deadline
+from surrealdb.error import (
+    AuthenticationError,
+    DeadlineExceeded,
+    Overloaded,
+    QueryError,
+)
 from surrealdb.reference import Reference
-from surrealdb.surrealdb import SurrealDB
+
+if TYPE_CHECKING:
+    from surrealdb.async_surrealdb import AsyncSurrealDB
+    from surrealdb.bulk import ChunkResult
+    from surrealdb.cassette import RecordingTransport, ReplayTransport
+    from surrealdb.hedge import HedgePolicy
+    from surrealdb.limiter import AdaptiveLimiter
+    from surrealdb.mirror import AsyncMirror, Mirror
+    from surrealdb.session import AsyncSession, Record, Session
+    from surrealdb.slowlog import SlowQueryLog
+    from surrealdb.surrealdb import SurrealDB
+
+
+_LAZY = {
+    "AdaptiveLimiter": "surrealdb.limiter",
+    "AsyncMirror": "surrealdb.mirror",
+    "AsyncSession": "surrealdb.session",
+    "AsyncSurrealDB": "surrealdb.async_surrealdb",
+    "ChunkResult": "surrealdb.bulk",
+    "HedgePolicy": "surrealdb.hedge",
+    "Mirror": "surrealdb.mirror",
+    "Record": "surrealdb.session",
+    "RecordingTransport": "surrealdb.cassette",
+    "ReplayTransport": "surrealdb.cassette",
+    "Session": "surrealdb.session",
+    "SlowQueryLog": "surrealdb.slowlog",
+    "SurrealDB": "surrealdb.surrealdb",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the client classes, and their helpers, on first access."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the module attributes, including those not imported yet."""
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,129 @@
+"""Module to authenticate against SurrealDB with session tokens."""
+from __future__ import annotations
+import base64
+import binascii
+import json
+import time
+from typing import Any, Dict, Optional
+
+from surrealdb.error import AuthenticationError
+
+
+REFRESH_MARGIN = 60.0
+"""Seconds before a token expires at which it is refreshed."""
+
+
+def endpoint(url: str, action: str) -> str:
+    """
+    Build the URL of another endpoint of the same instance.
+
+    Args:
+        url: The URL of the `/sql` or `/rpc` endpoint of a SurrealDB instance.
+        action: The endpoint to build, such as `signin`, `signup` or `rpc`.
+
+    Returns: The URL of the endpoint on the same instance.
+    """
+    base = url.rstrip("/")
+    if base.endswith(("/sql", "/rpc")):
+        base = base[: -len("/sql")]
+
+    return f"{base}/{action}"
+
+
+def credentials(
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    namespace: Optional[str] = None,
+    database: Optional[str] = None,
+    scope: Optional[str] = None,
+    **variables: Any,
+) -> Dict[str, Any]:
+    """
+    Build the body of a signin or signup request.
+
+    Root users only pass a username and password. Namespace and database
+    users also pass the namespace, and database, they belong to. Scope
+    users pass the namespace, database and scope, plus any variables the
+    scope's SIGNIN or SIGNUP clause expects.
+
+    Returns: The JSON body to send.
+    """
+    payload = {"ns": namespace, "db": database, "sc": scope}
+    payload = {key: value for key, value in payload.items() if value}
+
+    if username is not None:
+        payload["user"] = username
+    if password is not None:
+        payload["pass"] = password
+
+    payload.update(variables)
+    return payload
+
+
+def parse(response: Any) -> Optional[str]:
+    """
+    Read the token from a signin or signup response.
+
+    Args:
+        response: The `httpx.Response` returned by the endpoint.
+
+    Returns: The token, or None if the server did not issue one.
+    Raises: AuthenticationError if authentication failed.
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+
+    if response.status_code != 200:
+        raise AuthenticationError(body)
+
+    return body.get("token") if isinstance(body, dict) else None
+
+
+def expiry(token: str) -> Optional[float]:
+    """
+    Read the expiry time of a JWT without verifying it.
+
+    Args:
+        token: The JWT issued by SurrealDB.
+
+    Returns: The expiry as a UNIX timestamp, or None if it has none.
+    """
+    try:
+        claims = token.split(".")[1]
+        claims = base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4))
+        exp = json.loads(claims).get("exp")
+    except (IndexError, ValueError, binascii.Error, AttributeError):
+        return None
+
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+class Token:
+    """A session token, and the credentials used to renew it."""
+
+    def __init__(self, value: str, payload: Dict[str, Any]):
+        """
+        # Token.
+
+        Params:
+            value: The JWT issued by SurrealDB.
+            payload: The signin body used to get a new token on expiry.
+        """
+        self.payload = payload
+        self.renew(value)
+
+    def renew(self, value: str) -> None:
+        """Replace the token with a newly issued one."""
+        self.value = value
+        self.expires = expiry(value)
+
+    @property
+    def header(self) -> str:
+        """The value of the `Authorization` header for this token."""
+        return f"Bearer {self.value}"
+
+    def expiring(self, margin: float = REFRESH_MARGIN) -> bool:
+        """Check whether the token expires within `margin` seconds."""
+        return self.expires is not None and time.time() >= self.expires - margin
@@ -0,0 +1,421 @@
+"""
+# Load generator for SurrealDB.
+
+Drives a mixed read and write workload through `AsyncSurrealDB` and
+reports throughput, latency percentiles and error rates:
+
+    python -m surrealdb.bench --url http://localhost:8000/sql
+        --username root --password root --namespace test --database test
+        --read-ratio 0.9 --concurrency 32 --rate 2000 --duration 30
+
+Pass `--stand-in` to run against an in-memory stand-in for the server
+instead, which needs no network and simulates `--stand-in-latency`.
+
+Pass `--protocol cbor` to use SurrealDB's binary protocol instead of
+JSON, and compare the client overhead of both against the stand-in.
+
+Pass `--record cassette.json` to record the exchanges of a run, and
+`--replay cassette.json`, with the same `--seed` and `--operations`, to
+run the same workload again from the recording, to measure the client's
+own overhead. A run bounded by `--duration` alone cannot be replayed, as
+the replay would send more operations than were recorded.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import string
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from surrealdb import cbor
+from surrealdb.async_surrealdb import AsyncSurrealDB
+from surrealdb.cassette import RecordingTransport, ReplayTransport
+from surrealdb.encoder import encode
+from surrealdb.error import SurrealError
+from surrealdb.limiter import AdaptiveLimiter
+from surrealdb.slowlog import percentile
+
+
+_STATEMENT = re.compile(
+    r"^\s*(SELECT|CREATE|UPDATE|DELETE)\b.*?([A-Za-z_]\w*:[A-Za-z0-9_]+)",
+    re.IGNORECASE | re.DOTALL,
+)
+_TRANSACTION = re.compile(r"^\s*(BEGIN|COMMIT|CANCEL)\b", re.IGNORECASE)
+
+Operation = Tuple[str, str]
+
+
+class StandIn:
+    """An in-memory stand-in for the `/sql` endpoint of SurrealDB."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        # StandIn.
+
+        Understands single record `SELECT`, `CREATE`, `UPDATE` and `DELETE`
+        statements, which is all the load generator sends, and answers
+        anything else with an empty result.
+
+        Params:
+            latency: The seconds every request takes.
+            jitter: The maximum random seconds added to every request.
+            seed: Seeds the jitter, for reproducible runs.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(seed)
+
+    @property
+    def transport(self) -> httpx.AsyncBaseTransport:
+        """An httpx transport serving requests from the stand-in."""
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer a request to the `/sql` endpoint, or a CBOR `/rpc` query."""
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if request.url.path.endswith("/rpc"):
+            body = cbor.loads(request.content)
+            return httpx.Response(
+                200,
+                content=cbor.dumps(
+                    {"id": body.get("id"), "result": self.answer(body["params"][0])}
+                ),
+                headers={"Content-Type": "application/cbor"},
+            )
+
+        return httpx.Response(200, json=self.answer(request.content.decode()))
+
+    def answer(self, query: str) -> List[Dict[str, Any]]:
+        """Execute every statement of a query, ignoring transactions."""
+        return [
+            self.execute(statement)
+            for statement in query.split(";")
+            if statement.strip() and not _TRANSACTION.match(statement)
+        ]
+
+    def execute(self, statement: str) -> Dict[str, Any]:
+        """Execute a statement against the in-memory records."""
+        match = _STATEMENT.match(statement)
+        verb, record_id = match.groups() if match else ("", "")
+        verb = verb.upper()
+
+        if verb == "SELECT":
+            result = [self.records[record_id]] if record_id in self.records else []
+        elif verb == "DELETE":
+            self.records.pop(record_id, None)
+            result = []
+        elif verb:
+            self.records[record_id] = {"id": record_id, "size": len(statement)}
+            result = [self.records[record_id]]
+        else:
+            result = []
+
+        return {"time": "0ns", "status": "OK", "result": result}
+
+
+class Report:
+    """The outcome of a load test."""
+
+    def __init__(self):
+        """
+        # Report.
+
+        Collects the latency of every operation, by kind, and the errors
+        raised, by type.
+        """
+        self.latencies: Dict[str, List[float]] = {"read": [], "write": []}
+        self.errors: Dict[str, int] = {}
+        self.elapsed = 0.0
+
+    def record(self, kind: str, latency: float, error: Optional[str] = None):
+        """Record the outcome of an operation."""
+        if error is None:
+            self.latencies[kind].append(latency)
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the report as a dictionary."""
+        errors = sum(self.errors.values())
+        total = errors + sum(len(values) for values in self.latencies.values())
+        summary = {
+            "elapsed": self.elapsed,
+            "operations": total,
+            "throughput": total / self.elapsed if self.elapsed else 0.0,
+            "errors": errors,
+            "error_rate": errors / total if total else 0.0,
+            "errors_by_type": dict(self.errors),
+        }
+
+        for kind, values in self.latencies.items():
+            summary[kind] = {
+                "count": len(values),
+                "p50": percentile(values, 0.5),
+                "p90": percentile(values, 0.9),
+                "p99": percentile(values, 0.99),
+                "max": max(values, default=float("nan")),
+            }
+
+        return summary
+
+    def format(self) -> str:
+        """Format the report for a terminal."""
+        summary = self.summary()
+        lines = [
+            f"elapsed     {summary['elapsed']:.2f}s",
+            f"operations  {summary['operations']}",
+            f"throughput  {summary['throughput']:.1f} ops/s",
+            f"errors      {summary['errors']} ({summary['error_rate']:.2%})",
+        ]
+        lines += [f"  {name}: {count}" for name, count in self.errors.items()]
+
+        for kind in self.latencies:
+            stats = summary[kind]
+            lines.append(
+                f"{kind:<11} n={stats['count']} "
+                + " ".join(
+                    f"{name}={stats[name] * 1000:.2f}ms"
+                    for name in ("p50", "p90", "p99", "max")
+                )
+            )
+
+        return "\n".join(lines)
+
+
+class Workload:
+    """A random mix of single record reads and writes."""
+
+    def __init__(
+        self,
+        read_ratio: float = 0.9,
+        payload_size: int = 100,
+        keys: int = 1000,
+        table: str = "bench",
+        seed: Optional[int] = None,
+    ):
+        """
+        # Workload.
+
+        Params:
+            read_ratio: The share of operations that are reads.
+            payload_size: The number of characters written by each write.
+            keys: The number of distinct records the operations touch.
+            table: The table the records live in.
+            seed: Seeds the mix, for reproducible runs.
+        """
+        self.read_ratio = read_ratio
+        self.keys = keys
+        self.table = table
+        self._random = random.Random(seed)
+        self._payload = encode(
+            "".join(self._random.choices(string.ascii_letters, k=payload_size))
+        )
+
+    def next(self) -> Operation:
+        """Get the kind and statement of the next operation."""
+        key = f"{self.table}:{self._random.randrange(self.keys)}"
+
+        if self._random.random() < self.read_ratio:
+            return "read", f"SELECT * FROM {key};"
+
+        return "write", f"UPDATE {key} SET payload = {self._payload};"
+
+
+async def run(
+    db: AsyncSurrealDB,
+    workload: Workload,
+    duration: Optional[float],
+    concurrency: int = 10,
+    rate: Optional[float] = None,
+    batch: int = 1,
+    operations: Optional[int] = None,
+) -> Report:
+    """
+    Run a workload against a client.
+
+    Without a `rate`, each worker sends its next request as soon as the
+    previous one is answered. With a `rate`, requests are sent on a fixed
+    schedule, and latency is measured from the time a request was due,
+    so a slow server is not hidden by requests that were sent late.
+
+    Args:
+        db: The client to send requests with.
+        workload: The operations to send.
+        duration: The seconds to run for, if limited.
+        concurrency: The number of requests in flight at most.
+        rate: The operations to send per second, if limited.
+        batch: The number of operations sent in each request.
+        operations: The number of operations to send, if limited. The
+            same seeded workload then always sends the same operations.
+
+    Returns: The report of the run.
+    Raises: ValueError if the run is limited by neither time nor count.
+    """
+    if duration is None and operations is None:
+        raise ValueError("Limit the run by duration, operations, or both.")
+
+    report = Report()
+    counter = itertools.count()
+    start = time.perf_counter()
+    stop = start + duration if duration is not None else float("inf")
+    left = operations if operations is not None else float("inf")
+
+    async def worker():
+        nonlocal left
+        while True:
+            due = time.perf_counter()
+            if rate:
+                due = start + next(counter) * batch / rate
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+            if due >= stop or time.perf_counter() >= stop or left <= 0:
+                return
+
+            size = int(min(batch, left))
+            left -= size
+            await _send(db, [workload.next() for _ in range(size)], due, report)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+async def _send(
+    db: AsyncSurrealDB,
+    operations: Sequence[Operation],
+    due: float,
+    report: Report,
+) -> None:
+    """Send operations in one request, and record their outcome."""
+    error = None
+    try:
+        if len(operations) == 1:
+            await db.query(operations[0][1])
+        else:
+            await db.batch(*(statement for _, statement in operations))
+    except (SurrealError, httpx.HTTPError) as raised:
+        error = type(raised).__name__
+
+    latency = time.perf_counter() - due
+    for kind, _ in operations:
+        report.record(kind, latency, error)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m surrealdb.bench",
+        description="Generate load against a SurrealDB instance.",
+    )
+    parser.add_argument("--url", default="http://localhost:8000/sql")
+    parser.add_argument("--username", default="")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--namespace", default="bench")
+    parser.add_argument("--database", default="bench")
+    parser.add_argument("--table", default="bench")
+    parser.add_argument("--duration", type=float, help="seconds, default 10")
+    parser.add_argument("--operations", type=int, help="operations to send")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, help="operations per second")
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--payload-size", type=int, default=100, help="characters")
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=1, help="operations/request")
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--coalesce", action="store_true")
+    parser.add_argument("--protocol", choices=["json", "cbor"], default="json")
+    parser.add_argument("--adaptive", action="store_true", help="AIMD limiter")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--stand-in", action="store_true", help="run offline")
+    parser.add_argument("--stand-in-latency", type=float, default=0.001)
+    parser.add_argument("--stand-in-jitter", type=float, default=0.0)
+    parser.add_argument("--record", metavar="CASSETTE", help="record exchanges")
+    parser.add_argument("--replay", metavar="CASSETTE", help="replay exchanges")
+    parser.add_argument("--replay-timing", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    return parser.parse_args(argv)
+
+
+def _transport(args: argparse.Namespace) -> httpx.AsyncBaseTransport:
+    """Build the transport selected on the command line."""
+    if args.replay:
+        return ReplayTransport(args.replay, timing=args.replay_timing)
+
+    if args.stand_in:
+        transport = StandIn(
+            args.stand_in_latency, args.stand_in_jitter, args.seed
+        ).transport
+    else:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=args.max_connections)
+        )
+
+    return RecordingTransport(args.record, transport) if args.record else transport
+
+
+def _duration(args: argparse.Namespace) -> Optional[float]:
+    """Get the seconds to run for, unlimited if only operations are counted."""
+    if args.duration is None and args.operations is None:
+        return 10.0
+
+    return args.duration
+
+
+async def _run(args: argparse.Namespace) -> Report:
+    """Run the load test described by the command line."""
+    workload = Workload(
+        args.read_ratio, args.payload_size, args.keys, args.table, args.seed
+    )
+    async with AsyncSurrealDB(
+        username=args.username,
+        password=args.password,
+        namespace=args.namespace,
+        database=args.database,
+        url=args.url,
+        coalesce=args.coalesce,
+        transport=_transport(args),
+        protocol=args.protocol,
+        limiter=AdaptiveLimiter(initial=args.concurrency) if args.adaptive else None,
+    ) as db:
+        return await run(
+            db,
+            workload,
+            _duration(args),
+            args.concurrency,
+            args.rate,
+            args.batch,
+            args.operations,
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the load generator.
+
+    Returns: The exit status, 1 if any operation failed.
+    """
+    args = parse_args(argv)
+    report = asyncio.run(_run(args))
+
+    print(json.dumps(report.summary()) if args.json else report.format())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
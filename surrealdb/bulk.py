@@ -0,0 +1,123 @@
+"""Module to update and delete many records in set-based statements."""
+from __future__ import annotations
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from surrealdb.encoder import encode, encode_assignments
+from surrealdb.reference import Reference
+
+
+CHUNK_SIZE = 1000
+MAX_CONCURRENCY = 10
+
+Plan = Tuple[List[str], List[str]]
+
+
+class ChunkResult(NamedTuple):
+    """The outcome of the statements sent for one chunk of records."""
+
+    ids: List[str]
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the chunk was applied."""
+        return self.error is None
+
+
+async def gather(
+    awaitables: Iterable[Awaitable[Any]],
+    limit: int = MAX_CONCURRENCY,
+) -> List[Any]:
+    """
+    Await every request, at most `limit` at a time, and keep their order.
+
+    Requests beyond the limit wait here rather than for a connection from
+    the client's pool, where they would time out.
+
+    Raises: ValueError if limit is less than 1.
+    """
+    if limit < 1:
+        raise ValueError("Must send at least one request at a time.")
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def send(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(send(awaitable) for awaitable in awaitables)))
+
+
+def record_id(value: str | Reference) -> str:
+    """Get a record id as SurrealQL, encoding references."""
+    return encode(value) if isinstance(value, Reference) else value
+
+
+def chunks(ids: Iterable[str | Reference], size: int) -> Iterator[List[str]]:
+    """
+    Split record ids into chunks.
+
+    Args:
+        ids: The record ids.
+        size: The number of ids in each chunk, the last one excepted.
+
+    Yields: Lists of record ids, as SurrealQL.
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+
+    chunk: List[str] = []
+    for value in ids:
+        chunk.append(record_id(value))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def change(
+    ids: Iterable[str | Reference],
+    fields: Mapping[str, Any],
+    size: int = CHUNK_SIZE,
+) -> Iterator[Plan]:
+    """Plan one `UPDATE [ids] SET` statement per chunk."""
+    assignments = encode_assignments(fields)
+    for chunk in chunks(ids, size):
+        yield chunk, [f"UPDATE [{', '.join(chunk)}] SET {assignments} RETURN NONE"]
+
+
+def merge(
+    patches: Mapping[str | Reference, Mapping[str, Any]],
+    size: int = CHUNK_SIZE,
+) -> Iterator[Plan]:
+    """Plan one `UPDATE id MERGE` statement per record, chunk by chunk."""
+    patches = {record_id(key): patch for key, patch in patches.items()}
+    for chunk in chunks(patches, size):
+        yield chunk, [
+            f"UPDATE {key} MERGE {encode(patches[key])} RETURN NONE" for key in chunk
+        ]
+
+
+def delete(ids: Iterable[str | Reference], size: int = CHUNK_SIZE) -> Iterator[Plan]:
+    """Plan one `DELETE [ids]` statement per chunk."""
+    for chunk in chunks(ids, size):
+        yield chunk, [f"DELETE [{', '.join(chunk)}]"]
+
+
+def failed(results: Sequence[ChunkResult]) -> List[str]:
+    """Get the ids of the records in the chunks that failed."""
+    return [key for result in results if not result.ok for key in result.ids]
@@ -0,0 +1,251 @@
+"""Module to record exchanges with SurrealDB, and replay them without a server."""
+from __future__ import annotations
+import asyncio
+import base64
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import httpx
+
+from surrealdb.error import UnrecordedRequest
+
+
+_SECRET_PATHS = ("/signin", "/signup")
+_DECODED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+Transport = Union[httpx.BaseTransport, httpx.AsyncBaseTransport]
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Record the exchanges of a client with SurrealDB to a cassette file."""
+
+    def __init__(self, path: str, transport: Optional[Transport] = None):
+        """
+        # RecordingTransport.
+
+        Pass the transport to either client as `transport`. Requests are
+        sent through `transport`, and the cassette is written when the
+        client is closed.
+
+        The body of sign-in and sign-up requests is not recorded, and
+        neither are request headers, other than the namespace and
+        database, so cassettes hold no passwords. Responses are recorded
+        as they are, tokens included.
+
+        Params:
+            path: The cassette file to write.
+            transport: The transport sending requests to the server. A
+                default httpx transport if not set.
+        """
+        self.path = path
+        self.transport = transport
+        self.interactions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request to the server, and record the exchange."""
+        if self.transport is None:
+            self.transport = httpx.HTTPTransport()
+
+        request.read()
+        started = time.perf_counter()
+        response = self.transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+
+        return self._record(request, response, content, started)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request to the server, and record the exchange."""
+        if self.transport is None:
+            self.transport = httpx.AsyncHTTPTransport()
+
+        await request.aread()
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+
+        return self._record(request, response, content, started)
+
+    def _record(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        content: bytes,
+        started: float,
+    ) -> httpx.Response:
+        """Record an exchange, and rebuild the response from its content."""
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in _DECODED_HEADERS
+        ]
+        interaction = {
+            "request": _dump_request(request),
+            "response": {
+                "status": response.status_code,
+                "headers": headers,
+                **_dump_body(content),
+            },
+            "elapsed": round(time.perf_counter() - started, 6),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+        return httpx.Response(
+            response.status_code, headers=headers, content=content, request=request
+        )
+
+    def save(self) -> None:
+        """Write the exchanges recorded so far to the cassette file."""
+        with self._lock:
+            cassette = {"version": 1, "interactions": list(self.interactions)}
+
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(cassette, file, indent=2, ensure_ascii=False)
+
+    def close(self) -> None:
+        """Write the cassette, and close the transport."""
+        self.save()
+        if self.transport is not None:
+            self.transport.close()
+
+    async def aclose(self) -> None:
+        """Write the cassette, and close the transport."""
+        self.save()
+        if self.transport is not None:
+            await self.transport.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Answer requests from a cassette file, without a server."""
+
+    def __init__(self, path: str, latency: float = 0.0, timing: float = 0.0):
+        """
+        # ReplayTransport.
+
+        Pass the transport to either client as `transport`. A request is
+        answered with the response recorded for the same method, path,
+        namespace, database and body, whatever the host. Identical
+        requests get their recorded responses in order, starting over
+        once every one was served.
+
+        Params:
+            path: The cassette file to read.
+            latency: The seconds added to every response.
+            timing: The share of the recorded latency to simulate, for
+                example 1.0 to answer as fast as the server did. Only
+                `latency` is simulated if 0.
+        """
+        self.path = path
+        self.latency = latency
+        self.timing = timing
+        self.replayed = 0
+        self._answers = _load(path)
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a request with its recorded response.
+
+        Raises: UnrecordedRequest if the request was not recorded.
+        """
+        request.read()
+        response, delay = self._answer(request)
+        if delay:
+            time.sleep(delay)
+
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a request with its recorded response.
+
+        Raises: UnrecordedRequest if the request was not recorded.
+        """
+        await request.aread()
+        response, delay = self._answer(request)
+        if delay:
+            await asyncio.sleep(delay)
+
+        return response
+
+    def _answer(self, request: httpx.Request) -> Tuple[httpx.Response, float]:
+        """Find the next recorded response, and the time it should take."""
+        with self._lock:
+            answers = self._answers.get(_key(_dump_request(request)))
+            if answers is None:
+                raise UnrecordedRequest(
+                    f"No recorded response to {request.method} {request.url.path}."
+                )
+
+            interaction = next(answers)
+            self.replayed += 1
+
+        response = interaction["response"]
+        delay = self.latency + self.timing * interaction["elapsed"]
+        return (
+            httpx.Response(
+                response["status"],
+                headers=response["headers"],
+                content=_load_body(response),
+                request=request,
+            ),
+            delay,
+        )
+
+
+def _load(path: str) -> Dict[str, Iterator[Dict[str, Any]]]:
+    """Read a cassette, grouping the recorded responses by request."""
+    with open(path, encoding="utf-8") as file:
+        cassette = json.load(file)
+
+    grouped = defaultdict(list)
+    for interaction in cassette["interactions"]:
+        grouped[_key(interaction["request"])].append(interaction)
+
+    return {key: itertools.cycle(found) for key, found in grouped.items()}
+
+
+def _dump_request(request: httpx.Request) -> Dict[str, Any]:
+    """Describe what identifies a request, leaving out credentials."""
+    described = {
+        "method": request.method,
+        "path": request.url.path,
+        "namespace": request.headers.get("NS"),
+        "database": request.headers.get("DB"),
+    }
+    if not request.url.path.endswith(_SECRET_PATHS):
+        described.update(_dump_body(request.content))
+
+    return described
+
+
+def _key(described: Dict[str, Any]) -> str:
+    """Get the key matching a request to its recorded responses."""
+    return json.dumps(described, sort_keys=True)
+
+
+def _dump_body(content: bytes) -> Dict[str, str]:
+    """Store a body as text, or as base64 if it is binary."""
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(content).decode("ascii")}
+
+
+def _load_body(stored: Dict[str, Any]) -> bytes:
+    """Read a body stored by `_dump_body`."""
+    if "body_base64" in stored:
+        return base64.b64decode(stored["body_base64"])
+
+    return stored.get("body", "").encode("utf-8")
@@ -0,0 +1,397 @@
+"""
+Module to encode and decode SurrealDB's binary protocol, based on CBOR.
+
+Values in responses keep their types: record ids are read as `Reference`,
+and datetimes, durations, decimals, UUIDs and bytes as their Python types,
+where JSON turns all of them into strings. Queries are sent as SurrealQL
+text, with their values written as literals rather than bound as variables.
+"""
+from __future__ import annotations
+import datetime
+import decimal
+import re
+import struct
+import uuid
+from array import array
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from surrealdb.encoder import NONE
+from surrealdb.reference import Reference
+
+
+TAG_DATETIME_STRING = 0
+TAG_EPOCH = 1
+TAG_BIGNUM = 2
+TAG_NEGATIVE_BIGNUM = 3
+TAG_NONE = 6
+TAG_TABLE = 7
+TAG_RECORD_ID = 8
+TAG_UUID_STRING = 9
+TAG_DECIMAL = 10
+TAG_DATETIME = 12
+TAG_DURATION_STRING = 13
+TAG_DURATION = 14
+TAG_UUID = 37
+
+HEADERS = {"Content-Type": "application/cbor", "Accept": "application/cbor"}
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_FRACTION = re.compile(r"(\.\d{6})\d+")
+_BREAK = 0xFF
+
+Encoder = Callable[[Any, bytearray], None]
+
+
+def dumps(value: Any) -> bytes:
+    r"""
+    Encode a Python value as CBOR.
+
+    Raises:
+        TypeError: If a value of an unsupported type is found.
+        ValueError: If the value has no SurrealDB representation.
+
+    >>> dumps({"id": Reference("users", 1)})
+    b'\xa1bid\xc8\x82eusers\x01'
+    """
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def loads(data: bytes) -> Any:
+    r"""
+    Decode a CBOR value, mapping SurrealDB's tags to Python types.
+
+    Raises: ValueError if the data is not well-formed CBOR.
+
+    >>> loads(b'\xc8\x82eusers\x01')
+    Reference('users', 1)
+    """
+    decoder = _Decoder(data)
+    try:
+        value = decoder.item()
+    except (IndexError, struct.error, UnicodeDecodeError) as error:
+        raise ValueError("Malformed CBOR data.") from error
+
+    if decoder.position != len(decoder.data):
+        raise ValueError("Unexpected data after the CBOR value.")
+
+    return value
+
+
+def request(query: str) -> bytes:
+    """
+    Encode the RPC request running SurrealQL statements.
+
+    Each HTTP request gets its own response, so every request has the same
+    id, and the same query is always encoded the same way.
+    """
+    return dumps({"id": 1, "method": "query", "params": [query]})
+
+
+def results(content: bytes) -> List[Any]:
+    """
+    Decode the response to an RPC request.
+
+    Returns: The result of each statement, shaped as the `/sql` endpoint
+        returns them. An error of the request itself is returned as the
+        failed result of a single statement.
+    """
+    body = loads(content)
+    if "error" in body:
+        return [{"status": "ERR", "result": body["error"]}]
+
+    return body["result"]
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    """Encode a value with the encoder of its type."""
+    cls = type(value)
+    encoder = _dispatch.get(cls) or _resolve(cls)
+    encoder(value, out)
+
+
+def _resolve(cls: type) -> Encoder:
+    """Find the encoder of a type through its MRO, and cache it."""
+    for base in (*cls.__mro__, Mapping):
+        if base in _registry and issubclass(cls, base):
+            _dispatch[cls] = _registry[base]
+            return _registry[base]
+
+    raise TypeError(f"Cannot encode values of type {cls.__name__} as CBOR.")
+
+
+def _head(out: bytearray, major: int, argument: int) -> None:
+    """Write the initial byte of an item, and its argument."""
+    if argument < 24:
+        out.append(major << 5 | argument)
+    elif argument < 0x100:
+        out += bytes((major << 5 | 24, argument))
+    elif argument < 0x10000:
+        out.append(major << 5 | 25)
+        out += argument.to_bytes(2, "big")
+    elif argument < 0x100000000:
+        out.append(major << 5 | 26)
+        out += argument.to_bytes(4, "big")
+    else:
+        out.append(major << 5 | 27)
+        out += argument.to_bytes(8, "big")
+
+
+def _encode_int(value: int, out: bytearray) -> None:
+    if 0 <= value < 1 << 64:
+        _head(out, 0, value)
+    elif -(1 << 64) <= value < 0:
+        _head(out, 1, -1 - value)
+    else:
+        tag, magnitude = (
+            (TAG_BIGNUM, value) if value > 0 else (TAG_NEGATIVE_BIGNUM, -1 - value)
+        )
+        size = (magnitude.bit_length() + 7) // 8
+        _encode_tagged(tag, magnitude.to_bytes(size, "big"), out)
+
+
+def _encode_float(value: float, out: bytearray) -> None:
+    out.append(0xFB)
+    out += struct.pack(">d", value)
+
+
+def _encode_str(value: str, out: bytearray) -> None:
+    data = value.encode("utf-8")
+    _head(out, 3, len(data))
+    out += data
+
+
+def _encode_bytes(value: bytes, out: bytearray) -> None:
+    data = bytes(value)
+    _head(out, 2, len(data))
+    out += data
+
+
+def _encode_sequence(value: Any, out: bytearray) -> None:
+    _head(out, 4, len(value))
+    for item in value:
+        _encode(item, out)
+
+
+def _encode_array(value: array, out: bytearray) -> None:
+    _encode_sequence(value.tolist(), out)
+
+
+def _encode_mapping(value: Mapping[Any, Any], out: bytearray) -> None:
+    _head(out, 5, len(value))
+    for key, item in value.items():
+        _encode(key, out)
+        _encode(item, out)
+
+
+def _encode_tagged(tag: int, value: Any, out: bytearray) -> None:
+    _head(out, 6, tag)
+    _encode(value, out)
+
+
+def _encode_datetime(value: datetime.datetime, out: bytearray) -> None:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+
+    elapsed = value - _EPOCH
+    seconds = elapsed.days * 86_400 + elapsed.seconds
+    _encode_tagged(TAG_DATETIME, [seconds, elapsed.microseconds * 1000], out)
+
+
+def _encode_date(value: datetime.date, out: bytearray) -> None:
+    _encode_datetime(
+        datetime.datetime(value.year, value.month, value.day, tzinfo=_EPOCH.tzinfo),
+        out,
+    )
+
+
+def _encode_timedelta(value: datetime.timedelta, out: bytearray) -> None:
+    if value < datetime.timedelta(0):
+        raise ValueError("Cannot encode a negative duration for SurrealDB.")
+
+    seconds = value.days * 86_400 + value.seconds
+    _encode_tagged(TAG_DURATION, [seconds, value.microseconds * 1000], out)
+
+
+def _encode_decimal(value: decimal.Decimal, out: bytearray) -> None:
+    if not value.is_finite():
+        raise ValueError(f"Cannot encode {value} for SurrealDB.")
+
+    _encode_tagged(TAG_DECIMAL, f"{value:f}", out)
+
+
+def _encode_reference(value: Reference, out: bytearray) -> None:
+    _encode_tagged(TAG_RECORD_ID, [value.table, value.record_id], out)
+
+
+_registry: Dict[type, Encoder] = {
+    type(None): lambda _, out: out.append(0xF6),
+    type(NONE): lambda _, out: out.extend((0xC6, 0xF6)),
+    bool: lambda value, out: out.append(0xF5 if value else 0xF4),
+    int: _encode_int,
+    float: _encode_float,
+    decimal.Decimal: _encode_decimal,
+    str: _encode_str,
+    datetime.datetime: _encode_datetime,
+    datetime.date: _encode_date,
+    datetime.timedelta: _encode_timedelta,
+    uuid.UUID: lambda value, out: _encode_tagged(TAG_UUID, value.bytes, out),
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    array: _encode_array,
+    dict: _encode_mapping,
+    Mapping: _encode_mapping,
+    list: _encode_sequence,
+    tuple: _encode_sequence,
+    set: _encode_sequence,
+    frozenset: _encode_sequence,
+    Reference: _encode_reference,
+}
+_dispatch: Dict[type, Encoder] = dict(_registry)
+
+
+class _Decoder:
+    """Read CBOR items from a buffer, one after the other."""
+
+    def __init__(self, data: bytes):
+        self.data = bytes(data)
+        self.position = 0
+
+    def item(self) -> Any:
+        """Read the next item."""
+        initial = self.data[self.position]
+        self.position += 1
+        major, info = initial >> 5, initial & 31
+
+        if major == 7:
+            return self._simple(info)
+
+        argument = self._argument(info)
+        if major == 0:
+            return argument
+        if major == 1:
+            return -1 - argument
+        if major == 6:
+            return _decode_tag(argument, self.item())
+
+        return self._container(major, argument)
+
+    def _argument(self, info: int) -> Optional[int]:
+        """Read the argument of an item, or None if its length is indefinite."""
+        if info < 24:
+            return info
+        if info == 31:
+            return None
+        if info > 27:
+            raise ValueError(f"Reserved CBOR additional information {info}.")
+
+        return int.from_bytes(self._read(1 << (info - 24)), "big")
+
+    def _container(self, major: int, length: Optional[int]) -> Any:
+        """Read a byte string, text string, array or map."""
+        if major == 2:
+            return self._string(length)
+        if major == 3:
+            return self._string(length).decode("utf-8")
+        if major == 4:
+            return [self.item() for _ in self._count(length)]
+
+        return {self.item(): self.item() for _ in self._count(length)}
+
+    def _string(self, length: Optional[int]) -> bytes:
+        """Read a string, joining its chunks if its length is indefinite."""
+        if length is None:
+            return b"".join(self._chunk() for _ in self._count(None))
+
+        return self._read(length)
+
+    def _chunk(self) -> bytes:
+        """Read a chunk of a string of indefinite length."""
+        chunk = self.item()
+        return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+    def _count(self, length: Optional[int]) -> Any:
+        """Count the items of a container, until a break if indefinite."""
+        if length is not None:
+            return range(length)
+
+        return iter(self._before_break, True)
+
+    def _before_break(self) -> bool:
+        """Consume a break, returning whether it was found."""
+        if self.data[self.position] == _BREAK:
+            self.position += 1
+            return True
+
+        return False
+
+    def _simple(self, info: int) -> Any:
+        """Read a simple value or a float."""
+        if info in _SIMPLE:
+            return _SIMPLE[info]
+
+        if info not in _FLOATS:
+            raise ValueError(f"Unsupported CBOR simple value {info}.")
+
+        layout, size = _FLOATS[info]
+        return struct.unpack(layout, self._read(size))[0]
+
+    def _read(self, size: int) -> bytes:
+        """Read the next bytes of the data."""
+        end = self.position + size
+        if end > len(self.data):
+            raise IndexError("CBOR item runs past the end of the data.")
+
+        data, self.position = self.data[self.position:end], end
+        return data
+
+
+_SIMPLE = {20: False, 21: True, 22: None, 23: None}
+_FLOATS = {25: (">e", 2), 26: (">f", 4), 27: (">d", 8)}
+
+
+def _decode_datetime_string(value: str) -> datetime.datetime:
+    value = _FRACTION.sub(r"\1", value.replace("Z", "+00:00"))
+    return datetime.datetime.fromisoformat(value)
+
+
+def _decode_datetime(value: List[int]) -> datetime.datetime:
+    seconds, nanos = (list(value) + [0, 0])[:2]
+    return _EPOCH + datetime.timedelta(seconds=seconds, microseconds=nanos // 1000)
+
+
+def _decode_duration(value: List[int]) -> datetime.timedelta:
+    seconds, nanos = (list(value) + [0, 0])[:2]
+    return datetime.timedelta(seconds=seconds, microseconds=nanos // 1000)
+
+
+def _decode_record_id(value: Any) -> Reference:
+    if isinstance(value, str):
+        return Reference(*value.split(":", 1))
+
+    return Reference(*value)
+
+
+_TAGS: Dict[int, Callable[[Any], Any]] = {
+    TAG_DATETIME_STRING: _decode_datetime_string,
+    TAG_EPOCH: lambda value: _EPOCH + datetime.timedelta(seconds=value),
+    TAG_BIGNUM: lambda value: int.from_bytes(value, "big"),
+    TAG_NEGATIVE_BIGNUM: lambda value: -1 - int.from_bytes(value, "big"),
+    TAG_NONE: lambda _: None,
+    TAG_TABLE: str,
+    TAG_RECORD_ID: _decode_record_id,
+    TAG_UUID_STRING: uuid.UUID,
+    TAG_DECIMAL: decimal.Decimal,
+    TAG_DATETIME: _decode_datetime,
+    TAG_DURATION_STRING: str,
+    TAG_DURATION: _decode_duration,
+    TAG_UUID: lambda value: uuid.UUID(bytes=bytes(value)),
+}
+
+
+def _decode_tag(tag: int, value: Any) -> Any:
+    """Map a tagged value to its Python type, or keep it if the tag is unknown."""
+    decoder = _TAGS.get(tag)
+    return value if decoder is None else decoder(value)
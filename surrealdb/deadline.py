@@ -0,0 +1,95 @@
+"""Module to bound how long SurrealDB operations may take."""
+from __future__ import annotations
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from surrealdb.error import DeadlineExceeded
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound every operation in a block by a shared deadline.
+
+    The deadline is ambient: it follows the current thread, or asyncio
+    task, into every query, select, create, change, delete and batch
+    operation made inside the block. Nested deadlines can only shorten
+    the time available, never extend it.
+
+    Args:
+        seconds: The time budget of the block.
+
+    >>> with deadline(0.25):
+    ...     db.select("users")
+    ...     db.change("users:1", name="Jane Doe")
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        at = min(at, current)
+
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    Get the time left for an operation.
+
+    Args:
+        timeout: The timeout of the operation itself, if any.
+
+    Returns: The smaller of `timeout` and the time left until the ambient
+        deadline, or None if neither is set.
+    Raises: DeadlineExceeded if no time is left.
+    """
+    at = _deadline.get()
+    left = None if at is None else at - time.monotonic()
+
+    if timeout is not None:
+        left = timeout if left is None else min(left, timeout)
+
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded before the query was sent.")
+
+    return left
+
+
+def timed_out(timeout: Optional[float], error: Exception) -> DeadlineExceeded:
+    """
+    Build the error raised when a request runs out of time.
+
+    Args:
+        timeout: The time the request was given, or None if it had no limit.
+        error: The error the request failed with.
+
+    Returns: The error to raise, naming the timeout if there was one, or
+        the underlying error otherwise.
+    """
+    if timeout is None:
+        return DeadlineExceeded(f"Query timed out: {error!r}")
+
+    return DeadlineExceeded(f"Query timed out after {timeout}s.")
+
+
+def timeout_clause(seconds: Optional[float]) -> str:
+    """
+    Build a SurrealQL `TIMEOUT` clause for the time left.
+
+    Args:
+        seconds: The time left, as returned by `remaining`.
+
+    Returns: The clause with a leading space, or an empty string.
+    """
+    if seconds is None:
+        return ""
+
+    return f" TIMEOUT {max(1, math.ceil(seconds * 1000))}ms"
@@ -0,0 +1,239 @@
+"""Module to encode Python values as SurrealQL literals."""
+from __future__ import annotations
+import base64
+import datetime
+import decimal
+import math
+import re
+import uuid
+from typing import Any, Callable, Dict, Iterable, Mapping
+
+from surrealdb.reference import Reference
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_INTEGER = re.compile(r"^[0-9]+$")
+_ESCAPES = str.maketrans(
+    {
+        "\\": "\\\\",
+        "'": "\\'",
+        "\n": "\\n",
+        "\r": "\\r",
+        "\t": "\\t",
+        "\b": "\\b",
+        "\f": "\\f",
+        "\0": "\\u0000",
+    }
+)
+_DURATION_UNITS = (
+    ("d", 86_400_000_000),
+    ("h", 3_600_000_000),
+    ("m", 60_000_000),
+    ("s", 1_000_000),
+    ("ms", 1_000),
+    ("us", 1),
+)
+
+Encoder = Callable[[Any], str]
+
+
+class _None:
+    """The SurrealQL `NONE` value, which unsets a field."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "NONE"
+
+
+NONE = _None()
+"""Encodes as `NONE`, removing a field, where `None` encodes as `NULL`."""
+
+
+def encode(value: Any) -> str:
+    """
+    Encode a Python value as a SurrealQL literal.
+
+    The encoder is chosen from a table keyed by the value's type. Types
+    that are not in the table, such as subclasses of supported types,
+    are resolved through their MRO once and then cached in the table.
+
+    Args:
+        value: The value to encode.
+
+    Returns: The SurrealQL literal.
+    Raises:
+        TypeError: If no encoder is registered for the type.
+        ValueError: If the value has no SurrealQL representation.
+
+    >>> encode({"name": "John Doe", "tags": ["a", None]})
+    "{name: 'John Doe', tags: ['a', NULL]}"
+    """
+    encoder = _dispatch.get(value.__class__)
+    if encoder is None:
+        encoder = _resolve(value.__class__)
+
+    return encoder(value)
+
+
+def register(cls: type, encoder: Encoder) -> None:
+    """
+    Register an encoder for a type, and its subclasses.
+
+    Args:
+        cls: The type to encode.
+        encoder: A function returning the SurrealQL literal for a value.
+    """
+    _registry[cls] = encoder
+    _dispatch.clear()
+    _dispatch.update(_registry)
+
+
+def encode_field(name: str) -> str:
+    """Encode a field name, escaping it unless it is a plain identifier."""
+    if _IDENTIFIER.match(name):
+        return name
+
+    return "`" + name.replace("\\", "\\\\").replace("`", "\\`") + "`"
+
+
+def encode_assignments(fields: Mapping[str, Any]) -> str:
+    """
+    Encode fields as the assignments of a `SET` clause.
+
+    >>> encode_assignments({"name": "John Doe", "age": 42})
+    "name = 'John Doe', age = 42"
+    """
+    return ", ".join(
+        [f"{encode_field(key)} = {encode(value)}" for key, value in fields.items()]
+    )
+
+
+def encode_rows(rows: Iterable[Mapping[str, Any]]) -> str:
+    """
+    Encode many rows as a single array of objects.
+
+    The rows are encoded in one pass, which makes this the fastest way
+    to build the body of a multi-row `INSERT` statement.
+
+    >>> encode_rows([{"id": 1}, {"id": 2}])
+    '[{id: 1}, {id: 2}]'
+    """
+    return "[" + ", ".join([_encode_mapping(row) for row in rows]) + "]"
+
+
+def _resolve(cls: type) -> Encoder:
+    """Find the encoder of a type through its MRO, and cache it."""
+    for base in (*cls.__mro__, Mapping):
+        if base in _registry and issubclass(cls, base):
+            _dispatch[cls] = _registry[base]
+            return _registry[base]
+
+    raise TypeError(f"Cannot encode values of type {cls.__name__} as SurrealQL.")
+
+
+def _encode_str(value: str) -> str:
+    return "'" + value.translate(_ESCAPES) + "'"
+
+
+def _encode_float(value: float) -> str:
+    if not math.isfinite(value):
+        raise ValueError(f"Cannot encode {value} as SurrealQL.")
+
+    return repr(value).replace("e+", "e")
+
+
+def _encode_decimal(value: decimal.Decimal) -> str:
+    if not value.is_finite():
+        raise ValueError(f"Cannot encode {value} as SurrealQL.")
+
+    return f"{value:f}dec"
+
+
+def _encode_datetime(value: datetime.datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+
+    value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return f"<datetime> '{value.isoformat()}Z'"
+
+
+def _encode_date(value: datetime.date) -> str:
+    return f"<datetime> '{value.isoformat()}T00:00:00Z'"
+
+
+def _encode_timedelta(value: datetime.timedelta) -> str:
+    micros = (value.days * 86_400 + value.seconds) * 1_000_000 + value.microseconds
+    if micros < 0:
+        raise ValueError("Cannot encode a negative duration as SurrealQL.")
+
+    parts = []
+    for unit, size in _DURATION_UNITS:
+        count, micros = divmod(micros, size)
+        if count:
+            parts.append(f"{count}{unit}")
+
+    return "".join(parts) or "0s"
+
+
+def _encode_bytes(value: bytes) -> str:
+    encoded = base64.b64encode(bytes(value)).decode("ascii")
+    return f"encoding::base64::decode('{encoded}')"
+
+
+def _encode_mapping(value: Mapping[str, Any]) -> str:
+    items = [f"{_encode_key(key)}: {encode(item)}" for key, item in value.items()]
+    return "{" + ", ".join(items) + "}"
+
+
+def _encode_key(key: str) -> str:
+    if not isinstance(key, str):
+        raise TypeError(f"Object keys must be strings, not {type(key).__name__}.")
+
+    return key if _IDENTIFIER.match(key) else _encode_str(key)
+
+
+def _encode_sequence(value: Iterable[Any]) -> str:
+    return "[" + ", ".join([encode(item) for item in value]) + "]"
+
+
+def _encode_id_part(value: Any) -> str:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+
+    if isinstance(value, str):
+        if _IDENTIFIER.match(value) or _INTEGER.match(value):
+            return value
+        return "⟨" + value.replace("\\", "\\\\").replace("⟩", "\\⟩") + "⟩"
+
+    return encode(value)
+
+
+def _encode_reference(value: Reference) -> str:
+    return f"{_encode_id_part(value.table)}:{_encode_id_part(value.record_id)}"
+
+
+_registry: Dict[type, Encoder] = {
+    type(None): lambda _: "NULL",
+    _None: lambda _: "NONE",
+    bool: lambda value: "true" if value else "false",
+    int: int.__repr__,
+    float: _encode_float,
+    decimal.Decimal: _encode_decimal,
+    str: _encode_str,
+    datetime.datetime: _encode_datetime,
+    datetime.date: _encode_date,
+    datetime.timedelta: _encode_timedelta,
+    uuid.UUID: lambda value: f"<uuid> '{value}'",
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    dict: _encode_mapping,
+    Mapping: _encode_mapping,
+    list: _encode_sequence,
+    tuple: _encode_sequence,
+    set: _encode_sequence,
+    frozenset: _encode_sequence,
+    Reference: _encode_reference,
+}
+_dispatch: Dict[type, Encoder] = dict(_registry)
@@ -12,3 +12,15 @@ class QueryError(SurrealError):
 
 class AuthenticationError(SurrealError):
     """Exception for authentication errors."""
+
+
+class DeadlineExceeded(SurrealError, TimeoutError):
+    """Exception for queries that ran past their timeout or deadline."""
+
+
+class Overloaded(SurrealError):
+    """Exception for requests turned away because too many are queued."""
+
+
+class UnrecordedRequest(SurrealError, LookupError):
+    """Exception for requests replayed without a recorded answer."""
@@ -0,0 +1,125 @@
+"""Module to build graph edges in bulk, and walk them in a single request."""
+from __future__ import annotations
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from surrealdb.bulk import CHUNK_SIZE, Plan, record_id
+from surrealdb.deadline import timeout_clause
+from surrealdb.encoder import encode_assignments
+from surrealdb.reference import Reference
+from surrealdb.statement import encode_path
+
+
+Node = Union[str, Reference]
+Edge = Union[Tuple[Node, Node], Tuple[Node, Node, Optional[Mapping[str, Any]]]]
+
+
+def edge_statement(table: str, edge: Edge) -> Tuple[str, str]:
+    """
+    Build the `RELATE` statement of an edge.
+
+    Returns: The edge, written as a graph path, and its statement.
+
+    >>> edge_statement("knows", ("users:1", Reference("users", 2), {"since": 2020}))
+    (
+        'users:1->knows->users:2',
+        'RELATE users:1->knows->users:2 SET since = 2020 RETURN NONE',
+    )
+    """
+    source, target, *rest = edge
+    fields = rest[0] if rest else None
+
+    path = f"{record_id(source)}->{table}->{record_id(target)}"
+    assignments = f" SET {encode_assignments(fields)}" if fields else ""
+    return path, f"RELATE {path}{assignments} RETURN NONE"
+
+
+def relate(
+    table: str,
+    edges: Iterable[Edge],
+    size: int = CHUNK_SIZE,
+) -> Iterator[Plan]:
+    """Plan one `RELATE` statement per edge, chunk by chunk."""
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+
+    paths: List[str] = []
+    statements: List[str] = []
+    for edge in edges:
+        path, statement = edge_statement(table, edge)
+        paths.append(path)
+        statements.append(statement)
+        if len(paths) == size:
+            yield paths, statements
+            paths, statements = [], []
+
+    if paths:
+        yield paths, statements
+
+
+def traverse(
+    starts: Sequence[Node],
+    path: str,
+    depth: int = 1,
+    fields: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Build a statement walking a graph path from many records at once.
+
+    Each hop is fetched by a subquery of the start record, following the
+    path once more than the hop before, so every hop of every start
+    record comes back in one result.
+
+    Args:
+        starts: The records to start from.
+        path: The path of one hop, such as `->knows->users`.
+        depth: The number of hops to follow.
+        fields: The field paths of the records reached to return. Every
+            field if not set.
+        limit: The number of records returned per hop, at most.
+        timeout: The time left, as returned by `remaining`.
+
+    >>> traverse(["users:1"], "->knows->users", depth=2, fields=["name"])
+    'SELECT id,'
+    ' (SELECT name FROM (array::distinct($parent->knows->users))) AS hop1,'
+    ' (SELECT name FROM (array::distinct($parent->knows->users->knows->users)))'
+    ' AS hop2 FROM [users:1];'
+    """
+    if not path.startswith(("->", "<-")):
+        raise ValueError("A graph path must start with -> or <-.")
+
+    if depth < 1:
+        raise ValueError("Must follow at least one hop.")
+
+    projection = ", ".join(encode_path(field) for field in fields) if fields else "*"
+    bound = "" if limit is None else f" LIMIT {int(limit)}"
+    hops = [
+        f"(SELECT {projection} FROM (array::distinct($parent{path * hop}))"
+        f"{bound}) AS hop{hop}"
+        for hop in range(1, depth + 1)
+    ]
+    targets = ", ".join(record_id(start) for start in starts)
+
+    return f"SELECT id, {', '.join(hops)} FROM [{targets}]{timeout_clause(timeout)};"
+
+
+def hops(rows: Optional[List[Any]], depth: int) -> Dict[str, List[List[Any]]]:
+    """Get the records reached at each hop, by start record id."""
+    return {
+        record_id(row["id"]): [
+            row.get(f"hop{hop}") or [] for hop in range(1, depth + 1)
+        ]
+        for row in rows or []
+    }
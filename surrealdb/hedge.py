@@ -0,0 +1,146 @@
+"""Module to decide when a read is sent again to another endpoint."""
+from __future__ import annotations
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Deque, Optional, Sequence
+
+from surrealdb.slowlog import percentile
+
+
+_REFRESH = 50
+
+
+class HedgePolicy:
+    """Send a slow read to a second endpoint, within a budget of extra load."""
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        quantile: float = 0.95,
+        budget: float = 0.05,
+        burst: float = 10.0,
+        samples: int = 1000,
+        min_samples: int = 20,
+    ):
+        """
+        # HedgePolicy.
+
+        Pass the policy to a client as `hedge`, along with several URLs.
+        A read-only query that has not been answered after the hedging
+        delay is sent again to another endpoint. The first answer wins,
+        and the other request is cancelled.
+
+        Params:
+            delay: The seconds to wait before hedging. Without a delay,
+                the `quantile` of recent latencies is used, once
+                `min_samples` reads were timed.
+            quantile: The quantile of recent latencies to wait for.
+            budget: The number of hedged requests allowed per read, for
+                example 0.05 for at most 5% extra requests.
+            burst: The number of hedged requests allowed in a row, when
+                the budget was not used for a while.
+            samples: The number of recent latencies kept.
+            min_samples: The number of latencies needed before hedging
+                without a fixed delay.
+        """
+        self.delay = delay
+        self.quantile = quantile
+        self.budget = budget
+        self.burst = burst
+        self.min_samples = min_samples
+        self.hedged = 0
+        self._latencies: Deque[float] = deque(maxlen=samples)
+        self._tokens = burst
+        self._threshold: Optional[float] = None
+        self._stale = 0
+        self._lock = threading.Lock()
+
+    def threshold(self) -> Optional[float]:
+        """
+        Get the seconds to wait for an answer before hedging.
+
+        The quantile of recent latencies is recomputed every 50 reads,
+        rather than on every read.
+
+        Returns: The delay, or None if reads should not be hedged yet.
+        """
+        if self.delay is not None:
+            return self.delay
+
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+
+            if self._threshold is None or self._stale >= _REFRESH:
+                self._threshold = percentile(self._latencies, self.quantile)
+                self._stale = 0
+
+            return self._threshold
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a read, and earn a share of a hedge."""
+        with self._lock:
+            self._latencies.append(latency)
+            self._stale += 1
+            self._tokens = min(self.burst, self._tokens + self.budget)
+
+    def allow(self) -> bool:
+        """Spend the budget of one hedged request, if it is available."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+
+def first_answer(futures: Sequence[Future]) -> Any:
+    """
+    Get the first result of concurrent requests, cancelling the others.
+
+    Requests already running in a thread cannot be stopped, so their
+    responses are discarded instead.
+
+    Raises: The first error, if every request failed.
+    """
+    pending = set(futures)
+    errors = []
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        errors += [future.exception() for future in done if future.exception()]
+        answered = [future for future in done if not future.exception()]
+
+        if answered:
+            for future in pending:
+                future.cancel()
+            return answered[0].result()
+
+    raise errors[0]
+
+
+async def first_answer_async(futures: Sequence[asyncio.Future]) -> Any:
+    """
+    Get the first result of concurrent requests, cancelling the others.
+
+    Raises: The first error, if every request failed.
+    """
+    pending = set(futures)
+    errors = []
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+            errors += [future.exception() for future in done if future.exception()]
+            answered = [future for future in done if not future.exception()]
+
+            if answered:
+                return answered[0].result()
+
+        raise errors[0]
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,283 @@
+"""Module to allocate record ids on the client, before records are sent."""
+from __future__ import annotations
+import asyncio
+import functools
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from surrealdb.encoder import encode
+from surrealdb.reference import Reference
+
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_lock = threading.Lock()
+_last_ulid = (0, 0)
+
+IdGenerator = Callable[[], Any]
+
+
+def ulid() -> str:
+    """
+    Generate a ULID, a sortable 26 character id.
+
+    The first 10 characters encode the time in milliseconds, and the
+    rest are random. Ids generated in the same millisecond increment the
+    random part, so ids from one process sort in generation order.
+
+    >>> ulid()
+    '01HF7YAT2ZQ3M4D6XK8B9C0N1P'
+    """
+    global _last_ulid
+
+    with _lock:
+        millis = time.time_ns() // 1_000_000
+        last_millis, last_random = _last_ulid
+        if millis <= last_millis:
+            millis, randomness = last_millis, last_random + 1
+        else:
+            randomness = int.from_bytes(os.urandom(10), "big")
+        _last_ulid = (millis, randomness)
+
+    value = (millis << 80) | (randomness & ((1 << 80) - 1))
+    return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def uuid7() -> str:
+    """
+    Generate a version 7 UUID, which sorts by creation time.
+
+    Returns: The UUID as a string, the form record ids take.
+
+    >>> uuid7()
+    '018bcfe5-6a3e-7c4b-9a61-2f0e8d7c6b5a'
+    """
+    millis = time.time_ns() // 1_000_000
+    value = (millis & ((1 << 48) - 1)) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return str(uuid.UUID(int=value))
+
+
+class SequenceBlock:
+    """A block of consecutive integer ids, reserved on the server at once."""
+
+    def __init__(self, start: int, stop: int):
+        """
+        # SequenceBlock.
+
+        Hands out the integers from `start` up to, but not including,
+        `stop`. Get one from `reserve_ids` on either client.
+
+        Params:
+            start: The first id of the block.
+            stop: The id after the last id of the block.
+        """
+        self.start = start
+        self.stop = stop
+        self._next = start
+        self._lock = threading.Lock()
+
+    def __call__(self) -> int:
+        """
+        Get the next id of the block.
+
+        Raises: ValueError if every id of the block was handed out.
+        """
+        with self._lock:
+            if self._next >= self.stop:
+                raise ValueError("Every id of the sequence block was used.")
+
+            self._next += 1
+            return self._next - 1
+
+    def __len__(self) -> int:
+        """Get the number of ids left in the block."""
+        return self.stop - self._next
+
+    def __repr__(self) -> str:
+        """Represent the block."""
+        return f"SequenceBlock({self._next}, {self.stop})"
+
+
+class Sequence:
+    """Integer ids, reserved from the server one block at a time."""
+
+    def __init__(self, reserve: Callable[[int], SequenceBlock], size: int = 1000):
+        """
+        # Sequence.
+
+        Reserves a new block of `size` ids whenever the current one runs
+        out, so only one request is made per block. Get one from
+        `SurrealDB.sequence`.
+
+        Params:
+            reserve: Reserves a block of ids on the server.
+            size: The number of ids reserved at once.
+        """
+        self.reserve = reserve
+        self.size = size
+        self._block: Optional[SequenceBlock] = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> int:
+        """Get the next id, reserving a new block if needed."""
+        with self._lock:
+            if self._block is None or not len(self._block):
+                self._block = self.reserve(self.size)
+
+            return self._block()
+
+
+class AsyncSequence:
+    """Integer ids, reserved from the server ahead of use, for async clients."""
+
+    def __init__(
+        self,
+        reserve: Callable[[int], Awaitable[SequenceBlock]],
+        size: int = 1000,
+    ):
+        """
+        # AsyncSequence.
+
+        Id generators are called synchronously, so this sequence cannot
+        reserve ids when it is called. Instead, `take` reserves blocks of
+        `size` ids ahead, as many as a call needs, and `AsyncSurrealDB`
+        awaits it before generating ids. Get one from
+        `AsyncSurrealDB.sequence`.
+
+        Params:
+            reserve: Reserves a block of ids on the server.
+            size: The number of ids reserved at once, at least.
+        """
+        self.reserve = reserve
+        self.size = size
+        self._blocks: Deque[SequenceBlock] = deque()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of ids reserved and not handed out yet."""
+        return sum(len(block) for block in self._blocks)
+
+    def __call__(self) -> int:
+        """
+        Get the next id reserved.
+
+        Raises: ValueError if every id reserved was handed out.
+        """
+        while self._blocks and not len(self._blocks[0]):
+            self._blocks.popleft()
+
+        if not self._blocks:
+            raise ValueError("Every id reserved was used, await take() first.")
+
+        return self._blocks[0]()
+
+    async def take(self, count: int) -> IdGenerator:
+        """
+        Set `count` ids aside, reserving more from the server if needed.
+
+        Returns: An id generator handing out exactly those ids.
+        """
+        async with self._lock:
+            while len(self) < count:
+                block = await self.reserve(max(self.size, count - len(self)))
+                self._blocks.append(block)
+
+            taken = [self() for _ in range(count)]
+
+        return functools.partial(next, iter(taken))
+
+
+async def take(generator: Optional[IdGenerator], count: int) -> Optional[IdGenerator]:
+    """
+    Prepare an id generator to generate `count` ids synchronously.
+
+    Returns: The ids set aside by an `AsyncSequence`, or any other
+        generator unchanged.
+    """
+    if not isinstance(generator, AsyncSequence) or not count:
+        return generator
+
+    return await generator.take(count)
+
+
+def reserve_statement(sequence: str, count: int) -> str:
+    """
+    Build the statement reserving ids from a sequence counter.
+
+    The counter is a record of the `sequence` table, whose `value` is the
+    last id reserved. Reserving is atomic on the server, so clients never
+    receive overlapping blocks.
+    """
+    if count < 1:
+        raise ValueError("Must reserve at least one id.")
+
+    counter = encode(Reference("sequence", sequence))
+    return f"UPDATE {counter} SET value += {int(count)} RETURN AFTER;"
+
+
+def block(rows: Any, count: int) -> SequenceBlock:
+    """Get the block of ids reserved, from the rows the statement returned."""
+    stop = rows[0]["value"] + 1
+    return SequenceBlock(stop - count, stop)
+
+
+def record_target(target: str, generator: Optional[IdGenerator]) -> str:
+    """
+    Give a table target a generated id, so the record id is known upfront.
+
+    >>> record_target("users", ulid)
+    'users:⟨01HF7YAT2ZQ3M4D6XK8B9C0N1P⟩'
+    """
+    if generator is None or ":" in target:
+        return target
+
+    return encode(Reference(target, generator()))
+
+
+def assign(
+    table: str,
+    rows: Iterable[Mapping[str, Any]],
+    generator: Optional[IdGenerator],
+) -> Tuple[List[Reference], List[Dict[str, Any]]]:
+    """
+    Give every row without an `id` a generated one.
+
+    Args:
+        table: The table the rows are inserted into.
+        rows: The rows to insert.
+        generator: Generates the id of a row.
+
+    Returns: The reference to each row, and the rows with their ids.
+    Raises: ValueError if a row has no id, and there is no generator.
+    """
+    references: List[Reference] = []
+    assigned: List[Dict[str, Any]] = []
+
+    for row in rows:
+        if "id" not in row and generator is None:
+            raise ValueError("Rows without an id need an id generator.")
+
+        row = dict(row) if "id" in row else {"id": generator(), **row}
+        key = row["id"]
+        assigned.append(row)
+        references.append(
+            key if isinstance(key, Reference) else Reference(table, key)
+        )
+
+    return references, assigned
@@ -0,0 +1,166 @@
+"""Module to write records from an asynchronous source, as fast as accepted."""
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+
+_FLUSH = object()
+
+
+class Ack(NamedTuple):
+    """The acknowledgement of a batch of records written to the database."""
+
+    offset: int
+    count: int
+    last: Any
+
+    @property
+    def first(self) -> int:
+        """The position of the batch's first record in the source."""
+        return self.offset - self.count
+
+
+class Ingestion:
+    """Write the records of a source in batches, with a bounded backlog."""
+
+    def __init__(
+        self,
+        write: Callable[[List[Any]], Awaitable[Any]],
+        batch_size: int = 500,
+        max_in_flight: int = 4,
+        flush_interval: Optional[float] = 1.0,
+    ):
+        """
+        # Ingestion.
+
+        Params:
+            write: Writes a batch of records, raising if it fails.
+            batch_size: The number of records that triggers a write.
+            max_in_flight: The number of batches written concurrently. The
+                source is not read while this many are unacknowledged.
+            flush_interval: The seconds after which a batch that is not
+                full yet is written anyway. Only full batches, and the
+                last one, are written if None.
+        """
+        if batch_size < 1 or max_in_flight < 1:
+            raise ValueError("batch_size and max_in_flight must be at least 1.")
+
+        self.write = write
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.flush_interval = flush_interval
+        self._pending: Deque[Tuple[asyncio.Future, Ack]] = deque()
+        self._flush_at: Optional[float] = None
+
+    async def run(self, source: AsyncIterable[Any]) -> AsyncIterator[Ack]:
+        """
+        Write every record of a source.
+
+        Args:
+            source: The records to write.
+
+        Yields: The acknowledgement of each batch, in source order, once it
+            and every batch before it were written.
+        Raises: The error of the first batch that failed to write. The
+            batches acknowledged before it are written.
+        """
+        batches = self._batches(source)
+        offset = 0
+
+        try:
+            async for batch in batches:
+                offset += len(batch)
+                future = asyncio.ensure_future(self.write(batch))
+                self._pending.append((future, Ack(offset, len(batch), batch[-1])))
+
+                while self._pending and (
+                    len(self._pending) >= self.max_in_flight
+                    or self._pending[0][0].done()
+                ):
+                    yield await self._settle()
+
+            while self._pending:
+                yield await self._settle()
+        finally:
+            await batches.aclose()
+            for future, _ in self._pending:
+                future.cancel()
+            self._pending.clear()
+
+    async def _settle(self) -> Ack:
+        """Wait for the oldest batch, and acknowledge it."""
+        future, ack = self._pending[0]
+        await future
+        self._pending.popleft()
+        return ack
+
+    async def _batches(self, source: AsyncIterable[Any]) -> AsyncIterator[List[Any]]:
+        """Group records in batches, on a size or a time trigger."""
+        records = self._records(source)
+        batch: List[Any] = []
+
+        try:
+            async for record in records:
+                if record is not _FLUSH:
+                    batch.append(record)
+                    self._flush_at = self._flush_at or self._deadline()
+
+                if batch and (record is _FLUSH or len(batch) >= self.batch_size):
+                    yield batch
+                    batch, self._flush_at = [], None
+
+            if batch:
+                yield batch
+        finally:
+            await records.aclose()
+
+    async def _records(self, source: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        """Read records, and a flush marker whenever the batch is due."""
+        iterator = source.__aiter__()
+        upcoming: Optional[asyncio.Future] = None
+
+        try:
+            while True:
+                upcoming = upcoming or asyncio.ensure_future(iterator.__anext__())
+                wait = self._flush_at and max(0.0, self._flush_at - time.monotonic())
+                done, _ = await asyncio.wait({upcoming}, timeout=wait)
+
+                if not done:
+                    yield _FLUSH
+                    continue
+
+                arrived, upcoming = upcoming, None
+                try:
+                    record = arrived.result()
+                except StopAsyncIteration:
+                    return
+
+                yield record
+        finally:
+            _cancel(upcoming)
+
+    def _deadline(self) -> Optional[float]:
+        """Get the time by which a batch started now must be written."""
+        if self.flush_interval is None:
+            return None
+
+        return time.monotonic() + self.flush_interval
+
+
+def _cancel(future: Optional[asyncio.Future]) -> None:
+    """Cancel a future, if there is one."""
+    if future is not None:
+        future.cancel()
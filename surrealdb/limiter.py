@@ -0,0 +1,167 @@
+"""Module to adapt the number of concurrent requests to the server's health."""
+from __future__ import annotations
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from surrealdb.error import DeadlineExceeded, Overloaded
+
+
+class AdaptiveLimiter:
+    """Limit concurrent requests with additive increase, multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        max_queue: int = 1000,
+        backoff: float = 0.9,
+        tolerance: float = 2.0,
+        latency_target: Optional[float] = None,
+        window: int = 100,
+    ):
+        """
+        # AdaptiveLimiter.
+
+        Pass the limiter to `AsyncSurrealDB` as `limiter`. Every request
+        takes a slot, and the number of slots adapts to the server: while
+        requests succeed quickly and the slots are all in use, the limit
+        grows by one per limit's worth of requests. When a request fails,
+        or is slower than the latency threshold, the limit is multiplied
+        by `backoff`, at most once per round trip.
+
+        Requests beyond the limit wait in a queue and are let through in
+        the order they arrived.
+
+        Params:
+            initial: The limit to start with.
+            min_limit: The limit never shrinks below this.
+            max_limit: The limit never grows above this.
+            max_queue: The number of requests that may wait for a slot.
+                Requests beyond it raise Overloaded.
+            backoff: The factor the limit shrinks by when the server is
+                unhealthy.
+            tolerance: Without a `latency_target`, requests slower than
+                this multiple of the fastest recent request are unhealthy.
+            latency_target: The seconds above which a request is unhealthy.
+            window: The number of requests the fastest recent request is
+                taken over.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.latency_target = latency_target
+        self.window = window
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._floor = math.inf
+        self._next_floor = math.inf
+        self._samples = 0
+        self._decreased_at = -math.inf
+
+    @property
+    def limit(self) -> int:
+        """The number of requests currently allowed in flight."""
+        return math.floor(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests in flight."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """The number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot.
+
+        Args:
+            timeout: The number of seconds to wait at most.
+
+        Returns: The number of seconds spent waiting.
+        Raises:
+            Overloaded: If the queue is full.
+            DeadlineExceeded: If no slot is free before the timeout.
+        """
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            raise Overloaded(f"{len(self._waiters)} requests are already queued.")
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError as error:
+            self._abandon(waiter)
+            raise DeadlineExceeded("Deadline exceeded awaiting a slot.") from error
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        return time.perf_counter() - started
+
+    def release(self, latency: float, healthy: bool = True) -> None:
+        """
+        Free a slot, and adapt the limit to how the request went.
+
+        Args:
+            latency: The seconds the request took.
+            healthy: Whether the request succeeded, as far as the load on
+                the server is concerned.
+        """
+        saturated = self._in_flight >= self.limit
+        self._in_flight -= 1
+
+        if healthy and latency <= self._threshold(latency):
+            if saturated:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        elif time.perf_counter() - latency >= self._decreased_at:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+            self._decreased_at = time.perf_counter()
+
+        self._wake()
+
+    def _threshold(self, latency: float) -> float:
+        """Get the latency above which a request is unhealthy."""
+        if self.latency_target is not None:
+            return self.latency_target
+
+        self._floor = min(self._floor, latency)
+        self._next_floor = min(self._next_floor, latency)
+        self._samples += 1
+        if self._samples >= self.window:
+            self._floor, self._next_floor = self._next_floor, math.inf
+            self._samples = 0
+
+        return self._floor * self.tolerance
+
+    def _wake(self) -> None:
+        """Hand free slots to the longest waiting requests."""
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Give up on a slot, returning it if it was granted meanwhile."""
+        if waiter.done():
+            self._in_flight -= 1
+            self._wake()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
@@ -0,0 +1,377 @@
+"""Module to keep small tables in memory, in sync through change feeds."""
+from __future__ import annotations
+import asyncio
+import contextlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TYPE_CHECKING
+
+from surrealdb import bulk
+from surrealdb.encoder import encode
+from surrealdb.reference import Reference
+
+if TYPE_CHECKING:
+    from surrealdb.async_surrealdb import AsyncSurrealDB
+    from surrealdb.surrealdb import SurrealDB
+
+
+_MISSING = object()
+
+
+def _since(now: Any) -> str:
+    """Get the server time, read as a string or datetime, for a `SINCE` clause."""
+    return encode(now) if isinstance(now, datetime) else f"<datetime> {encode(now)}"
+
+
+class _BaseMirror:
+    """The in-memory rows and indexes, shared by both mirror classes."""
+
+    def __init__(
+        self,
+        table: str,
+        indexes: Sequence[str] = (),
+        interval: float = 60.0,
+        limit: int = 1000,
+    ):
+        self.table = table
+        self.interval = interval
+        self.limit = limit
+        self.versionstamp: Optional[int] = None
+        self.last_error: Optional[Exception] = None
+        self._since: Optional[str] = None
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[Any, Dict[str, Dict[str, Any]]]] = {
+            field: {} for field in indexes
+        }
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Get the number of rows in the mirror."""
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the rows in the mirror."""
+        with self._lock:
+            return iter(list(self._rows.values()))
+
+    def __contains__(self, record_id: str | Reference) -> bool:
+        """Check whether a row is in the mirror."""
+        return bulk.record_id(record_id) in self._rows
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the table has been loaded."""
+        return self._since is not None
+
+    def get(self, record_id: str | Reference) -> Optional[Dict[str, Any]]:
+        """
+        Get a row by id, from memory.
+
+        Args:
+            record_id: The id of the row, such as `countries:nl`.
+
+        Returns: The row, or None if it does not exist. Rows are shared
+            with the mirror, so they must be treated as read-only.
+        """
+        return self._rows.get(bulk.record_id(record_id))
+
+    def find(self, **fields: Any) -> List[Dict[str, Any]]:
+        """
+        Get the rows whose fields equal the given values, from memory.
+
+        The first indexed field narrows the rows down, the others are
+        compared one row at a time.
+
+        Args:
+            fields: The values to match.
+                Key: The field name.
+                Value: The value the field must equal.
+
+        Returns: The matching rows, which must be treated as read-only.
+        """
+        with self._lock:
+            rows = self._candidates(fields)
+            return [
+                row
+                for row in rows
+                if all(row.get(field, _MISSING) == v for field, v in fields.items())
+            ]
+
+    def apply(self, changesets: Optional[List[Dict[str, Any]]]) -> int:
+        """
+        Apply changes to the mirror.
+
+        `sync` calls this with the result of `SHOW CHANGES`, but changes
+        pushed from elsewhere, in the same shape, can be applied too.
+
+        Args:
+            changesets: Dictionaries with the `versionstamp` of a change
+                set and its `changes`, each an `update` or `delete` of a row.
+                Other changes, such as `define_table`, are skipped.
+
+        Returns: The number of rows updated or deleted.
+        """
+        applied = 0
+
+        with self._lock:
+            for changeset in changesets or []:
+                for change in changeset.get("changes", []):
+                    if "update" in change:
+                        self._put(change["update"])
+                    elif "delete" in change:
+                        self._remove(change["delete"]["id"])
+                    else:
+                        continue
+                    applied += 1
+
+                self.versionstamp = changeset["versionstamp"]
+
+        return applied
+
+    def _statements(self) -> List[str]:
+        """
+        Build the statements loading the table.
+
+        The server's time is read before the rows, so that changes made
+        while loading are synced again rather than lost, whatever the
+        client's clock says.
+        """
+        return ["RETURN time::now()", f"SELECT * FROM {self.table}"]
+
+    def _reset(self, now: Any, rows: Optional[List[Dict[str, Any]]]) -> None:
+        """Replace every row, as loaded from a full select at `now`."""
+        with self._lock:
+            self._rows.clear()
+            for index in self._indexes.values():
+                index.clear()
+            for row in rows or []:
+                self._put(row)
+
+            self._since = _since(now)
+            self.versionstamp = None
+
+    def _put(self, row: Dict[str, Any]) -> None:
+        """Add or replace a row, and index it."""
+        key = bulk.record_id(row["id"])
+        self._remove(key)
+        self._rows[key] = row
+
+        for field, index in self._indexes.items():
+            with contextlib.suppress(TypeError):
+                index.setdefault(row.get(field), {})[key] = row
+
+    def _remove(self, record_id: str | Reference) -> None:
+        """Remove a row, and its index entries."""
+        record_id = bulk.record_id(record_id)
+        row = self._rows.pop(record_id, None)
+        if row is None:
+            return
+
+        for field, index in self._indexes.items():
+            with contextlib.suppress(TypeError, KeyError):
+                bucket = index[row.get(field)]
+                del bucket[record_id]
+                if not bucket:
+                    del index[row.get(field)]
+
+    def _candidates(self, fields: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Narrow the rows down with the first indexed field, if any."""
+        for field, value in fields.items():
+            if field in self._indexes:
+                with contextlib.suppress(TypeError):
+                    return list(self._indexes[field].get(value, {}).values())
+
+        return list(self._rows.values())
+
+    def _statement(self) -> str:
+        """Build the statement fetching the changes since the last sync."""
+        since = self._since if self.versionstamp is None else self.versionstamp + 1
+        return f"SHOW CHANGES FOR TABLE {self.table} SINCE {since} LIMIT {self.limit};"
+
+
+class Mirror(_BaseMirror):
+    """An in-memory copy of a table, kept up to date with its change feed."""
+
+    def __init__(
+        self,
+        db: SurrealDB,
+        table: str,
+        indexes: Sequence[str] = (),
+        interval: float = 60.0,
+        limit: int = 1000,
+    ):
+        """
+        # Mirror.
+
+        Loads a table once, then applies only the changes made since the
+        last sync, read from the table's change feed. The table must be
+        defined with a `CHANGEFEED` long enough to cover `interval`.
+
+        Params:
+            db: The client to load and sync the table with.
+            table: The table to mirror.
+            indexes: The fields to index, to speed up `find`.
+            interval: The seconds between syncs in the background.
+            limit: The number of change sets fetched per request.
+
+        >>> with Mirror(db, "countries", indexes=["region"]) as countries:
+        ...     countries.get("countries:nl")
+        ...     countries.find(region="Europe")
+        """
+        super().__init__(table, indexes, interval, limit)
+        self.db = db
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        """Load the table, and sync it in the background."""
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        """Stop syncing the table."""
+        self.stop()
+
+    def load(self) -> None:
+        """Load every row of the table, replacing the rows in memory."""
+        self._reset(*self.db.batch(*self._statements()))
+
+    def sync(self) -> int:
+        """
+        Apply the changes made since the last sync.
+
+        Loads the table instead if it was never loaded.
+
+        Returns: The number of changes applied.
+        Raises: SurrealError if the changes cannot be read.
+        """
+        if not self.loaded:
+            self.load()
+            return 0
+
+        applied = 0
+        while True:
+            changesets = self.db.query(self._statement())
+            applied += self.apply(changesets)
+            if len(changesets or []) < self.limit:
+                return applied
+
+    def start(self) -> None:
+        """Load the table if needed, and sync it every `interval` seconds."""
+        if not self.loaded:
+            self.load()
+
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._poll, name=f"mirror-{self.table}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop syncing the table in the background."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self) -> None:
+        """Sync until stopped, keeping the last rows if a sync fails."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+                self.last_error = None
+            except Exception as error:
+                self.last_error = error
+
+
+class AsyncMirror(_BaseMirror):
+    """An in-memory copy of a table, kept up to date with its change feed."""
+
+    def __init__(
+        self,
+        db: AsyncSurrealDB,
+        table: str,
+        indexes: Sequence[str] = (),
+        interval: float = 60.0,
+        limit: int = 1000,
+    ):
+        """
+        # AsyncMirror.
+
+        Loads a table once, then applies only the changes made since the
+        last sync, read from the table's change feed. The table must be
+        defined with a `CHANGEFEED` long enough to cover `interval`.
+
+        Params:
+            db: The client to load and sync the table with.
+            table: The table to mirror.
+            indexes: The fields to index, to speed up `find`.
+            interval: The seconds between syncs in the background.
+            limit: The number of change sets fetched per request.
+
+        >>> async with AsyncMirror(db, "countries") as countries:
+        ...     countries.get("countries:nl")
+        """
+        super().__init__(table, indexes, interval, limit)
+        self.db = db
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        """Load the table, and sync it in the background."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        """Stop syncing the table."""
+        await self.stop()
+
+    async def load(self) -> None:
+        """Load every row of the table, replacing the rows in memory."""
+        self._reset(*await self.db.batch(*self._statements()))
+
+    async def sync(self) -> int:
+        """
+        Apply the changes made since the last sync.
+
+        Loads the table instead if it was never loaded.
+
+        Returns: The number of changes applied.
+        Raises: SurrealError if the changes cannot be read.
+        """
+        if not self.loaded:
+            await self.load()
+            return 0
+
+        applied = 0
+        while True:
+            changesets = await self.db.query(self._statement())
+            applied += self.apply(changesets)
+            if len(changesets or []) < self.limit:
+                return applied
+
+    async def start(self) -> None:
+        """Load the table if needed, and sync it every `interval` seconds."""
+        if not self.loaded:
+            await self.load()
+
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._poll())
+
+    async def stop(self) -> None:
+        """Stop syncing the table in the background."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _poll(self) -> None:
+        """Sync until stopped, keeping the last rows if a sync fails."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+                self.last_error = None
+            except Exception as error:
+                self.last_error = error
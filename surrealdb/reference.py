@@ -25,3 +25,18 @@ class Reference:
             raise NotImplementedError("Format specifiers are not supported.")
 
         return f"{self.table}:{self.record_id}"
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare references by table and record id."""
+        if not isinstance(other, Reference):
+            return NotImplemented
+
+        return (self.table, self.record_id) == (other.table, other.record_id)
+
+    def __hash__(self) -> int:
+        """Hash the reference by table and record id."""
+        return hash((self.table, self.record_id))
+
+    def __repr__(self) -> str:
+        """Represent the reference."""
+        return f"Reference({self.table!r}, {self.record_id!r})"
@@ -0,0 +1,322 @@
+"""Module to track changes to records across a unit of work."""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING, Tuple
+
+from surrealdb import bulk
+from surrealdb.encoder import NONE, encode_assignments
+from surrealdb.reference import Reference
+
+if TYPE_CHECKING:
+    from surrealdb.async_surrealdb import AsyncSurrealDB
+    from surrealdb.surrealdb import SurrealDB
+
+
+class Record(dict):
+    """A row loaded in a session, which remembers the fields that change."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """
+        # Record.
+
+        Behaves like the dictionary returned by `select`. Assigning,
+        updating or deleting a field marks it as changed. Changes made
+        inside nested values are not seen, so call `touch` with the name
+        of the field after editing a nested list or dictionary.
+        """
+        super().__init__(*args, **kwargs)
+        self._changed = set()
+
+    @property
+    def id(self) -> str | Reference:
+        """The id of the record."""
+        return self["id"]
+
+    @property
+    def dirty(self) -> bool:
+        """Whether any field has changed since the record was loaded."""
+        return bool(self._changed)
+
+    def changes(self) -> Dict[str, Any]:
+        """Get the changed fields, with removed fields set to NONE."""
+        return {field: self.get(field, NONE) for field in sorted(self._changed)}
+
+    def touch(self, *fields: str) -> None:
+        """Mark fields as changed."""
+        for field in fields:
+            if field == "id":
+                raise ValueError("Record ids cannot be changed.")
+            self._changed.add(field)
+
+    def __setitem__(self, field: str, value: Any) -> None:
+        """Set a field, and mark it as changed."""
+        self.touch(field)
+        super().__setitem__(field, value)
+
+    def __delitem__(self, field: str) -> None:
+        """Remove a field, and mark it as changed."""
+        self.touch(field)
+        super().__delitem__(field)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        """Set several fields, and mark them as changed."""
+        for field, value in dict(*args, **kwargs).items():
+            self[field] = value
+
+    def setdefault(self, field: str, default: Any = None) -> Any:
+        """Set a field if it is missing, and mark it as changed if so."""
+        if field not in self:
+            self[field] = default
+        return self[field]
+
+    def pop(self, field: str, *default: Any) -> Any:
+        """Remove a field, and mark it as changed if it was present."""
+        if field in self:
+            self.touch(field)
+        return super().pop(field, *default)
+
+    def popitem(self) -> Tuple[str, Any]:
+        """Remove the last field other than the id, and mark it as changed."""
+        for field in reversed(self):
+            if field != "id":
+                return field, self.pop(field)
+
+        raise KeyError("popitem(): the record has no fields but its id")
+
+    def clear(self) -> None:
+        """Remove every field but the id, and mark them as changed."""
+        for field in [field for field in self if field != "id"]:
+            del self[field]
+
+    def __ior__(self, other: Any) -> Record:
+        """Set several fields with `|=`, and mark them as changed."""
+        self.update(other)
+        return self
+
+    def _clean(self) -> None:
+        """Forget the changes, once they have been saved."""
+        self._changed.clear()
+
+
+class _BaseSession:
+    """The identity map, shared by both session classes."""
+
+    def __init__(self):
+        self._records: Dict[str, Record] = {}
+
+    def __contains__(self, record_id: str | Reference) -> bool:
+        """Check whether a record is loaded in the session."""
+        return bulk.record_id(record_id) in self._records
+
+    def add(self, row: Dict[str, Any]) -> Record:
+        """
+        Track a row fetched outside of the session.
+
+        Args:
+            row: A row returned by the client, which must have an `id`.
+
+        Returns: The tracked record. If a record with the same id is
+            already loaded, that record is returned unchanged instead.
+        """
+        key = bulk.record_id(row["id"])
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = Record(row)
+
+        return record
+
+    @property
+    def dirty(self) -> List[Record]:
+        """The loaded records that have changed."""
+        return [record for record in self._records.values() if record.dirty]
+
+    def evict(self, record_id: Optional[str | Reference] = None) -> None:
+        """
+        Stop tracking a record, discarding its unsaved changes.
+
+        Args:
+            record_id: The record to evict. Evicts every record if not set.
+        """
+        if record_id is None:
+            self._records.clear()
+        else:
+            self._records.pop(bulk.record_id(record_id), None)
+
+    def _missing(self, record_ids: Iterable[str | Reference]) -> List[str]:
+        """Get the ids that are not loaded yet, without duplicates."""
+        return list(
+            dict.fromkeys(bulk.record_id(id_) for id_ in record_ids if id_ not in self)
+        )
+
+    def _load(self, rows: Optional[List[Any]]) -> None:
+        """Track the rows returned by a select."""
+        for row in rows or []:
+            self.add(row)
+
+    def _statements(self, records: List[Record]) -> List[str]:
+        """Build one UPDATE statement per dirty record."""
+        return [
+            f"UPDATE {bulk.record_id(record.id)}"
+            f" SET {encode_assignments(record.changes())}"
+            for record in records
+        ]
+
+
+class Session(_BaseSession):
+    """A unit of work on a SurrealDB client."""
+
+    def __init__(self, db: SurrealDB):
+        """
+        # Session.
+
+        Loads each record at most once, remembers which of its fields
+        change, and saves every change in a single request on `flush`.
+
+        Params:
+            db: The client to load and save records with.
+
+        >>> with Session(db) as session:
+        ...     user = session.get("users:1")
+        ...     user["name"] = "Jane Doe"
+        """
+        super().__init__()
+        self.db = db
+
+    def __enter__(self):
+        """Enter the context manager."""
+        return self
+
+    def __exit__(self, error_type, *_):
+        """Flush the changes, unless the block raised an error."""
+        if error_type is None:
+            self.flush()
+
+    def get(self, record_id: str | Reference) -> Optional[Record]:
+        """
+        Get a record, fetching it only if it is not loaded yet.
+
+        Args:
+            record_id: The id of the record.
+
+        Returns: The record, or None if it does not exist.
+        """
+        return self.get_many([record_id])[0]
+
+    def get_many(self, record_ids: Iterable[str | Reference]) -> List[Optional[Record]]:
+        """
+        Get records, fetching all of those not loaded yet in one request.
+
+        Args:
+            record_ids: The ids of the records.
+
+        Returns: The records, in order, with None for those that do not exist.
+        """
+        record_ids = list(record_ids)
+        missing = self._missing(record_ids)
+
+        if missing:
+            self._load(self.db.query(f"SELECT * FROM {', '.join(missing)};"))
+
+        return [self._records.get(bulk.record_id(id_)) for id_ in record_ids]
+
+    def flush(self) -> List[Any]:
+        """
+        Save the changed fields of every dirty record.
+
+        Only the fields that changed are sent, for all records in a single
+        request and a single transaction.
+
+        Returns: The result of each update.
+        Raises: SurrealError if the update fails. No changes are saved then.
+        """
+        records = self.dirty
+        if not records:
+            return []
+
+        results = self.db.batch(*self._statements(records), transaction=True)
+
+        for record in records:
+            record._clean()
+
+        return results
+
+
+class AsyncSession(_BaseSession):
+    """A unit of work on an AsyncSurrealDB client."""
+
+    def __init__(self, db: AsyncSurrealDB):
+        """
+        # AsyncSession.
+
+        Loads each record at most once, remembers which of its fields
+        change, and saves every change in a single request on `flush`.
+
+        Params:
+            db: The client to load and save records with.
+
+        >>> async with AsyncSession(db) as session:
+        ...     user = await session.get("users:1")
+        ...     user["name"] = "Jane Doe"
+        """
+        super().__init__()
+        self.db = db
+
+    async def __aenter__(self):
+        """Enter the context manager."""
+        return self
+
+    async def __aexit__(self, error_type, *_):
+        """Flush the changes, unless the block raised an error."""
+        if error_type is None:
+            await self.flush()
+
+    async def get(self, record_id: str | Reference) -> Optional[Record]:
+        """
+        Get a record, fetching it only if it is not loaded yet.
+
+        Args:
+            record_id: The id of the record.
+
+        Returns: The record, or None if it does not exist.
+        """
+        return (await self.get_many([record_id]))[0]
+
+    async def get_many(
+        self,
+        record_ids: Iterable[str | Reference],
+    ) -> List[Optional[Record]]:
+        """
+        Get records, fetching all of those not loaded yet in one request.
+
+        Args:
+            record_ids: The ids of the records.
+
+        Returns: The records, in order, with None for those that do not exist.
+        """
+        record_ids = list(record_ids)
+        missing = self._missing(record_ids)
+
+        if missing:
+            self._load(await self.db.query(f"SELECT * FROM {', '.join(missing)};"))
+
+        return [self._records.get(bulk.record_id(id_)) for id_ in record_ids]
+
+    async def flush(self) -> List[Any]:
+        """
+        Save the changed fields of every dirty record.
+
+        Only the fields that changed are sent, for all records in a single
+        request and a single transaction.
+
+        Returns: The result of each update.
+        Raises: SurrealError if the update fails. No changes are saved then.
+        """
+        records = self.dirty
+        if not records:
+            return []
+
+        results = await self.db.batch(*self._statements(records), transaction=True)
+
+        for record in records:
+            record._clean()
+
+        return results
@@ -0,0 +1,162 @@
+"""Module to coalesce identical in-flight read queries."""
+from __future__ import annotations
+import asyncio
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from surrealdb.error import DeadlineExceeded
+
+
+_READ_STATEMENT = re.compile(r"^\s*(SELECT|INFO|SHOW)\b", re.IGNORECASE)
+_WRITE_KEYWORD = re.compile(
+    r"\b(CREATE|UPDATE|DELETE|RELATE|INSERT|DEFINE|REMOVE|LET|BEGIN|KILL|LIVE)\b",
+    re.IGNORECASE,
+)
+
+
+def is_read_only(query: str) -> bool:
+    """
+    Check whether a SurrealQL query only reads data.
+
+    The check is deliberately conservative: every statement must start
+    with a read keyword and no write keyword may appear anywhere in the
+    query, including inside string literals. Queries that fail the check
+    are simply never coalesced.
+
+    Args:
+        query: The SurrealQL query to check.
+
+    Returns: True if the query is safe to share between callers.
+    """
+    if _WRITE_KEYWORD.search(query):
+        return False
+
+    statements = [part for part in query.split(";") if part.strip()]
+    return bool(statements) and all(map(_READ_STATEMENT.match, statements))
+
+
+class _Call:
+    """A call in flight, shared between threads."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    """Share the result of identical concurrent calls between threads."""
+
+    def __init__(self):
+        """
+        # Group.
+
+        Calls made through `do` with a key that is already in flight wait
+        for the first call to finish and receive its result, or its error.
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(
+        self,
+        key: Hashable,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Call `func(*args)` unless a call for `key` is already in flight.
+
+        Args:
+            key: Identifies calls that can share a result.
+            func: The function to call.
+            args: Positional arguments passed to `func`.
+            timeout: How long to wait for a call already in flight.
+
+        Returns: The result of the call. Callers sharing a call receive
+            the same object, so it must be treated as read-only.
+        Raises: DeadlineExceeded if the call in flight outlasts `timeout`.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise DeadlineExceeded("Deadline exceeded awaiting a shared query.")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncGroup:
+    """Share the result of identical concurrent calls between coroutines."""
+
+    def __init__(self):
+        """
+        # AsyncGroup.
+
+        Calls made through `do` with a key that is already in flight await
+        the first call and receive its result, or its error.
+        """
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Await `func(*args)` unless a call for `key` is already in flight.
+
+        The shared call runs as its own task, so cancelling one caller
+        does not cancel the request for the others.
+
+        Args:
+            key: Identifies calls that can share a result.
+            func: The coroutine function to call.
+            args: Positional arguments passed to `func`.
+            timeout: How long to wait for the call.
+
+        Returns: The result of the call. Callers sharing a call receive
+            the same object, so it must be treated as read-only.
+        Raises: DeadlineExceeded if the call outlasts `timeout`.
+        """
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(func(*args))
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError as error:
+            raise DeadlineExceeded("Deadline exceeded awaiting a query.") from error
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """Remove a finished call, retrieving its error if nobody awaited it."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+        if not future.cancelled():
+            future.exception()
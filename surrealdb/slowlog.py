@@ -0,0 +1,289 @@
+"""Module to record slow queries and latency per statement shape."""
+from __future__ import annotations
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+from surrealdb import cbor
+
+
+_LITERALS = re.compile(
+    r"""
+    '(?:[^'\\]|\\.)*'                    # single quoted strings
+    | "(?:[^"\\]|\\.)*"                  # double quoted strings
+    | ⟨(?:[^⟩\\]|\\.)*⟩                  # escaped record ids
+    | (?<=\w:)[A-Za-z0-9_]+              # plain record ids
+    | (?<![\w.])-?\d+(?:\.\d+)?(?:e-?\d+)?(?:dec|f|ns|us|µs|ms|s|m|h|d|w|y)?\b
+    """,
+    re.VERBOSE,
+)
+_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ns|µs|us|ms|s|m|h)")
+_UNITS = {
+    "ns": 1e-9,
+    "µs": 1e-6,
+    "us": 1e-6,
+    "ms": 1e-3,
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+}
+_EXPLAINABLE = re.compile(r"^\s*SELECT\b[^;]*;?\s*$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """
+    Normalize a query so that statements of the same shape match.
+
+    String, number and duration literals and record ids are replaced by
+    `?`, lists of literals collapse to a single `?`, and whitespace is
+    collapsed.
+
+    >>> fingerprint("SELECT * FROM users:42 WHERE age > 30 AND name = 'Jo'")
+    'SELECT * FROM users:? WHERE age > ? AND name = ?'
+    """
+    normalized = _LISTS.sub("?", _LITERALS.sub("?", query))
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Get a percentile of some values, using the nearest-rank method.
+
+    Args:
+        values: The values, in any order.
+        q: The percentile, between 0 and 1.
+
+    Returns: The percentile, or NaN if there are no values.
+    """
+    if not values:
+        return math.nan
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def parse_duration(text: Any) -> Optional[float]:
+    """
+    Parse a duration reported by SurrealDB, such as `1.234ms`.
+
+    Returns: The duration in seconds, or None if it cannot be parsed.
+    """
+    if not isinstance(text, str):
+        return None
+
+    parts = _DURATION.findall(text)
+    if not parts:
+        return None
+
+    return sum(float(value) * _UNITS[unit] for value, unit in parts)
+
+
+class SlowQuery:
+    """A query that took longer than the slow query threshold."""
+
+    __slots__ = (
+        "fingerprint",
+        "query",
+        "duration",
+        "rows",
+        "server_time",
+        "timestamp",
+        "plan",
+    )
+
+    def __init__(
+        self,
+        query: str,
+        duration: float,
+        rows: Optional[int] = None,
+        server_time: Optional[float] = None,
+    ):
+        """
+        # SlowQuery.
+
+        Params:
+            query: The query that was sent.
+            duration: The seconds the client waited for the response.
+            rows: The number of rows in the first result, if known.
+            server_time: The seconds the server reported spending, if known.
+
+        The `plan` attribute holds the result of `EXPLAIN` once the log
+        has captured it.
+        """
+        self.fingerprint = fingerprint(query)
+        self.query = query
+        self.duration = duration
+        self.rows = rows
+        self.server_time = server_time
+        self.timestamp = time.time()
+        self.plan: Optional[List[Any]] = None
+
+    def __repr__(self) -> str:
+        """Represent the slow query."""
+        return (
+            f"SlowQuery({self.fingerprint!r}, duration={self.duration:.6f}, "
+            f"rows={self.rows}, server_time={self.server_time})"
+        )
+
+
+class SlowQueryLog:
+    """Record slow queries, and latency per statement fingerprint."""
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        maxlen: int = 1000,
+        sink: Optional[Callable[[SlowQuery], Any]] = None,
+        explain: bool = False,
+        samples: int = 1000,
+        max_fingerprints: int = 1000,
+    ):
+        """
+        # SlowQueryLog.
+
+        Pass the log to a client as `slow_log` to time every query it sends.
+
+        Params:
+            threshold: The seconds after which a query is slow.
+            maxlen: The number of slow queries to keep in memory.
+            sink: Called with every slow query, for example to log it.
+            explain: Capture the plan of slow SELECT statements by running
+                them again with `EXPLAIN`, off the request path.
+            samples: The number of recent durations kept per fingerprint.
+            max_fingerprints: The number of fingerprints to keep, evicting
+                the least recently seen.
+        """
+        self.threshold = threshold
+        self.sink = sink
+        self.explain = explain
+        self._entries: Deque[SlowQuery] = deque(maxlen=maxlen)
+        self._samples = samples
+        self._max_fingerprints = max_fingerprints
+        self._durations: OrderedDict[str, Deque[float]] = OrderedDict()
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __iter__(self) -> Iterator[SlowQuery]:
+        """Iterate over the slow queries, oldest first."""
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        """Get the number of slow queries in the log."""
+        return len(self._entries)
+
+    def observe(self, query: str, duration: float, response: Any = None):
+        """
+        Record how long a query took.
+
+        Args:
+            query: The query that was sent.
+            duration: The seconds the client waited for the response.
+            response: The `httpx.Response`, read only if the query is slow.
+
+        Returns: The SlowQuery recorded, or None if the query was not slow.
+        """
+        key = fingerprint(query)
+        with self._lock:
+            self._aggregate(key, duration)
+
+        if duration < self.threshold:
+            return None
+
+        entry = SlowQuery(query, duration, *_describe(response))
+        self._entries.append(entry)
+        if self.sink is not None:
+            self.sink(entry)
+
+        return entry
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the latency of every fingerprint seen.
+
+        Returns: The `count`, `total`, `p50` and `p99` of each fingerprint,
+            the most time consuming first. Percentiles and totals only
+            cover the most recent samples.
+        """
+        with self._lock:
+            durations = {key: list(values) for key, values in self._durations.items()}
+            counts = dict(self._counts)
+
+        stats = {
+            key: {
+                "count": counts[key],
+                "total": sum(values),
+                "p50": percentile(values, 0.5),
+                "p99": percentile(values, 0.99),
+            }
+            for key, values in durations.items()
+        }
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["total"]))
+
+    def explain_statement(self, entry: SlowQuery) -> Optional[str]:
+        """Build the `EXPLAIN` statement for a slow query, if it has one."""
+        if not self.explain or not _EXPLAINABLE.match(entry.query):
+            return None
+
+        return f"{entry.query.strip().rstrip(';')} EXPLAIN;"
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> None:
+        """Run a function on the log's background thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="slowlog")
+
+        self._executor.submit(func, *args)
+
+    def close(self) -> None:
+        """Wait for plans being captured in the background."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _aggregate(self, key: str, duration: float) -> None:
+        """Add a duration to the fingerprint's samples."""
+        values = self._durations.get(key)
+        if values is None:
+            values = self._durations[key] = deque(maxlen=self._samples)
+            self._counts[key] = 0
+            if len(self._durations) > self._max_fingerprints:
+                evicted, _ = self._durations.popitem(last=False)
+                del self._counts[evicted]
+        else:
+            self._durations.move_to_end(key)
+
+        values.append(duration)
+        self._counts[key] += 1
+
+
+def _cbor_statements(response: Any) -> List[Any]:
+    """Decode the statements of a response in SurrealDB's binary protocol."""
+    try:
+        return cbor.results(response.content)
+    except (ValueError, KeyError, TypeError):
+        return []
+
+
+def _describe(response: Any) -> tuple:
+    """Read the row count and server time of the first statement."""
+    if response is None or response.status_code != 200:
+        return None, None
+
+    try:
+        statements = response.json()
+    except ValueError:
+        statements = _cbor_statements(response)
+
+    result = statements[0].get("result") if statements else None
+    rows = len(result) if isinstance(result, list) else None
+    times = [parse_duration(statement.get("time")) for statement in statements]
+
+    return rows, sum(filter(None, times)) if any(times) else None
@@ -0,0 +1,131 @@
+"""Module to build the SurrealQL statements sent by the clients."""
+from __future__ import annotations
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from surrealdb.deadline import timeout_clause
+from surrealdb.encoder import encode, encode_field
+
+
+Where = Union[str, Mapping[str, Any], None]
+
+
+def encode_path(path: str) -> str:
+    """
+    Encode a field path, escaping each part unless it is a plain identifier.
+
+    >>> encode_path("address.post code")
+    'address.`post code`'
+    """
+    return ".".join(encode_field(part) for part in path.split("."))
+
+
+def where_clause(where: Where) -> str:
+    """
+    Build a `WHERE` clause.
+
+    Args:
+        where: A condition written in SurrealQL, or fields and the values
+            they must equal, encoded as SurrealQL literals.
+
+    Returns: The clause with a leading space, or an empty string.
+
+    >>> where_clause({"name": "Jo", "age": 42})
+    " WHERE name = 'Jo' AND age = 42"
+    """
+    if not where:
+        return ""
+
+    if isinstance(where, str):
+        return f" WHERE {where}"
+
+    conditions = [f"{encode_path(path)} = {encode(v)}" for path, v in where.items()]
+    return f" WHERE {' AND '.join(conditions)}"
+
+
+def order_clause(order_by: Union[str, Sequence[str], None]) -> str:
+    """
+    Build an `ORDER BY` clause.
+
+    Args:
+        order_by: A field path, or several, prefixed with `-` to sort in
+            descending order.
+
+    Returns: The clause with a leading space, or an empty string.
+
+    >>> order_clause(["-age", "name"])
+    ' ORDER BY age DESC, name ASC'
+    """
+    if not order_by:
+        return ""
+
+    if isinstance(order_by, str):
+        order_by = [order_by]
+
+    orders = [
+        (
+            f"{encode_path(path[1:])} DESC"
+            if path.startswith("-")
+            else f"{encode_path(path)} ASC"
+        )
+        for path in order_by
+    ]
+    return f" ORDER BY {', '.join(orders)}"
+
+
+def select(
+    target: str,
+    fields: Optional[Sequence[str]] = None,
+    where: Where = None,
+    order_by: Union[str, Sequence[str], None] = None,
+    limit: Optional[int] = None,
+    start: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Build a `SELECT` statement.
+
+    Args:
+        target: The table or record to select from.
+        fields: The field paths to return. Every field if not set.
+        where: A condition written in SurrealQL, or fields and the values
+            they must equal.
+        order_by: The field paths to sort by, prefixed with `-` to sort in
+            descending order.
+        limit: The number of rows to return at most.
+        start: The number of rows to skip.
+        timeout: The time left, as returned by `remaining`.
+
+    >>> select("users", ["name"], {"age": 42}, "-name", limit=10)
+    'SELECT name from users WHERE age = 42 ORDER BY name DESC LIMIT 10;'
+    """
+    projection = ", ".join(encode_path(path) for path in fields) if fields else "*"
+    query = f"SELECT {projection} from {target}"
+    query += where_clause(where) + order_clause(order_by)
+
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    if start is not None:
+        query += f" START {int(start)}"
+
+    return f"{query}{timeout_clause(timeout)};"
+
+
+def count(target: str, where: Where = None, timeout: Optional[float] = None) -> str:
+    """
+    Build a statement counting the rows of a table on the server.
+
+    >>> count("users", {"age": 42})
+    'SELECT count() FROM users WHERE age = 42 GROUP ALL;'
+    """
+    query = f"SELECT count() FROM {target}{where_clause(where)} GROUP ALL"
+    return f"{query}{timeout_clause(timeout)};"
+
+
+def exists(record_id: str, timeout: Optional[float] = None) -> str:
+    """
+    Build a statement selecting only the id of a record, if it exists.
+
+    >>> exists("users:1")
+    'SELECT id FROM users:1 LIMIT 1;'
+    """
+    return f"SELECT id FROM {record_id} LIMIT 1{timeout_clause(timeout)};"
@@ -0,0 +1,184 @@
+"""Module to parse query responses incrementally."""
+from __future__ import annotations
+import codecs
+import json
+from typing import Any, Dict, List
+
+from surrealdb.error import QueryError
+
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class RowParser:
+    """Parse the rows of a `/sql` response as its bytes arrive."""
+
+    def __init__(self):
+        """
+        # RowParser.
+
+        Feed the parser the body of a `/sql` response in chunks of any size.
+        Each call to `feed` returns the rows of the first statement's result
+        that were completed by the chunk, so neither the full body nor the
+        full result is ever held in memory.
+
+        >>> parser = RowParser()
+        >>> parser.feed(b'[{"status": "OK", "result": [{"id": 1}, {"i')
+        [{'id': 1}]
+        >>> parser.feed(b'd": 2}]}]')
+        [{'id': 2}]
+        >>> parser.close()
+        []
+        """
+        self.statement: Dict[str, Any] = {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = self._array
+        self._key = None
+        self._final = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Parse the next chunk of the response.
+
+        Args:
+            data: The next bytes of the response body.
+
+        Returns: The rows completed by this chunk.
+        Raises: QueryError if the statement failed.
+        """
+        return self._parse(self._text.decode(data))
+
+    def close(self) -> List[Any]:
+        """
+        Parse the end of the response.
+
+        Returns: The rows left in the response.
+        Raises: QueryError if the statement failed or the response ended early.
+        """
+        self._final = True
+        rows = self._parse(self._text.decode(b"", final=True))
+
+        if self._state is not None:
+            raise QueryError(f"Incomplete response: {self._buffer[:100]!r}")
+
+        return rows
+
+    def _parse(self, text: str) -> List[Any]:
+        """Parse as much of the buffered text as is complete."""
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        rows: List[Any] = []
+
+        while self._state is not None and self._state(rows):
+            pass
+
+        return rows
+
+    def _next(self) -> str:
+        """Skip whitespace and commas, and peek at the next character."""
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in (
+            _WHITESPACE + ","
+        ):
+            self._pos += 1
+
+        return self._buffer[self._pos:self._pos + 1]
+
+    def _value(self) -> Any:
+        """Decode the next complete JSON value, or return `self` if incomplete."""
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._final:
+                raise QueryError(f"Malformed response: {self._buffer[:100]!r}")
+            return self
+
+        if end == len(self._buffer) and not self._final:
+            return self
+
+        self._pos = end
+        return value
+
+    def _expect(self, char: str, state: Any) -> bool:
+        """Consume `char`, and move to `state`, once it is available."""
+        found = self._next()
+        if not found:
+            return False
+        if found != char:
+            raise QueryError(f"Malformed response: expected {char!r}, got {found!r}")
+
+        self._pos += 1
+        self._state = state
+        return True
+
+    def _array(self, _: List[Any]) -> bool:
+        return self._expect("[", self._object)
+
+    def _object(self, _: List[Any]) -> bool:
+        return self._expect("{", self._field)
+
+    def _field(self, _: List[Any]) -> bool:
+        found = self._next()
+        if found == "}":
+            self._pos += 1
+            self._state = None
+            self._check()
+            return False
+
+        key = self._value() if found else self
+        if key is self:
+            return False
+
+        self._key = key
+        self._state = self._colon
+        return True
+
+    def _colon(self, _: List[Any]) -> bool:
+        return self._expect(":", self._field_value)
+
+    def _field_value(self, rows: List[Any]) -> bool:
+        found = self._next()
+        is_rows = self._key == "result" and not self._failed()
+        if is_rows and found == "[":
+            self._pos += 1
+            self._state = self._row
+            return True
+
+        value = self._value() if found else self
+        if value is self:
+            return False
+
+        if is_rows:
+            rows.append(value)
+        else:
+            self.statement[self._key] = value
+            if self._key == "result":
+                self._check()
+
+        self._state = self._field
+        return True
+
+    def _row(self, rows: List[Any]) -> bool:
+        found = self._next()
+        if found == "]":
+            self._pos += 1
+            self._state = self._field
+            return True
+
+        row = self._value() if found else self
+        if row is self:
+            return False
+
+        rows.append(row)
+        return True
+
+    def _failed(self) -> bool:
+        """Check whether the statement is known to have failed."""
+        return self.statement.get("status", "OK") != "OK"
+
+    def _check(self) -> None:
+        """Raise the statement's error once it is known."""
+        if self._failed():
+            raise QueryError([self.statement])
@@ -1,10 +1,48 @@
 """Module to manage a SurrealDB database."""
 from __future__ import annotations
-from typing import Any, List, Optional
+import copy
+import functools
+import itertools
+import threading
+import time
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
 
 import httpx
 
-from surrealdb.error import AuthenticationError, QueryError
+from surrealdb import auth, bulk, cbor, graph, statement, vector
+from surrealdb import ids as idgen
+from surrealdb.deadline import remaining, timed_out, timeout_clause
+from surrealdb.encoder import encode_assignments, encode_rows
+from surrealdb.error import (
+    AuthenticationError,
+    DeadlineExceeded,
+    QueryError,
+    SurrealError,
+)
+from surrealdb.hedge import HedgePolicy, first_answer
+from surrealdb.mirror import Mirror
+from surrealdb.reference import Reference
+from surrealdb.singleflight import Group, is_read_only
+from surrealdb.slowlog import SlowQuery, SlowQueryLog
+from surrealdb.statement import Where
+from surrealdb.stream import RowParser
+
+
+# Enough threads for httpx's default connection limit, so concurrent reads
+# do not queue behind each other for a worker.
+_HEDGE_WORKERS = 100
 
 
 class SurrealDB:
@@ -16,7 +54,13 @@ class SurrealDB:
         password: Optional[str] = "",
         namespace: Optional[str] = "",
         database: Optional[str] = "",
-        url: Optional[str] = "http://localhost:8000/sql",
+        url: Union[str, Sequence[str]] = "http://localhost:8000/sql",
+        coalesce: bool = False,
+        slow_log: Optional[SlowQueryLog] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        hedge: Optional[HedgePolicy] = None,
+        id_generator: Optional[idgen.IdGenerator] = None,
+        protocol: str = "json",
     ) -> SurrealDB:
         """
         # SurrealDB.
@@ -28,11 +72,31 @@ class SurrealDB:
             password: The password to use for authentication.
             namespace: The namespace to use.
             database: The database to use.
-            url: The URL to the SurrealDB instance.
+            url: The URL to the SurrealDB instance, or the URLs of several
+                nodes of a cluster. Requests go to the first URL, and
+                hedged reads to the others.
+            coalesce: Share one request between identical concurrent read
+                queries sent to the same namespace and database.
+            slow_log: Time every query, and record those that are slow.
+            transport: The httpx transport to send requests with, for
+                example to size the connection pool.
+            hedge: Send read queries that are slow to answer again to
+                another URL, and use the first answer.
+            id_generator: Generates the ids of new records on the client,
+                such as `ids.ulid`, so that their ids are known before
+                they are created.
+            protocol: The wire format of queries and results, either
+                `json`, or `cbor` for SurrealDB's binary protocol, which
+                is sent to the `/rpc` endpoint next to each URL's `/sql`
+                and keeps the types of record ids, datetimes, decimals,
+                UUIDs and bytes.
 
         Params other than url are optional. You can set them later
         using the `signin`, and `use` methods.
         """
+        if protocol not in ("json", "cbor"):
+            raise ValueError(f"Unknown protocol {protocol!r}, use json or cbor.")
+
         self.headers = {
             "Content-Type": "application/json",
             "NS": namespace,
@@ -41,8 +105,26 @@ class SurrealDB:
         self._client = httpx.Client(
             auth=(username, password),
             headers=self.headers,
+            transport=transport,
+        )
+        self.protocol = protocol
+        self.urls = [url] if isinstance(url, str) else list(url)
+        if protocol == "cbor":
+            self.urls = [auth.endpoint(url, "rpc") for url in self.urls]
+        self.url = self.urls[0]
+        self._token: Optional[auth.Token] = None
+        self._token_lock = threading.Lock()
+        self.slow_log = slow_log
+        self._owner = True
+        self._flights = Group() if coalesce else None
+        self.hedge = hedge
+        self.id_generator = id_generator
+        self._hedge_urls = itertools.cycle(self.urls[1:] or self.urls)
+        self._hedge_pool = (
+            ThreadPoolExecutor(_HEDGE_WORKERS, thread_name_prefix="hedge")
+            if hedge
+            else None
         )
-        self.url = url
 
     def __enter__(self):
         """Enter the context manager."""
@@ -52,25 +134,102 @@ class SurrealDB:
         """Exit the context manager."""
         self.close()
 
-    def signin(self, username: str, password: str) -> None:
+    def signin(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        namespace: Optional[str] = None,
+        database: Optional[str] = None,
+        scope: Optional[str] = None,
+        **variables: Any,
+    ) -> None:
         """
         Sign in to a SurrealDB instance.
 
+        Calls the `/signin` endpoint and sends the returned token with
+        every following request, renewing it shortly before it expires.
+        Pass only a username and password to sign in as a root user, add
+        a namespace, and database, to sign in as a namespace or database
+        user, or a namespace, database and scope to sign in as a scope
+        user with the variables the scope expects.
+
         Args:
             username: The username to use for authentication.
             password: The password to use for authentication.
+            namespace: The namespace the user belongs to.
+            database: The database the user belongs to.
+            scope: The scope the user belongs to.
+            variables: Extra variables for the scope's SIGNIN clause.
+
+        Raises: AuthenticationError if the credentials are rejected.
         """
-        self._client.auth = (username, password)
+        payload = auth.credentials(
+            username, password, namespace, database, scope, **variables
+        )
+        self._authenticate("signin", payload)
 
-    def signup(self, username: str, password: str) -> None:
+    def signup(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        namespace: Optional[str] = None,
+        database: Optional[str] = None,
+        scope: Optional[str] = None,
+        **variables: Any,
+    ) -> None:
         """
-        Sign up to a SurrealDB instance.
+        Sign up to a SurrealDB scope.
+
+        Calls the `/signup` endpoint and sends the returned token with
+        every following request, renewing it shortly before it expires.
 
         Args:
-            username: The username to use for authentication.
-            password: The password to use for authentication.
+            username: Sent to the scope as the `user` variable.
+            password: Sent to the scope as the `pass` variable.
+            namespace: The namespace of the scope.
+            database: The database of the scope.
+            scope: The scope to sign up to.
+            variables: Extra variables for the scope's SIGNUP clause.
+
+        Raises: AuthenticationError if the signup is rejected.
         """
-        self._client.auth = (username, password)
+        payload = auth.credentials(
+            username, password, namespace, database, scope, **variables
+        )
+        self._authenticate("signup", payload)
+
+    def _authenticate(self, action: str, payload: Dict[str, Any]) -> None:
+        """Exchange credentials for a token and use it for every request."""
+        response = self._client.post(
+            url=auth.endpoint(self.url, action),
+            json=payload,
+            headers={"Accept": "application/json"},
+        )
+        token = auth.parse(response)
+
+        if token is None:
+            self._token = None
+            self._client.headers.pop("Authorization", None)
+            self._client.auth = (payload.get("user", ""), payload.get("pass", ""))
+            return
+
+        if self._token is None:
+            self._token = auth.Token(token, payload)
+        else:
+            self._token.payload = payload
+            self._token.renew(token)
+
+        self._client.auth = None
+        self._client.headers["Authorization"] = self._token.header
+
+    def _refresh(self) -> None:
+        """Renew the session token if it is about to expire."""
+        if self._token is None or not self._token.expiring():
+            return
+
+        with self._token_lock:
+            if self._token.expiring():
+                self._authenticate("signin", self._token.payload)
 
     def use(self, namespace: str, database: str) -> None:
         """
@@ -82,14 +241,77 @@ class SurrealDB:
         """
         self.headers["NS"] = namespace
         self.headers["DB"] = database
-        self._client.headers = self.headers
 
-    def query(self, query: str) -> List[Any] | None:
+    def tenant(self, namespace: str, database: str) -> SurrealDB:
+        """
+        Get a view of the client scoped to another namespace and database.
+
+        The view shares the connection pool, authentication, and every
+        other setting of the client, but sends its own namespace and
+        database, so many tenants can be served concurrently from a single
+        client. Closing the view leaves the client open.
+
+        Args:
+            namespace: The namespace the view uses.
+            database: The database the view uses.
+
+        Returns: The view, which has the same methods as the client.
+
+        >>> db = SurrealDB()
+        >>> acme = db.tenant("acme", "app")
+        >>> acme.select("users")
+        """
+        view = copy.copy(self)
+        view.headers = {**self.headers, "NS": namespace, "DB": database}
+        view._owner = False
+        return view
+
+    def _scope(self) -> Dict[str, str]:
+        """Get the namespace, database and protocol headers of every request."""
+        scope = {"NS": self.headers["NS"], "DB": self.headers["DB"]}
+        return {**cbor.HEADERS, **scope} if self.protocol == "cbor" else scope
+
+    def _encode(self, query: str) -> str | bytes:
+        """Encode SurrealQL as the body of a request, in the client's protocol."""
+        return cbor.request(query) if self.protocol == "cbor" else query
+
+    def _decode(self, response: httpx.Response) -> Any:
+        """Decode the body of a response, unless the server answered in JSON."""
+        content_type = response.headers.get("Content-Type", "")
+        if self.protocol == "cbor" and content_type.startswith("application/cbor"):
+            return cbor.results(response.content)
+
+        return response.json()
+
+    def query(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        namespace: Optional[str] = None,
+        database: Optional[str] = None,
+    ) -> List[Any] | None:
         """
         Execute a SurrealQL statement.
 
+        Identical read queries are coalesced into a single request when
+        the client was created with `coalesce=True`. With a `hedge`
+        policy and several URLs, slow reads are sent to a second node.
+
+        Args:
+            query: The SurrealQL statement to execute.
+            timeout: The number of seconds to wait for a response. The
+                ambient `deadline`, if sooner, takes precedence. It bounds
+                each step of the request, connecting, sending and every
+                read, rather than the request as a whole.
+            namespace: The namespace to run the statement in, instead of
+                the client's, for this call only.
+            database: The database to run the statement in, instead of
+                the client's, for this call only.
+
         Returns: A list of dictionaries representing rows in the database.
-        Raises: SurrealError if the query fails.
+        Raises:
+            DeadlineExceeded: If the timeout or deadline passes.
+            SurrealError: If the query fails.
 
         >>> db = SurrealDB()
         >>> db.query("SELECT * FROM users;")
@@ -98,22 +320,253 @@ class SurrealDB:
             {'id': 2, 'name': 'Jane Doe', 'age': 36},
         ]
         """
-        response = self._client.post(url=self.url, data=query)
+        if namespace is not None or database is not None:
+            view = self.tenant(
+                self.headers["NS"] if namespace is None else namespace,
+                self.headers["DB"] if database is None else database,
+            )
+            return view.query(query, timeout)
+
+        timeout = remaining(timeout)
+
+        if self._flights is not None and is_read_only(query):
+            key = (query, self.headers["NS"], self.headers["DB"])
+            return self._flights.do(key, self._execute, query, timeout, timeout=timeout)
+
+        return self._execute(query, timeout)
 
-        if response.status_code == 200 and response.json()[0]["status"] == "OK":
-            return response.json()[0].get("result", [])
+    def _execute(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+    ) -> List[Any] | None:
+        """Send a SurrealQL statement and return the first result."""
+        if self.hedge is not None and len(self.urls) > 1 and is_read_only(query):
+            response = self._hedged(query, timeout)
+        else:
+            response = self._post(query, timeout)
+
+        results = self._decode(response)
+        if response.status_code == 200 and results[0]["status"] == "OK":
+            return results[0].get("result", [])
 
         if response.status_code == 403:
-            raise AuthenticationError(response.json())
+            raise AuthenticationError(results)
 
-        raise QueryError(response.json())
+        raise QueryError(results)
+
+    def _hedged(self, query: str, timeout: Optional[float]) -> httpx.Response:
+        """
+        Send a read, and send it again to another node if it is slow.
 
-    def select(self, target: str) -> List[Any]:
+        The hedging delay, and the latency observed, are counted from when
+        the first request starts running, so a read waiting for a worker
+        thread is never taken for a slow one.
         """
-        Select all rows from a table.
+        delay = self.hedge.threshold()
+        started: List[float] = []
+
+        if delay is None:
+            started.append(time.perf_counter())
+            response = self._post(query, timeout)
+        else:
+            running = threading.Event()
+
+            def post() -> httpx.Response:
+                started.append(time.perf_counter())
+                running.set()
+                return self._post(query, timeout)
+
+            first = self._hedge_pool.submit(post)
+            first.add_done_callback(lambda _: running.set())
+            running.wait()
+            done, _ = futures.wait([first], timeout=delay)
+
+            if done or not self.hedge.allow():
+                response = first.result()
+            else:
+                url = next(self._hedge_urls)
+                second = self._hedge_pool.submit(self._post, query, timeout, url)
+                response = first_answer([first, second])
+
+        self.hedge.observe(time.perf_counter() - started[0])
+        return response
+
+    def _post(
+        self,
+        query: str,
+        timeout: Optional[float],
+        url: Optional[str] = None,
+    ) -> httpx.Response:
+        """Send SurrealQL to the server, raising DeadlineExceeded on timeout."""
+        self._refresh()
+        started = time.perf_counter()
+
+        try:
+            response = self._client.post(
+                url=url or self.url,
+                content=self._encode(query),
+                headers=self._scope(),
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+            )
+        except httpx.TimeoutException as error:
+            raise timed_out(timeout, error) from error
+
+        if self.slow_log is not None:
+            self._observe(query, time.perf_counter() - started, response)
+
+        return response
+
+    def _observe(self, query: str, duration: float, response: httpx.Response):
+        """Record a query in the slow query log, explaining it if it is slow."""
+        entry = self.slow_log.observe(query, duration, response)
+        statement = entry and self.slow_log.explain_statement(entry)
+
+        if statement:
+            self.slow_log.submit(self._explain, entry, statement)
+
+    def _explain(self, entry: SlowQuery, statement: str) -> None:
+        """Capture the plan of a slow query."""
+        response = self._client.post(
+            url=self.url, content=self._encode(statement), headers=self._scope()
+        )
+        if response.status_code == 200:
+            entry.plan = self._decode(response)[0].get("result")
+
+    def batch(
+        self,
+        *statements: str,
+        timeout: Optional[float] = None,
+        transaction: bool = False,
+    ) -> List[Any]:
+        """
+        Execute several SurrealQL statements in a single request.
+
+        Args:
+            statements: The SurrealQL statements to execute.
+            timeout: The number of seconds to wait for a response. The
+                ambient `deadline`, if sooner, takes precedence. It bounds
+                each step of the request, as in `query`.
+            transaction: Run the statements in a single transaction, so
+                either all of them or none of them take effect.
+
+        Returns: The result of each statement, in order.
+        Raises:
+            DeadlineExceeded: If the timeout or deadline passes.
+            SurrealError: If any of the statements fail.
+
+        >>> db = SurrealDB()
+        >>> db.batch("SELECT * FROM users:1", "SELECT count() FROM users GROUP ALL")
+        [
+            [{'id': 1, 'name': 'John Doe', 'age': 42}],
+            [{'count': 2}],
+        ]
+        """
+        query = "".join(
+            f"{statement.rstrip().rstrip(';')};" for statement in statements
+        )
+        if transaction:
+            query = f"BEGIN TRANSACTION;{query}COMMIT TRANSACTION;"
+
+        response = self._post(query, remaining(timeout))
+
+        if response.status_code == 403:
+            raise AuthenticationError(self._decode(response))
+
+        results = self._decode(response)
+        if response.status_code != 200 or any(
+            result["status"] != "OK" for result in results
+        ):
+            raise QueryError(results)
+
+        return [result.get("result", []) for result in results]
+
+    def stream(self, query: str, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Execute a SurrealQL statement and stream the rows of its result.
+
+        The response is parsed as it is read, and each row is yielded as
+        soon as it is complete, so neither the full response body nor the
+        full list of rows is held in memory. The request is sent when
+        iteration starts.
+
+        With the `cbor` protocol, the whole result is read first.
+
+        Args:
+            query: The SurrealQL statement to execute.
+            timeout: The number of seconds the whole response may take. The
+                ambient `deadline`, if sooner, takes precedence.
+
+        Yields: Dictionaries representing rows in the database.
+        Raises:
+            DeadlineExceeded: If the timeout or deadline passes.
+            SurrealError: If the query fails.
+
+        >>> db = SurrealDB()
+        >>> for row in db.stream("SELECT * FROM events;"):
+        ...     process(row)
+        """
+        if self.protocol == "cbor":
+            yield from self.query(query, timeout) or []
+            return
+
+        timeout = remaining(timeout)
+        stop = None if timeout is None else time.monotonic() + timeout
+        self._refresh()
+
+        try:
+            with self._client.stream(
+                "POST",
+                self.url,
+                content=query,
+                headers=self._scope(),
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+            ) as response:
+                if response.status_code != 200:
+                    response.read()
+                    raise (
+                        AuthenticationError
+                        if response.status_code == 403
+                        else QueryError
+                    )(self._decode(response))
+
+                parser = RowParser()
+                for chunk in response.iter_bytes():
+                    yield from parser.feed(chunk)
+                    if stop is not None and time.monotonic() > stop:
+                        raise DeadlineExceeded(f"Query timed out after {timeout}s.")
+
+                yield from parser.close()
+        except httpx.TimeoutException as error:
+            raise timed_out(timeout, error) from error
+
+    def select(
+        self,
+        target: str,
+        fields: Optional[Sequence[str]] = None,
+        where: Where = None,
+        order_by: Union[str, Sequence[str], None] = None,
+        limit: Optional[int] = None,
+        start: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """
+        Select rows from a table.
+
+        Only the requested fields of the requested rows are sent back, so
+        narrowing the selection shrinks the response.
 
         Args:
-            target: The table to select from.
+            target: The table, or record, to select from.
+            fields: The field paths to return. Every field if not set.
+            where: A condition written in SurrealQL, or fields and the
+                values they must equal, encoded as SurrealQL literals.
+            order_by: The field paths to sort by, prefixed with `-` to sort
+                in descending order.
+            limit: The number of rows to return at most.
+            start: The number of rows to skip.
+            timeout: The number of seconds the query may take, sent to the
+                server as a `TIMEOUT` clause.
 
         Returns: A list of dictionaries representing rows in the database.
         Raises: SurrealError if the query fails.
@@ -124,23 +577,78 @@ class SurrealDB:
             {'id': 1, 'name': 'John Doe', 'age': 42},
             {'id': 2, 'name': 'Jane Doe', 'age': 36},
         ]
+        >>> db.select("users", fields=["name"], where={"age": 42}, limit=1)
+        [{'name': 'John Doe'}]
+        """
+        timeout = remaining(timeout)
+        query = statement.select(target, fields, where, order_by, limit, start, timeout)
+        return self.query(query, timeout)
+
+    def count(
+        self,
+        target: str,
+        where: Where = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """
+        Count the rows of a table on the server.
+
+        Args:
+            target: The table to count the rows of.
+            where: A condition written in SurrealQL, or fields and the
+                values they must equal.
+            timeout: The number of seconds the query may take, sent to the
+                server as a `TIMEOUT` clause.
+
+        Returns: The number of rows.
+        Raises: SurrealError if the query fails.
+
+        >>> db = SurrealDB()
+        >>> db.count("users", where="age > 40")
+        1
         """
-        query = f"SELECT * from {target};"
-        return self.query(query)
+        timeout = remaining(timeout)
+        rows = self.query(statement.count(target, where, timeout), timeout)
+        return rows[0]["count"] if rows else 0
+
+    def exists(self, record_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        Check whether a record exists, without fetching it.
+
+        Args:
+            record_id: The id of the record.
+            timeout: The number of seconds the query may take, sent to the
+                server as a `TIMEOUT` clause.
+
+        Returns: Whether the record exists.
+        Raises: SurrealError if the query fails.
+
+        >>> db = SurrealDB()
+        >>> db.exists("users:1")
+        True
+        """
+        timeout = remaining(timeout)
+        return bool(self.query(statement.exists(record_id, timeout), timeout))
 
     def create(self, target: str, **kwargs: Any) -> List[Any]:
         """
         Create a new row in a table.
 
         Args:
-            target: The table to insert into.
+            target: The table to insert into, or the id of the record. A
+                table is given an id from the client's `id_generator`,
+                if it has one.
             kwargs: The values to insert.
                 Key: The column name.
-                Value: The value to insert.
+                Value: The value to insert, encoded as a SurrealQL literal.
+
+        The ambient `deadline`, if any, is sent to the server as a
+        `TIMEOUT` clause.
 
         Returns: A list of dictionaries representing rows in the database.
         Raises:
             ValueError: If no values are provided.
+            TypeError: If a value cannot be encoded.
             SurrealError: If the query fails.
 
         >>> db = SurrealDB()
@@ -150,9 +658,90 @@ class SurrealDB:
         if not kwargs:
             raise ValueError("Must set at least one value.")
 
-        query = self.__append_kwargs(f"CREATE {target} SET ", **kwargs)
+        timeout = remaining()
+        target = idgen.record_target(target, self.id_generator)
+        query = f"CREATE {target} SET {encode_assignments(kwargs)}"
+
+        return self.query(f"{query}{timeout_clause(timeout)};", timeout)
+
+    def create_many(
+        self,
+        table: str,
+        rows: Iterable[Mapping[str, Any]],
+        timeout: Optional[float] = None,
+    ) -> List[Reference]:
+        """
+        Create many rows in a single `INSERT` statement.
+
+        Rows without an `id` are given one from the client's
+        `id_generator`, so references to every row are known without
+        reading the rows back.
 
-        return self.query(f"{query};")
+        Args:
+            table: The table to insert into.
+            rows: The rows to insert, encoded as SurrealQL literals.
+            timeout: The number of seconds to wait for a response.
+
+        Returns: A reference to each row, in order.
+        Raises:
+            ValueError: If a row has no id, and there is no `id_generator`.
+            TypeError: If a value cannot be encoded.
+            SurrealError: If the query fails.
+
+        >>> db = SurrealDB(id_generator=ids.ulid)
+        >>> db.create_many("users", [{"name": "John"}, {"name": "Jane"}])
+        [Reference('users', '01HF7YAT2Z...'), Reference('users', '01HF7YAT30...')]
+        """
+        references, rows = idgen.assign(table, rows, self.id_generator)
+        if not rows:
+            return []
+
+        timeout = remaining(timeout)
+        query = f"INSERT INTO {table} {encode_rows(rows)}"
+        self.query(f"{query}{timeout_clause(timeout)};", timeout)
+
+        return references
+
+    def reserve_ids(self, sequence: str, count: int) -> idgen.SequenceBlock:
+        """
+        Reserve a block of integer ids from a sequence counter on the server.
+
+        Clients never receive overlapping blocks, so the ids can be handed
+        out without further requests. Pass the block as an `id_generator`.
+
+        Args:
+            sequence: The name of the sequence counter.
+            count: The number of ids to reserve.
+
+        Returns: The block of ids.
+        Raises:
+            ValueError: If count is less than 1.
+            SurrealError: If the query fails.
+
+        >>> db = SurrealDB()
+        >>> db.reserve_ids("users", 100)
+        SequenceBlock(1, 101)
+        """
+        rows = self.query(idgen.reserve_statement(sequence, count))
+        return idgen.block(rows, count)
+
+    def sequence(self, name: str, block_size: int = 1000) -> idgen.Sequence:
+        """
+        Generate integer ids from a sequence counter on the server.
+
+        Ids are reserved `block_size` at a time, so only one request is
+        made per block. Pass the sequence as an `id_generator`.
+
+        Args:
+            name: The name of the sequence counter.
+            block_size: The number of ids reserved per request.
+
+        >>> db = SurrealDB()
+        >>> db.id_generator = db.sequence("users")
+        >>> db.create("users", name="John Doe")
+        [{'id': 'users:1001', 'name': 'John Doe'}]
+        """
+        return idgen.Sequence(functools.partial(self.reserve_ids, name), block_size)
 
     def change(self, target: str, **kwargs: Any) -> List[Any]:
         """
@@ -162,11 +751,15 @@ class SurrealDB:
             target: The table to update.
             kwargs: The values to update.
                 Key: The column name.
-                Value: The value to update.
+                Value: The value to update, encoded as a SurrealQL literal.
+
+        The ambient `deadline`, if any, is sent to the server as a
+        `TIMEOUT` clause.
 
         Returns: A list of dictionaries representing rows in the database.
         Raises:
             ValueError: If no values are provided.
+            TypeError: If a value cannot be encoded.
             SurrealError: If the query fails.
 
         >>> db = SurrealDB()
@@ -178,17 +771,125 @@ class SurrealDB:
         if not kwargs:
             raise ValueError("Must update at least one value.")
 
-        query = self.__append_kwargs(f"UPDATE {target} SET ", **kwargs)
+        timeout = remaining()
+        query = f"UPDATE {target} SET {encode_assignments(kwargs)}"
+
+        return self.query(f"{query}{timeout_clause(timeout)};", timeout)
+
+    def change_many(
+        self,
+        ids: Iterable[str | Reference],
+        chunk_size: int = bulk.CHUNK_SIZE,
+        **kwargs: Any,
+    ) -> List[bulk.ChunkResult]:
+        """
+        Set the same values on many records.
 
-        return self.query(f"{query};")
+        The ids are split into chunks of `chunk_size`, each updated by a
+        single `UPDATE [ids] SET` statement, with chunks sent one after the other.
 
-    def delete(self, target: str, where: str = None) -> List[Any]:
+        Args:
+            ids: The ids of the records to update.
+            chunk_size: The number of records updated per request.
+            kwargs: The values to update.
+                Key: The column name.
+                Value: The value to update, encoded as a SurrealQL literal.
+
+        Returns: The outcome of each chunk. A failed chunk holds its error,
+            and none of its records were updated.
+        Raises:
+            ValueError: If no values are provided.
+            TypeError: If a value cannot be encoded.
+
+        >>> db = SurrealDB()
+        >>> db.change_many(["users:1", "users:2"], active=False)
+        [ChunkResult(ids=['users:1', 'users:2'], error=None)]
+        """
+        if not kwargs:
+            raise ValueError("Must update at least one value.")
+
+        return self._bulk(bulk.change(ids, kwargs, chunk_size))
+
+    def merge_many(
+        self,
+        patches: Mapping[str | Reference, Mapping[str, Any]],
+        chunk_size: int = bulk.CHUNK_SIZE,
+    ) -> List[bulk.ChunkResult]:
+        """
+        Merge a different patch into each of many records.
+
+        The records are split into chunks of `chunk_size`, each sent as one
+        request of `UPDATE id MERGE` statements in a single transaction,
+        with chunks sent one after the other.
+
+        Args:
+            patches: The fields to merge into each record.
+                Key: The id of the record.
+                Value: The fields to set, encoded as SurrealQL literals.
+            chunk_size: The number of records updated per request.
+
+        Returns: The outcome of each chunk. A failed chunk holds its error,
+            and none of its records were updated.
+        Raises: TypeError if a value cannot be encoded.
+
+        >>> db = SurrealDB()
+        >>> db.merge_many({"users:1": {"age": 43}, "users:2": {"age": 37}})
+        [ChunkResult(ids=['users:1', 'users:2'], error=None)]
+        """
+        return self._bulk(bulk.merge(patches, chunk_size))
+
+    def delete_many(
+        self,
+        ids: Iterable[str | Reference],
+        chunk_size: int = bulk.CHUNK_SIZE,
+    ) -> List[bulk.ChunkResult]:
+        """
+        Delete many records.
+
+        The ids are split into chunks of `chunk_size`, each deleted by a
+        single `DELETE [ids]` statement, with chunks sent one after the other.
+
+        Args:
+            ids: The ids of the records to delete.
+            chunk_size: The number of records deleted per request.
+
+        Returns: The outcome of each chunk. A failed chunk holds its error,
+            and none of its records were deleted.
+
+        >>> db = SurrealDB()
+        >>> db.delete_many(["users:1", "users:2"])
+        [ChunkResult(ids=['users:1', 'users:2'], error=None)]
+        """
+        return self._bulk(bulk.delete(ids, chunk_size))
+
+    def _bulk(self, plans: Iterable[bulk.Plan]) -> List[bulk.ChunkResult]:
+        """Send the statements of every chunk, one chunk after the other."""
+        return [self._chunk(ids, statements) for ids, statements in plans]
+
+    def _chunk(self, ids: List[str], statements: List[str]) -> bulk.ChunkResult:
+        """Send the statements of a chunk, and catch the error if they fail."""
+        try:
+            self.batch(*statements, transaction=len(statements) > 1)
+        except (SurrealError, httpx.HTTPError) as error:
+            return bulk.ChunkResult(ids, error)
+
+        return bulk.ChunkResult(ids)
+
+    def delete(
+        self,
+        target: str,
+        where: Where = None,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
         """
         ## Delete an entity from the database.
 
         Args:
             target: The entity to delete. Can be a row id or a table name.
-            where: A condition to filter the rows to delete.
+            where: A condition written in SurrealQL, or fields and the
+                values they must equal, to filter the rows to delete.
+            timeout: The number of seconds the query may take, sent to the
+                server as a `TIMEOUT` clause.
 
         Returns: A list of dictionaries representing rows in the database.
         Raises: SurrealError if the query fails.
@@ -229,23 +930,205 @@ class SurrealDB:
         >>> db.select("users")
         []
         """
-        query = f"DELETE {target} "
+        timeout = remaining(timeout)
+        query = f"DELETE {target}{statement.where_clause(where)}"
+
+        return self.query(f"{query}{timeout_clause(timeout)};", timeout)
+
+    def insert_vectors(
+        self,
+        table: str,
+        vectors: Iterable[vector.Vector],
+        record_ids: Optional[Sequence[Any]] = None,
+        field: str = "embedding",
+        chunk_size: int = vector.CHUNK_SIZE,
+        timeout: Optional[float] = None,
+    ) -> List[Reference]:
+        """
+        Insert vector embeddings, many per statement.
+
+        Vectors can be NumPy arrays, `array.array` or sequences of numbers,
+        or the rows of a two-dimensional NumPy array. They are encoded as
+        compact arrays of numbers, and inserted by multi-row `INSERT`
+        statements of `chunk_size` vectors, sent one after the other.
+
+        Args:
+            table: The table to insert into.
+            vectors: The vectors to insert.
+            record_ids: The id of each vector's record. Generated by the
+                client's `id_generator` if not set.
+            field: The field to store the vectors in.
+            chunk_size: The number of vectors inserted per statement.
+            timeout: The number of seconds to wait for each response.
+
+        Returns: A reference to each vector's record, in order.
+        Raises:
+            ValueError: If there is no id for every vector, or a vector
+                is not one-dimensional or holds infinite or NaN values.
+            SurrealError: If the query fails.
+
+        >>> db = SurrealDB()
+        >>> db.insert_vectors("docs", numpy.random.rand(2, 384), ["a", "b"])
+        [Reference('docs', 'a'), Reference('docs', 'b')]
+        """
+        vectors = list(vectors)
+        references = vector.references(
+            table, len(vectors), record_ids, self.id_generator
+        )
+        timeout = remaining(timeout)
+        statements = vector.insert(
+            table, references, vectors, field, chunk_size, timeout
+        )
+        for query in statements:
+            self.query(query, timeout)
+
+        return references
+
+    def knn(
+        self,
+        table: str,
+        queries: Iterable[vector.Vector],
+        k: int = 10,
+        field: str = "embedding",
+        ef: Optional[int] = None,
+        metric: Optional[str] = None,
+        where: Where = None,
+        timeout: Optional[float] = None,
+    ) -> List[vector.Neighbours]:
+        """
+        Find the nearest neighbours of many query vectors, in one request.
+
+        Uses the `<|k|>` operator, which searches the vector index of the
+        field, or every record when `metric` is set.
+
+        Args:
+            table: The table to search.
+            queries: The query vectors.
+            k: The number of neighbours to find for each query vector.
+            field: The field holding the vectors.
+            ef: The size of the candidate list searched in an HNSW index.
+            metric: The distance metric of a brute force search, such as
+                `EUCLIDEAN` or `COSINE`.
+            where: A condition written in SurrealQL, or fields and the
+                values they must equal, that neighbours must match.
+            timeout: The number of seconds to wait for a response.
+
+        Returns: The ids and distances of the neighbours of each query
+            vector, in order, closest first.
+        Raises:
+            ValueError: If a query vector is not one-dimensional or holds
+                infinite or NaN values.
+            SurrealError: If the query fails.
+
+        >>> db = SurrealDB()
+        >>> db.knn("docs", [query], k=2)
+        [Neighbours(ids=['docs:a', 'docs:b'], distances=array('d', [0.1, 0.4]))]
+        """
+        timeout = remaining(timeout)
+        statements = vector.knn(table, queries, k, field, ef, metric, where, timeout)
+        if not statements:
+            return []
+
+        return vector.neighbours(self.batch(*statements, timeout=timeout))
+
+    def relate_many(
+        self,
+        table: str,
+        edges: Iterable[graph.Edge],
+        chunk_size: int = bulk.CHUNK_SIZE,
+    ) -> List[bulk.ChunkResult]:
+        """
+        Create many graph edges.
+
+        The edges are split into chunks of `chunk_size`, each sent as one
+        request of `RELATE` statements in a single transaction, with
+        chunks sent one after the other.
 
-        if where:
-            query += f"WHERE {where}"
+        Args:
+            table: The edge table.
+            edges: The record each edge goes from, the record it goes to,
+                and optionally the fields to set on the edge, encoded as
+                SurrealQL literals.
+            chunk_size: The number of edges created per request.
+
+        Returns: The outcome of each chunk, with its edges written as graph
+            paths. A failed chunk holds its error, and none of its edges
+            were created.
+        Raises: TypeError if a value cannot be encoded.
+
+        >>> db = SurrealDB()
+        >>> db.relate_many("knows", [("users:1", "users:2", {"since": 2020})])
+        [ChunkResult(ids=['users:1->knows->users:2'], error=None)]
+        """
+        return self._bulk(graph.relate(table, edges, chunk_size))
 
-        return self.query(f"{query};")
+    def traverse(
+        self,
+        starts: Iterable[graph.Node],
+        path: str,
+        depth: int = 1,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Walk a graph path from many records, in one request.
 
-    @staticmethod
-    def __append_kwargs(query: str, **kwargs: Any) -> str:
-        """Convert keyword arguments to a SurrealQL statement."""
-        for key, value in kwargs.items():
-            if isinstance(value, str):
-                value = f"'{value}'"
-            query += f"{key} = {value}, "
+        Args:
+            starts: The records to start from.
+            path: The path of one hop, such as `->knows->users`.
+            depth: The number of hops to follow.
+            fields: The field paths of the records reached to return.
+                Every field if not set.
+            limit: The number of records returned per hop and start
+                record, at most.
+            timeout: The number of seconds to wait for a response.
 
-        return query[:-2]
+        Returns: The records reached at each hop, without repeats within
+            a hop, by start record id.
+        Raises:
+            ValueError: If the path does not start with `->` or `<-`, or
+                depth is less than 1.
+            SurrealError: If the query fails.
+
+        >>> db = SurrealDB()
+        >>> db.traverse(["users:1"], "->knows->users", depth=2, fields=["id"])
+        {'users:1': [[{'id': 'users:2'}], [{'id': 'users:3'}]]}
+        """
+        starts = list(starts)
+        if not starts:
+            return {}
+
+        timeout = remaining(timeout)
+        query = graph.traverse(starts, path, depth, fields, limit, timeout)
+        return graph.hops(self.query(query, timeout), depth)
+
+    def mirror(
+        self,
+        table: str,
+        indexes: Sequence[str] = (),
+        interval: float = 60.0,
+    ) -> Mirror:
+        """
+        Mirror a small table in memory, kept up to date with its change feed.
+
+        Args:
+            table: The table to mirror, defined with a `CHANGEFEED`.
+            indexes: The fields to index, to speed up `find`.
+            interval: The seconds between syncs in the background.
+
+        Returns: The mirror, which loads the table and starts syncing it
+            when entered with `with`, or on `start`.
+
+        >>> db = SurrealDB()
+        >>> with db.mirror("countries", indexes=["region"]) as countries:
+        ...     countries.find(region="Europe")
+        """
+        return Mirror(self, table, indexes, interval)
 
     def close(self):
-        """Close the connection to the database."""
-        self._client.close()
+        """Close the connection to the database, unless this is a tenant view."""
+        if self._owner:
+            self._client.close()
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False, cancel_futures=True)
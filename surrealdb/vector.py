@@ -0,0 +1,198 @@
+"""Module to store vector embeddings, and search them by similarity."""
+from __future__ import annotations
+import math
+from array import array
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from surrealdb.deadline import timeout_clause
+from surrealdb.encoder import encode
+from surrealdb.reference import Reference
+from surrealdb.statement import Where, encode_path, where_clause
+
+
+CHUNK_SIZE = 500
+
+Vector = Any
+"""A one-dimensional buffer of numbers, such as a NumPy array, or a sequence."""
+
+
+class Neighbours(NamedTuple):
+    """The nearest records to a query vector, closest first."""
+
+    ids: List[Any]
+    distances: array
+
+
+def encode_vector(vector: Vector) -> str:
+    """
+    Encode a vector as a compact SurrealQL array of numbers.
+
+    Buffers of 32-bit floats are written with the 9 significant digits
+    they hold, rather than the 17 of their conversion to Python floats.
+
+    Raises:
+        ValueError: If the vector is not one-dimensional, or a number is
+            not finite.
+
+    >>> encode_vector(array("f", [0.1, 2.0]))
+    '[0.100000001,2.0]'
+    """
+    try:
+        view = memoryview(vector)
+    except TypeError:
+        values, kind = list(vector), "d"
+    else:
+        if view.ndim != 1:
+            raise ValueError("Vectors must be one-dimensional.")
+        values, kind = view.tolist(), view.format
+
+    if not all(map(math.isfinite, values)):
+        raise ValueError("Cannot encode a vector with infinite or NaN values.")
+
+    encoded = ",".join(map(_encode_float32 if kind == "f" else repr, values))
+    return "[" + encoded.replace("e+", "e") + "]"
+
+
+def _encode_float32(value: float) -> str:
+    encoded = format(value, ".9g")
+    return encoded if "." in encoded or "e" in encoded else f"{encoded}.0"
+
+
+def operator(k: int, ef: Optional[int] = None, metric: Optional[str] = None) -> str:
+    """
+    Build the nearest neighbours operator.
+
+    Args:
+        k: The number of neighbours to find.
+        ef: The size of the candidate list searched in an HNSW index.
+        metric: The distance metric of a brute force search, used when
+            the field has no vector index, such as `EUCLIDEAN`.
+
+    >>> operator(10, ef=40)
+    '<|10,40|>'
+    """
+    if ef is not None and metric is not None:
+        raise ValueError("Set either ef, for an HNSW index, or metric, not both.")
+
+    if k < 1:
+        raise ValueError("Must search for at least one neighbour.")
+
+    option = ef if ef is not None else metric
+    return f"<|{int(k)}|>" if option is None else f"<|{int(k)},{option}|>"
+
+
+def insert(
+    table: str,
+    references: Sequence[Reference],
+    vectors: Iterable[Vector],
+    field: str = "embedding",
+    size: int = CHUNK_SIZE,
+    timeout: Optional[float] = None,
+) -> Iterator[str]:
+    """
+    Build one multi-row `INSERT` statement per chunk of vectors.
+
+    Args:
+        table: The table to insert into.
+        references: The record of each vector.
+        vectors: The vectors to insert.
+        field: The field to store the vectors in.
+        size: The number of vectors inserted per statement.
+        timeout: The time left, as returned by `remaining`.
+
+    Yields: The statements.
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+
+    vectors = list(vectors)
+    if len(vectors) != len(references):
+        raise ValueError("Must give exactly one id per vector.")
+
+    key = encode_path(field)
+    rows = [
+        f"{{id: {encode(reference)}, {key}: {encode_vector(vector)}}}"
+        for reference, vector in zip(references, vectors)
+    ]
+
+    for start in range(0, len(rows), size):
+        chunk = ", ".join(rows[start:start + size])
+        yield f"INSERT INTO {table} [{chunk}]{timeout_clause(timeout)};"
+
+
+def knn(
+    table: str,
+    queries: Iterable[Vector],
+    k: int = 10,
+    field: str = "embedding",
+    ef: Optional[int] = None,
+    metric: Optional[str] = None,
+    where: Where = None,
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """
+    Build the statements searching the neighbours of every query vector.
+
+    Each query vector is bound to a parameter with `LET`, and searched
+    for by the `SELECT` that follows it, so the results of the searches
+    are every second statement result.
+
+    >>> knn("docs", [[0.5, 1.0]], k=3)
+    [
+        'LET $q0 = [0.5,1.0]',
+        'SELECT id, vector::distance::knn() AS distance FROM docs'
+        ' WHERE embedding <|3|> $q0 ORDER BY distance',
+    ]
+    """
+    search = f"{encode_path(field)} {operator(k, ef, metric)}"
+    condition = f" AND ({where_clause(where)[len(' WHERE '):]})" if where else ""
+
+    statements = []
+    for n, query in enumerate(queries):
+        statements.append(f"LET $q{n} = {encode_vector(query)}")
+        statements.append(
+            "SELECT id, vector::distance::knn() AS distance"
+            f" FROM {table} WHERE {search} $q{n}{condition}"
+            f" ORDER BY distance{timeout_clause(timeout)}"
+        )
+
+    return statements
+
+
+def neighbours(results: List[Any]) -> List[Neighbours]:
+    """Get the neighbours of each query vector, from the statement results."""
+    return [
+        Neighbours(
+            [row["id"] for row in rows],
+            array("d", [row["distance"] for row in rows]),
+        )
+        for rows in results[1::2]
+    ]
+
+
+def references(
+    table: str,
+    count: int,
+    record_ids: Optional[Sequence[Any]],
+    generator: Optional[Any],
+) -> List[Reference]:
+    """
+    Get the record of each of `count` vectors.
+
+    Args:
+        table: The table the vectors are inserted into.
+        count: The number of vectors.
+        record_ids: The id of each vector's record, if given.
+        generator: Generates the ids that were not given.
+
+    Raises: ValueError if no ids were given, and there is no generator.
+    """
+    if record_ids is None:
+        if generator is None:
+            raise ValueError("Vectors without ids need an id generator.")
+        record_ids = [generator() for _ in range(count)]
+
+    return [
+        key if isinstance(key, Reference) else Reference(table, key)
+        for key in record_ids
+    ]
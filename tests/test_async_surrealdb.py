@@ -1,10 +1,26 @@
 """Test the AsyncSurrealDB class."""
 from __future__ import annotations
+import asyncio
+import base64
+import json
+import time
 from unittest import mock
 
+import httpx
 import pytest
 
-from surrealdb import AuthenticationError, QueryError, AsyncSurrealDB
+from surrealdb import (
+    AdaptiveLimiter,
+    AsyncSurrealDB,
+    AuthenticationError,
+    DeadlineExceeded,
+    HedgePolicy,
+    QueryError,
+    Reference,
+    SlowQueryLog,
+    cbor,
+    deadline,
+)
 
 
 MOCK_200 = mock.Mock(
@@ -25,6 +41,16 @@ MOCK_200 = mock.Mock(
 )
 
 
+def mock_token_response(expires_in: int = 3600) -> mock.Mock:
+    """Mock a successful signin response with a JWT."""
+    claims = json.dumps({"exp": int(time.time()) + expires_in}).encode()
+    token = f"e30.{base64.urlsafe_b64encode(claims).decode().rstrip('=')}.sig"
+    return mock.Mock(
+        status_code=200,
+        json=mock.Mock(return_value={"code": 200, "token": token}),
+    )
+
+
 def test_surrealdb_headers():
     """Test the headers of the AsyncSurrealDB class."""
     client = AsyncSurrealDB(
@@ -41,18 +67,62 @@ def test_surrealdb_headers():
     }
 
 
+@mock.patch("httpx.AsyncClient.post")
 @pytest.mark.asyncio
-async def test_signin():
+async def test_signin(mock_post):
     """Test the signin method of the AsyncSurrealDB class."""
+    mock_post.return_value = mock_token_response()
+
     async with AsyncSurrealDB() as client:
-        await client.signin("admin", "admin")
+        await client.signin("admin", "admin", namespace="test", database="test")
 
+        mock_post.assert_called_once_with(
+            url="http://localhost:8000/signin",
+            json={"ns": "test", "db": "test", "user": "admin", "pass": "admin"},
+            headers={"Accept": "application/json"},
+        )
+        assert client._client.auth is None
+        assert client._client.headers["Authorization"].startswith("Bearer ")
 
+
+@mock.patch("httpx.AsyncClient.post")
 @pytest.mark.asyncio
-async def test_signup():
+async def test_signup(mock_post):
     """Test the signup method of the AsyncSurrealDB class."""
+    mock_post.return_value = mock_token_response()
+
     async with AsyncSurrealDB() as client:
-        await client.signup("admin", "admin")
+        await client.signup(
+            namespace="test",
+            database="test",
+            scope="user",
+            email="admin@example.com",
+            password="admin",
+        )
+
+        assert mock_post.call_args.kwargs["url"] == "http://localhost:8000/signup"
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_refreshes_expiring_token(mock_post):
+    """Test the query method signs in again before the token expires."""
+    mock_post.side_effect = [
+        mock_token_response(expires_in=10),
+        mock_token_response(),
+        MOCK_200,
+    ]
+
+    async with AsyncSurrealDB() as client:
+        await client.signin("admin", "admin")
+        await client.query("SELECT * FROM test")
+
+    urls = [call.kwargs["url"] for call in mock_post.call_args_list]
+    assert urls == [
+        "http://localhost:8000/signin",
+        "http://localhost:8000/signin",
+        "http://localhost:8000/sql",
+    ]
 
 
 @pytest.mark.asyncio
@@ -254,3 +324,450 @@ async def test_delete(mock_post):
                 "name": "test",
             },
         ]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_coalesces_concurrent_reads(mock_post):
+    """Test identical concurrent reads share a single request."""
+
+    async def slow_post(**_):
+        await asyncio.sleep(0.05)
+        return MOCK_200
+
+    mock_post.side_effect = slow_post
+
+    async with AsyncSurrealDB(
+        namespace="test",
+        database="test",
+        coalesce=True,
+    ) as client:
+        results = await asyncio.gather(*(client.select("test") for _ in range(5)))
+
+        await client.use("other", "test")
+        await client.select("test")
+
+    assert mock_post.call_count == 2
+    assert all(result == results[0] for result in results)
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_does_not_coalesce_writes(mock_post):
+    """Test writes are always sent, even with coalescing enabled."""
+    mock_post.return_value = MOCK_200
+
+    async with AsyncSurrealDB(coalesce=True) as client:
+        await asyncio.gather(*(client.create("test", name="test") for _ in range(3)))
+
+    assert mock_post.call_count == 3
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_cancelled_at_deadline(mock_post):
+    """Test the query method cancels the request when the deadline passes."""
+    cancelled = asyncio.Event()
+
+    async def slow_post(**_):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return MOCK_200
+
+    mock_post.side_effect = slow_post
+
+    async with AsyncSurrealDB() as client:
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await client.select("test")
+
+    assert cancelled.is_set()
+    assert " TIMEOUT " in mock_post.call_args.kwargs["content"]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_delete_sends_timeout(mock_post):
+    """Test the delete method sends its timeout to the server."""
+    mock_post.return_value = MOCK_200
+
+    async with AsyncSurrealDB() as client:
+        await client.delete("test", where="age > 1", timeout=2)
+
+    assert (
+        mock_post.call_args.kwargs["content"]
+        == "DELETE test WHERE age > 1 TIMEOUT 2000ms;"
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream():
+    """Test the stream method yields rows as the response arrives."""
+    body = json.dumps(MOCK_200.json.return_value).encode()
+
+    async def chunks():
+        yield body[:20]
+        yield body[20:]
+
+    transport = httpx.MockTransport(
+        lambda _: httpx.Response(200, content=chunks()),
+    )
+
+    async with AsyncSurrealDB() as client:
+        client._client = httpx.AsyncClient(transport=transport)
+
+        rows = [row async for row in client.stream("SELECT * FROM test")]
+
+    assert rows == [
+        {
+            "id": "1",
+            "name": "test",
+        },
+    ]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_batch(mock_post):
+    """Test the batch method returns the result of every statement."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(
+            return_value=[
+                {"status": "OK", "result": [{"id": "test:1"}]},
+                {"status": "OK", "result": []},
+            ],
+        ),
+    )
+
+    async with AsyncSurrealDB() as client:
+        assert await client.batch("SELECT * FROM test:1", "DELETE test:2") == [
+            [{"id": "test:1"}],
+            [],
+        ]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_records_slow_queries(mock_post):
+    """Test slow queries are logged, and explained off the request path."""
+    mock_post.return_value = MOCK_200
+    slow_log = SlowQueryLog(threshold=0, explain=True)
+
+    async with AsyncSurrealDB(slow_log=slow_log) as client:
+        await client.select("test")
+        await asyncio.sleep(0)
+
+    (entry,) = slow_log
+    assert entry.plan == MOCK_200.json.return_value[0]["result"]
+    assert mock_post.call_args.kwargs["content"] == "SELECT * from test EXPLAIN;"
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_waits_for_limiter(mock_post):
+    """Test queries beyond the limiter's limit wait, and errors shrink it."""
+    in_flight = []
+
+    async def slow_post(**_):
+        in_flight.append(limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return mock.Mock(status_code=500, json=mock.Mock(return_value={}))
+
+    mock_post.side_effect = slow_post
+    limiter = AdaptiveLimiter(initial=2, backoff=0.5)
+
+    async with AsyncSurrealDB(limiter=limiter) as client:
+        results = await asyncio.gather(
+            *(client.select("test") for _ in range(4)),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, QueryError) for result in results)
+    assert max(in_flight) == 2
+    assert limiter.limit == 1
+    assert limiter.in_flight == 0
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_count_and_exists(mock_post):
+    """Test the count and exists methods return scalars."""
+    mock_post.side_effect = [
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(return_value=[{"status": "OK", "result": [{"count": 3}]}]),
+        ),
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(return_value=[{"status": "OK", "result": []}]),
+        ),
+    ]
+
+    async with AsyncSurrealDB() as client:
+        assert await client.count("test", where="age > 1") == 3
+        assert await client.exists("test:1") is False
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_delete_many_runs_chunks_in_parallel(mock_post):
+    """Test the delete_many method sends its chunks concurrently."""
+    in_flight = []
+
+    async def slow_post(**kwargs):
+        in_flight.append(kwargs["content"])
+        await asyncio.sleep(0.01)
+        return MOCK_200
+
+    mock_post.side_effect = slow_post
+
+    async with AsyncSurrealDB() as client:
+        started = time.perf_counter()
+        results = await client.delete_many([f"test:{i}" for i in range(10)], 2)
+        elapsed = time.perf_counter() - started
+
+    assert all(result.ok for result in results)
+    assert len(in_flight) == 5
+    assert in_flight[0] == "DELETE [test:0, test:1];"
+    assert elapsed < 0.04
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_delete_many_bounds_concurrency(mock_post):
+    """Test the delete_many method sends at most max_concurrency chunks at once."""
+    in_flight, peak = 0, 0
+
+    async def slow_post(**_):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return MOCK_200
+
+    mock_post.side_effect = slow_post
+
+    async with AsyncSurrealDB() as client:
+        ids = [f"test:{i}" for i in range(20)]
+        results = await client.delete_many(ids, 1, max_concurrency=3)
+
+    assert len(results) == 20 and all(result.ok for result in results)
+    assert peak == 3
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_tenants_share_one_client(mock_post):
+    """Test concurrent tenant views do not see each other's namespace."""
+
+    async def post(**kwargs):
+        await asyncio.sleep(0.01)
+        return mock.Mock(
+            status_code=200,
+            json=mock.Mock(
+                return_value=[{"status": "OK", "result": [kwargs["headers"]["NS"]]}]
+            ),
+        )
+
+    mock_post.side_effect = post
+
+    async with AsyncSurrealDB() as client:
+        results = await asyncio.gather(
+            *(client.tenant(f"t{i}", "app").select("test") for i in range(5)),
+            client.query("SELECT * FROM test", namespace="t5"),
+        )
+
+    assert results == [[f"t{i}"] for i in range(6)]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_ingest(mock_post):
+    """Test the ingest method inserts batches and acknowledges them."""
+    mock_post.return_value = MOCK_200
+
+    async def events():
+        for i in range(3):
+            yield {"n": i}
+
+    async with AsyncSurrealDB() as client:
+        acks = [ack async for ack in client.ingest(events(), "events", batch_size=2)]
+
+    assert [ack.offset for ack in acks] == [2, 3]
+    assert mock_post.call_args_list[0].kwargs["content"] == (
+        "INSERT INTO events [{n: 0}, {n: 1}];"
+    )
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_query_hedges_slow_reads(mock_post):
+    """Test a slow read is hedged, and the slow request cancelled."""
+    cancelled = asyncio.Event()
+
+    async def post(url, **_):
+        if url == "http://a:8000/sql":
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return MOCK_200
+
+    mock_post.side_effect = post
+
+    async with AsyncSurrealDB(
+        url=["http://a:8000/sql", "http://b:8000/sql"],
+        hedge=HedgePolicy(delay=0.01),
+    ) as client:
+        assert await client.select("test") == MOCK_200.json.return_value[0]["result"]
+        await asyncio.sleep(0)
+
+    assert cancelled.is_set()
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_create_many(mock_post):
+    """Test create_many inserts every row in one request, returning references."""
+    mock_post.return_value = MOCK_200
+
+    async with AsyncSurrealDB(id_generator=lambda: "x") as client:
+        references = await client.create_many("users", [{"name": "a"}])
+
+    assert references == [Reference("users", "x")]
+    assert mock_post.call_args.kwargs["content"] == (
+        "INSERT INTO users [{id: 'x', name: 'a'}];"
+    )
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_reserve_ids(mock_post):
+    """Test reserve_ids returns the block ending at the counter's value."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(return_value=[{"status": "OK", "result": [{"value": 50}]}]),
+    )
+
+    async with AsyncSurrealDB() as client:
+        reserved = await client.reserve_ids("users", 10)
+
+    assert (reserved.start, reserved.stop) == (41, 51)
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_sequence_reserves_blocks(mock_post):
+    """Test a sequence reserves the ids create_many needs, past one block."""
+    counter = iter([2, 4])
+    mock_post.side_effect = lambda content, **_: mock.Mock(
+        status_code=200,
+        json=mock.Mock(
+            return_value=[
+                {"status": "OK", "result": [{"value": next(counter)}]}
+                if content.startswith("UPDATE sequence")
+                else MOCK_200.json.return_value[0]
+            ]
+        ),
+    )
+
+    async with AsyncSurrealDB() as client:
+        client.id_generator = client.sequence("users", block_size=2)
+        await client.create("users", name="a")
+        references = await client.create_many("users", [{"name": "b"}] * 3)
+
+    assert references == [Reference("users", k) for k in (2, 3, 4)]
+    assert [call.kwargs["content"] for call in mock_post.call_args_list] == [
+        "UPDATE sequence:users SET value += 2 RETURN AFTER;",
+        "CREATE users:1 SET name = 'a';",
+        "UPDATE sequence:users SET value += 2 RETURN AFTER;",
+        "INSERT INTO users [{id: 2, name: 'b'}, {id: 3, name: 'b'}, "
+        "{id: 4, name: 'b'}];",
+    ]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_insert_vectors(mock_post):
+    """Test insert_vectors gives vectors ids from the id generator."""
+    mock_post.return_value = MOCK_200
+
+    async with AsyncSurrealDB(id_generator=lambda: "x") as client:
+        references = await client.insert_vectors("docs", [[1.0]])
+
+    assert references == [Reference("docs", "x")]
+    assert mock_post.call_args.kwargs["content"] == (
+        "INSERT INTO docs [{id: docs:x, embedding: [1.0]}];"
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_cbor():
+    """Test the cbor protocol posts to /rpc and decodes record ids."""
+
+    def rpc(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/rpc"
+        return httpx.Response(
+            200,
+            content=cbor.dumps(
+                {"result": [{"status": "OK", "result": [{"id": Reference("a", 1)}]}]}
+            ),
+            headers={"Content-Type": "application/cbor"},
+        )
+
+    async with AsyncSurrealDB(
+        protocol="cbor", transport=httpx.MockTransport(rpc)
+    ) as client:
+        assert await client.select("a:1") == [{"id": Reference("a", 1)}]
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_insert_vectors_bounds_concurrency(mock_post):
+    """Test insert_vectors sends at most max_concurrency statements at once."""
+    in_flight, peak = 0, 0
+
+    async def slow_post(**_):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return MOCK_200
+
+    mock_post.side_effect = slow_post
+
+    async with AsyncSurrealDB() as client:
+        await client.insert_vectors(
+            "docs", [[1.0]] * 6, list(range(6)), chunk_size=1, max_concurrency=2
+        )
+
+    assert mock_post.call_count == 6
+    assert peak == 2
+
+
+@mock.patch("httpx.AsyncClient.post")
+@pytest.mark.asyncio
+async def test_relate_many(mock_post):
+    """Test relate_many sends chunks of RELATE statements in parallel."""
+    mock_post.return_value = MOCK_200
+
+    async with AsyncSurrealDB() as client:
+        results = await client.relate_many(
+            "knows",
+            [("users:1", "users:2"), ("users:1", "users:3")],
+            chunk_size=1,
+            max_concurrency=1,
+        )
+
+    assert [result.ids for result in results] == [
+        ["users:1->knows->users:2"],
+        ["users:1->knows->users:3"],
+    ]
+    assert mock_post.call_count == 2
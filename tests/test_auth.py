@@ -0,0 +1,66 @@
+"""Test the auth module."""
+from __future__ import annotations
+import base64
+import json
+import time
+
+import pytest
+
+from surrealdb import auth
+
+
+def make_token(claims: dict) -> str:
+    """Build an unsigned JWT with the given claims."""
+    body = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode()
+    return f"e30.{body.rstrip('=')}.signature"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("http://localhost:8000/sql", "http://localhost:8000/signin"),
+        ("http://localhost:8000/sql/", "http://localhost:8000/signin"),
+        ("https://db.example.com", "https://db.example.com/signin"),
+    ],
+)
+def test_endpoint(url, expected):
+    """Test authentication endpoints are built next to the SQL endpoint."""
+    assert auth.endpoint(url, "signin") == expected
+
+
+def test_credentials():
+    """Test signin bodies only include the levels that were given."""
+    assert auth.credentials("root", "root") == {"user": "root", "pass": "root"}
+    assert auth.credentials(namespace="ns", database="db", scope="sc", a=1) == {
+        "ns": "ns",
+        "db": "db",
+        "sc": "sc",
+        "a": 1,
+    }
+
+
+def test_expiry():
+    """Test the expiry of a token is read from its claims."""
+    assert auth.expiry(make_token({"exp": 1700000000})) == 1700000000.0
+    assert auth.expiry(make_token({})) is None
+    assert auth.expiry("not-a-jwt") is None
+
+
+def test_token_expiring():
+    """Test tokens are renewed ahead of their expiry."""
+    token = auth.Token(make_token({"exp": time.time() + 30}), {})
+    assert token.expiring()
+
+    token.renew(make_token({"exp": time.time() + 3600}))
+    assert not token.expiring()
+    assert token.header == f"Bearer {token.value}"
+
+
+def test_endpoint_next_to_rpc():
+    """Test endpoints are built next to the RPC endpoint too."""
+    assert auth.endpoint("http://localhost:8000/rpc", "signin") == (
+        "http://localhost:8000/signin"
+    )
+    assert auth.endpoint("http://localhost:8000/sql", "rpc") == (
+        "http://localhost:8000/rpc"
+    )
@@ -0,0 +1,124 @@
+"""Test the bench module."""
+from __future__ import annotations
+import json
+
+import httpx
+import pytest
+
+from surrealdb import AsyncSurrealDB
+from surrealdb.bench import Report, StandIn, Workload, main, run
+
+
+def client(stand_in: StandIn) -> AsyncSurrealDB:
+    """Get a client that sends its requests to a stand-in."""
+    return AsyncSurrealDB("", "", "test", "test", transport=stand_in.transport)
+
+
+def test_stand_in_reads_its_writes():
+    """Test that the stand-in returns the records written to it."""
+    stand_in = StandIn()
+
+    stand_in.execute("UPDATE bench:1 SET payload = 'a';")
+
+    assert stand_in.execute("SELECT * FROM bench:1;")["result"][0]["id"] == "bench:1"
+    assert stand_in.execute("SELECT * FROM bench:2;")["result"] == []
+
+
+def test_workload_mix():
+    """Test that the workload follows the read ratio."""
+    assert {Workload(read_ratio=1.0).next()[0] for _ in range(10)} == {"read"}
+    assert {Workload(read_ratio=0.0).next()[0] for _ in range(10)} == {"write"}
+
+
+@pytest.mark.asyncio
+async def test_run_closed_loop():
+    """Test that a run records the latency of reads and writes."""
+    async with client(StandIn()) as db:
+        report = await run(db, Workload(read_ratio=0.5, seed=1), 0.1, concurrency=4)
+
+    summary = report.summary()
+    assert summary["operations"] > 0
+    assert summary["read"]["count"] > 0 and summary["write"]["count"] > 0
+    assert summary["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_open_loop_batches():
+    """Test that a rate limited run sends batches on schedule."""
+    stand_in = StandIn()
+    async with client(stand_in) as db:
+        report = await run(db, Workload(read_ratio=0.0), 0.2, rate=100, batch=5)
+
+    assert 10 <= report.summary()["operations"] <= 20
+    assert stand_in.records
+
+
+@pytest.mark.asyncio
+async def test_run_counts_operations():
+    """Test that a run limited by count sends exactly that many operations."""
+    async with client(StandIn()) as db:
+        report = await run(db, Workload(), None, batch=3, operations=10)
+
+    assert report.summary()["operations"] == 10
+
+    with pytest.raises(ValueError):
+        await run(db, Workload(), None)
+
+
+@pytest.mark.asyncio
+async def test_run_records_errors():
+    """Test that failed operations count as errors."""
+    async with AsyncSurrealDB(
+        "",
+        "",
+        "test",
+        "test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(500, json={})),
+    ) as db:
+        report = await run(db, Workload(), 0.05, concurrency=1)
+
+    summary = report.summary()
+    assert summary["errors"] > 0
+    assert summary["error_rate"] == 1.0
+    assert summary["errors_by_type"] == {"QueryError": summary["errors"]}
+
+
+def test_report_format():
+    """Test that a report formats percentiles in milliseconds."""
+    report = Report()
+    report.record("read", 0.002)
+    report.record("write", 0.004, "QueryError")
+    report.elapsed = 1.0
+
+    text = report.format()
+
+    assert "throughput  2.0 ops/s" in text
+    assert "p50=2.00ms" in text
+    assert "QueryError: 1" in text
+
+
+def test_main_stand_in(capsys):
+    """Test the command line against the stand-in."""
+    status = main(["--stand-in", "--duration", "0.05", "--json"])
+
+    assert status == 0
+    assert json.loads(capsys.readouterr().out)["operations"] > 0
+
+
+def test_main_records_and_replays(capsys, tmp_path):
+    """Test a run recorded against the stand-in can be replayed."""
+    cassette = str(tmp_path / "cassette.json")
+    options = ["--operations", "200", "--seed", "1", "--keys", "50", "--json"]
+
+    assert main(["--stand-in", "--record", cassette, *options]) == 0
+    capsys.readouterr()
+    assert main(["--replay", cassette, *options]) == 0
+    assert json.loads(capsys.readouterr().out)["operations"] == 200
+
+
+def test_main_cbor(capsys):
+    """Test the command line over the binary protocol."""
+    status = main(["--stand-in", "--protocol", "cbor", "--duration", "0.05", "--json"])
+
+    assert status == 0
+    assert json.loads(capsys.readouterr().out)["operations"] > 0
@@ -0,0 +1,71 @@
+"""Test the bulk module."""
+from __future__ import annotations
+
+import pytest
+
+from surrealdb import ChunkResult, QueryError, Reference
+from surrealdb.bulk import change, chunks, delete, failed, gather, merge
+
+
+def test_chunks():
+    """Test that ids are split into chunks, references encoded."""
+    assert list(chunks(["a:1", Reference("a", 2), "a:3"], 2)) == [
+        ["a:1", "a:2"],
+        ["a:3"],
+    ]
+
+
+def test_chunks_rejects_empty_chunks():
+    """Test that chunks must hold at least one id."""
+    with pytest.raises(ValueError):
+        list(chunks(["a:1"], 0))
+
+
+def test_change():
+    """Test that each chunk is updated by one set-based statement."""
+    assert list(change(["a:1", "a:2", "a:3"], {"active": False}, 2)) == [
+        (["a:1", "a:2"], ["UPDATE [a:1, a:2] SET active = false RETURN NONE"]),
+        (["a:3"], ["UPDATE [a:3] SET active = false RETURN NONE"]),
+    ]
+
+
+def test_merge():
+    """Test that each record is merged with its own patch."""
+    assert list(merge({"a:1": {"n": 1}, Reference("a", 2): {"n": 2}})) == [
+        (
+            ["a:1", "a:2"],
+            [
+                "UPDATE a:1 MERGE {n: 1} RETURN NONE",
+                "UPDATE a:2 MERGE {n: 2} RETURN NONE",
+            ],
+        ),
+    ]
+
+
+def test_delete():
+    """Test that each chunk is deleted by one set-based statement."""
+    assert list(delete(["a:1", "a:2"], 1)) == [
+        (["a:1"], ["DELETE [a:1]"]),
+        (["a:2"], ["DELETE [a:2]"]),
+    ]
+
+
+def test_failed():
+    """Test that the ids of failed chunks are collected for a retry."""
+    results = [ChunkResult(["a:1"]), ChunkResult(["a:2", "a:3"], QueryError())]
+
+    assert [result.ok for result in results] == [True, False]
+    assert failed(results) == ["a:2", "a:3"]
+
+
+@pytest.mark.asyncio
+async def test_gather_keeps_order():
+    """Test that bounded requests are returned in the order they were given."""
+
+    async def answer(value):
+        return value
+
+    assert await gather((answer(n) for n in range(5)), limit=2) == [0, 1, 2, 3, 4]
+
+    with pytest.raises(ValueError):
+        await gather([], limit=0)
@@ -0,0 +1,131 @@
+"""Test the recording and replay transports."""
+from __future__ import annotations
+import json
+import time
+
+import httpx
+import pytest
+
+from surrealdb import (
+    AsyncSurrealDB,
+    RecordingTransport,
+    ReplayTransport,
+    SurrealDB,
+    cbor,
+)
+from surrealdb.error import UnrecordedRequest
+
+
+def answer(request: httpx.Request) -> httpx.Response:
+    """Answer a query with its own text, as a stand-in for the server."""
+    if request.url.path == "/signin":
+        return httpx.Response(200, json={"code": 200, "token": "token"})
+
+    return httpx.Response(
+        200, json=[{"status": "OK", "result": [{"query": request.content.decode()}]}]
+    )
+
+
+def record(path: str) -> None:
+    """Record a few exchanges to a cassette."""
+    transport = RecordingTransport(path, httpx.MockTransport(answer))
+    with SurrealDB(namespace="test", database="test", transport=transport) as db:
+        db.query("SELECT * FROM a;")
+        db.query("SELECT * FROM b;")
+        db.query("SELECT * FROM a;")
+
+
+def test_recording_writes_a_cassette(tmp_path):
+    """Test the cassette holds each exchange, written when the client closes."""
+    path = tmp_path / "cassette.json"
+    record(str(path))
+
+    interactions = json.loads(path.read_text())["interactions"]
+
+    assert [i["request"]["body"] for i in interactions] == [
+        "SELECT * FROM a;",
+        "SELECT * FROM b;",
+        "SELECT * FROM a;",
+    ]
+    assert interactions[0]["request"]["namespace"] == "test"
+    assert interactions[0]["response"]["status"] == 200
+
+
+def test_recording_leaves_out_passwords(tmp_path):
+    """Test the body and headers of a sign-in are not recorded."""
+    path = tmp_path / "cassette.json"
+    transport = RecordingTransport(str(path), httpx.MockTransport(answer))
+    with SurrealDB(transport=transport) as db:
+        db.signin("root", "secret")
+
+    assert "secret" not in path.read_text()
+
+
+def test_replay_answers_without_a_server(tmp_path):
+    """Test recorded queries are answered from the cassette, whatever the host."""
+    path = str(tmp_path / "cassette.json")
+    record(path)
+
+    with SurrealDB(
+        namespace="test",
+        database="test",
+        url="http://elsewhere:9000/sql",
+        transport=ReplayTransport(path),
+    ) as db:
+        assert db.query("SELECT * FROM b;") == [{"query": "SELECT * FROM b;"}]
+        assert db.query("SELECT * FROM a;") == [{"query": "SELECT * FROM a;"}]
+
+
+def test_replay_raises_for_unrecorded_requests(tmp_path):
+    """Test a request that was not recorded raises."""
+    path = str(tmp_path / "cassette.json")
+    record(path)
+
+    with pytest.raises(UnrecordedRequest):
+        with SurrealDB(
+            namespace="other", database="test", transport=ReplayTransport(path)
+        ) as db:
+            db.query("SELECT * FROM a;")
+
+
+def test_replay_simulates_latency(tmp_path):
+    """Test the replayed responses take the latency asked for."""
+    path = str(tmp_path / "cassette.json")
+    record(path)
+    transport = ReplayTransport(path, latency=0.05)
+
+    with SurrealDB(namespace="test", database="test", transport=transport) as db:
+        started = time.perf_counter()
+        db.query("SELECT * FROM a;")
+
+    assert time.perf_counter() - started >= 0.05
+    assert transport.replayed == 1
+
+
+@pytest.mark.asyncio
+async def test_async_record_and_replay(tmp_path):
+    """Test both transports work with the asynchronous client."""
+    path = str(tmp_path / "cassette.json")
+    recording = RecordingTransport(path, httpx.MockTransport(answer))
+    async with AsyncSurrealDB(transport=recording) as db:
+        await db.query("SELECT * FROM a;")
+
+    async with AsyncSurrealDB(transport=ReplayTransport(path)) as db:
+        assert await db.query("SELECT * FROM a;") == [{"query": "SELECT * FROM a;"}]
+
+
+def test_cbor_record_and_replay(tmp_path):
+    """Test a query sent with the CBOR protocol replays from its recording."""
+
+    def answer_rpc(request: httpx.Request) -> httpx.Response:
+        query = cbor.loads(request.content)["params"][0]
+        body = cbor.dumps({"id": 1, "result": [{"status": "OK", "result": [query]}]})
+        return httpx.Response(200, headers=cbor.HEADERS, content=body)
+
+    path = str(tmp_path / "cassette.json")
+    recording = RecordingTransport(path, httpx.MockTransport(answer_rpc))
+    with SurrealDB(protocol="cbor", transport=recording) as db:
+        db.query("SELECT * FROM a;")
+
+    with SurrealDB(protocol="cbor", transport=ReplayTransport(path)) as db:
+        assert db.query("SELECT * FROM a;") == ["SELECT * FROM a;"]
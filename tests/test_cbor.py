@@ -0,0 +1,124 @@
+"""Test the CBOR encoding of SurrealDB's binary protocol."""
+from __future__ import annotations
+import datetime
+import decimal
+import uuid
+from array import array
+
+import pytest
+
+from surrealdb import Reference
+from surrealdb.cbor import dumps, loads, request, results
+from surrealdb.encoder import NONE
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (0, b"\x00"),
+        (23, b"\x17"),
+        (24, b"\x18\x18"),
+        (1000, b"\x19\x03\xe8"),
+        (-1, b"\x20"),
+        (-1000, b"\x39\x03\xe7"),
+        (1.5, b"\xfb\x3f\xf8\x00\x00\x00\x00\x00\x00"),
+        (True, b"\xf5"),
+        (None, b"\xf6"),
+        (NONE, b"\xc6\xf6"),
+        ("a", b"\x61a"),
+        (b"\x01", b"\x41\x01"),
+        ([1, [2]], b"\x82\x01\x81\x02"),
+        ({"a": 1}, b"\xa1\x61a\x01"),
+        (Reference("users", 1), b"\xc8\x82\x65users\x01"),
+        (decimal.Decimal("1.50"), b"\xca\x641.50"),
+    ],
+)
+def test_dumps(value, expected):
+    """Test values are encoded as CBOR, with SurrealDB's tags."""
+    assert dumps(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        2**64,
+        -(2**64) - 1,
+        "héllo",
+        datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+        datetime.timedelta(days=1, microseconds=5),
+        uuid.UUID("0190e8a2-9f3c-7b5e-8a61-2f0e8d7c6b5a"),
+        {"id": Reference("users", "john"), "tags": ["a"], "data": b"\x00"},
+    ],
+)
+def test_round_trip(value):
+    """Test values decode to what was encoded."""
+    assert loads(dumps(value)) == value
+
+
+def test_dumps_encodes_naive_datetimes_as_utc():
+    """Test datetimes without a timezone are taken to be in UTC."""
+    assert loads(dumps(datetime.datetime(2024, 1, 1))) == datetime.datetime(
+        2024, 1, 1, tzinfo=datetime.timezone.utc
+    )
+
+
+def test_dumps_encodes_arrays_as_lists():
+    """Test array buffers are encoded as arrays of numbers."""
+    assert loads(dumps(array("d", [1.0, 2.5]))) == [1.0, 2.5]
+
+
+def test_dumps_rejects_unknown_types():
+    """Test values of unsupported types raise."""
+    with pytest.raises(TypeError):
+        dumps(object())
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (
+            b"\xc0\x742024-01-02T03:04:05Z",
+            datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        ),
+        (b"\xc8\x67users:1", Reference("users", "1")),
+        (b"\xc7\x65users", "users"),
+        (
+            b"\xc9\x78\x24" + b"0190e8a2-9f3c-7b5e-8a61-2f0e8d7c6b5a",
+            uuid.UUID("0190e8a2-9f3c-7b5e-8a61-2f0e8d7c6b5a"),
+        ),
+        (b"\xcd\x621h", "1h"),
+        (b"\xf9\x3c\x00", 1.0),
+        (b"\x9f\x01\x02\xff", [1, 2]),
+        (b"\x7f\x61a\x61b\xff", "ab"),
+        (b"\xd8\x63\x01", 1),
+    ],
+)
+def test_loads(data, expected):
+    """Test SurrealDB's tags and indefinite lengths are decoded."""
+    assert loads(data) == expected
+
+
+@pytest.mark.parametrize("data", [b"\x19\x03", b"\x62a", b"\x01\x02", b"\xfc"])
+def test_loads_rejects_malformed_data(data):
+    """Test truncated, trailing or reserved data raises."""
+    with pytest.raises(ValueError):
+        loads(data)
+
+
+def test_request():
+    """Test a query is sent as an RPC request."""
+    body = loads(request("SELECT * FROM users;"))
+
+    assert body["method"] == "query"
+    assert body["params"] == ["SELECT * FROM users;"]
+    assert request("SELECT * FROM users;") == request("SELECT * FROM users;")
+
+
+def test_results():
+    """Test statement results are read, and errors shaped as failed results."""
+    statements = [{"status": "OK", "result": []}]
+
+    assert results(dumps({"id": 1, "result": statements})) == statements
+    assert results(dumps({"id": 1, "error": {"code": -1}})) == [
+        {"status": "ERR", "result": {"code": -1}}
+    ]
@@ -0,0 +1,42 @@
+"""Test the deadline module."""
+from __future__ import annotations
+import time
+
+import pytest
+
+from surrealdb import DeadlineExceeded, deadline
+from surrealdb.deadline import remaining, timeout_clause
+
+
+def test_remaining_without_deadline():
+    """Test the timeout is used as is outside of a deadline."""
+    assert remaining() is None
+    assert remaining(2.0) == 2.0
+
+
+def test_remaining_with_deadline():
+    """Test the sooner of the timeout and the deadline is used."""
+    with deadline(1.0):
+        assert 0.9 < remaining() <= 1.0
+        assert remaining(0.5) == 0.5
+
+        with deadline(5.0):
+            assert remaining() <= 1.0
+
+    assert remaining() is None
+
+
+def test_remaining_raises_deadline_exceeded():
+    """Test no time left raises a DeadlineExceeded error."""
+    with deadline(0.01):
+        time.sleep(0.02)
+
+        with pytest.raises(DeadlineExceeded):
+            remaining()
+
+
+def test_timeout_clause():
+    """Test the time left is rounded up to whole milliseconds."""
+    assert timeout_clause(None) == ""
+    assert timeout_clause(0.25) == " TIMEOUT 250ms"
+    assert timeout_clause(0.0001) == " TIMEOUT 1ms"
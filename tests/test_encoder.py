@@ -0,0 +1,105 @@
+"""Test the encoder module."""
+from __future__ import annotations
+import datetime
+import decimal
+import uuid
+from collections import OrderedDict
+
+import pytest
+
+from surrealdb import Reference
+from surrealdb.encoder import (
+    NONE,
+    encode,
+    encode_assignments,
+    encode_field,
+    encode_rows,
+    register,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, "NULL"),
+        (NONE, "NONE"),
+        (True, "true"),
+        (42, "42"),
+        (1.5, "1.5"),
+        (1e20, "1e20"),
+        (decimal.Decimal("1E+2"), "100dec"),
+        ("John", "'John'"),
+        ("O'Brien\\\n", "'O\\'Brien\\\\\\n'"),
+        (
+            datetime.datetime(
+                2023, 1, 1, 2, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+            ),
+            "<datetime> '2023-01-01T00:00:00Z'",
+        ),
+        (datetime.datetime(2023, 1, 1), "<datetime> '2023-01-01T00:00:00Z'"),
+        (datetime.date(2023, 1, 1), "<datetime> '2023-01-01T00:00:00Z'"),
+        (datetime.timedelta(days=1, minutes=2, microseconds=5), "1d2m5us"),
+        (datetime.timedelta(), "0s"),
+        (uuid.UUID(int=1), "<uuid> '00000000-0000-0000-0000-000000000001'"),
+        (b"hi", "encoding::base64::decode('aGk=')"),
+        ([1, "a", [None]], "[1, 'a', [NULL]]"),
+        ({"a": 1, "b c": {"d": []}}, "{a: 1, 'b c': {d: []}}"),
+        (OrderedDict(a=1), "{a: 1}"),
+        (Reference("users", 1), "users:1"),
+        (Reference("users", "john"), "users:john"),
+        (Reference("users", "john doe"), "users:⟨john doe⟩"),
+    ],
+)
+def test_encode(value, expected):
+    """Test values are encoded as SurrealQL literals."""
+    assert encode(value) == expected
+
+
+@pytest.mark.parametrize("value", [float("nan"), decimal.Decimal("Infinity")])
+def test_encode_raises_value_error(value):
+    """Test values without a SurrealQL literal raise a ValueError."""
+    with pytest.raises(ValueError):
+        encode(value)
+
+
+def test_encode_raises_type_error():
+    """Test unsupported types raise a TypeError."""
+    with pytest.raises(TypeError):
+        encode(object())
+
+    with pytest.raises(TypeError):
+        encode({1: "a"})
+
+
+def test_register():
+    """Test custom encoders are used for the type and its subclasses."""
+
+    class Point:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    class Point3D(Point):
+        pass
+
+    register(Point, lambda point: f"({point.x}, {point.y})")
+
+    assert encode(Point(1, 2)) == "(1, 2)"
+    assert encode([Point3D(3, 4)]) == "[(3, 4)]"
+
+
+def test_encode_field():
+    """Test field names are escaped unless they are identifiers."""
+    assert encode_field("name") == "name"
+    assert encode_field("first name") == "`first name`"
+
+
+def test_encode_assignments():
+    """Test fields are encoded as SET clause assignments."""
+    assert encode_assignments({"name": "John", "age": 42}) == "name = 'John', age = 42"
+
+
+def test_encode_rows():
+    """Test rows are encoded as an array of objects."""
+    assert encode_rows([{"id": 1}, {"id": 2, "tags": ["a"]}]) == (
+        "[{id: 1}, {id: 2, tags: ['a']}]"
+    )
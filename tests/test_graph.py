@@ -0,0 +1,69 @@
+"""Test the graph statements."""
+from __future__ import annotations
+
+import pytest
+
+from surrealdb import Reference
+from surrealdb.graph import edge_statement, hops, relate, traverse
+
+
+def test_edge_statement():
+    """Test an edge is created by RELATE, with its fields set."""
+    assert edge_statement("knows", (Reference("users", 1), "users:2")) == (
+        "users:1->knows->users:2",
+        "RELATE users:1->knows->users:2 RETURN NONE",
+    )
+    assert edge_statement("knows", ("users:1", "users:2", {"since": 2020})) == (
+        "users:1->knows->users:2",
+        "RELATE users:1->knows->users:2 SET since = 2020 RETURN NONE",
+    )
+
+
+def test_relate_in_chunks():
+    """Test edges are split into chunks of statements."""
+    edges = [("a:1", "b:1"), ("a:1", "b:2"), ("a:2", "b:1")]
+
+    assert list(relate("links", edges, 2)) == [
+        (
+            ["a:1->links->b:1", "a:1->links->b:2"],
+            [
+                "RELATE a:1->links->b:1 RETURN NONE",
+                "RELATE a:1->links->b:2 RETURN NONE",
+            ],
+        ),
+        (["a:2->links->b:1"], ["RELATE a:2->links->b:1 RETURN NONE"]),
+    ]
+
+
+def test_traverse():
+    """Test each hop is fetched by a subquery of every start record."""
+    assert traverse(
+        ["users:1", Reference("users", 2)], "->knows->users", 2, ["name"], limit=5
+    ) == (
+        "SELECT id, (SELECT name FROM (array::distinct($parent->knows->users))"
+        " LIMIT 5) AS hop1, (SELECT name FROM"
+        " (array::distinct($parent->knows->users->knows->users)) LIMIT 5) AS hop2"
+        " FROM [users:1, users:2];"
+    )
+
+
+@pytest.mark.parametrize("path, depth", [("knows", 1), ("->knows->users", 0)])
+def test_traverse_rejects_invalid_walks(path, depth):
+    """Test paths must be graph paths, and at least one hop is followed."""
+    with pytest.raises(ValueError):
+        traverse(["users:1"], path, depth)
+
+
+def test_hops():
+    """Test the records reached are read by start record and hop."""
+    rows = [{"id": "users:1", "hop1": [{"id": "users:2"}], "hop2": None}]
+
+    assert hops(rows, 2) == {"users:1": [[{"id": "users:2"}], []]}
+    assert hops(None, 2) == {}
+
+
+def test_hops_keys_references():
+    """Test references read over CBOR are keyed like ids read as strings."""
+    rows = [{"id": Reference("users", 1), "hop1": []}]
+
+    assert hops(rows, 1) == {"users:1": [[]]}
@@ -0,0 +1,68 @@
+"""Test the hedge module."""
+from __future__ import annotations
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from surrealdb import HedgePolicy, QueryError
+from surrealdb.hedge import first_answer, first_answer_async
+
+
+def test_fixed_delay():
+    """Test that a fixed delay is used from the first read."""
+    assert HedgePolicy(delay=0.1).threshold() == 0.1
+
+
+def test_observed_quantile():
+    """Test that the delay follows recent latencies, once there are enough."""
+    policy = HedgePolicy(quantile=0.9, min_samples=10)
+
+    for latency in range(1, 10):
+        policy.observe(latency / 100)
+    assert policy.threshold() is None
+
+    policy.observe(0.1)
+    assert policy.threshold() == 0.09
+
+
+def test_budget_caps_extra_load():
+    """Test that hedges are allowed for a share of reads, after a burst."""
+    policy = HedgePolicy(budget=0.25, burst=2)
+
+    assert [policy.allow() for _ in range(3)] == [True, True, False]
+
+    for _ in range(4):
+        policy.observe(0.01)
+
+    assert [policy.allow() for _ in range(2)] == [True, False]
+    assert policy.hedged == 3
+
+
+def test_first_answer_skips_errors():
+    """Test that a failed request loses to one that answers."""
+
+    def fail():
+        raise QueryError("Oops")
+
+    def answer():
+        time.sleep(0.01)
+        return "answer"
+
+    with ThreadPoolExecutor() as pool:
+        assert first_answer([pool.submit(fail), pool.submit(answer)]) == "answer"
+
+        with pytest.raises(QueryError):
+            first_answer([pool.submit(fail), pool.submit(fail)])
+
+
+@pytest.mark.asyncio
+async def test_first_answer_async_cancels_the_loser():
+    """Test that the slower request is cancelled."""
+    slow = asyncio.ensure_future(asyncio.sleep(1, "slow"))
+    fast = asyncio.ensure_future(asyncio.sleep(0, "fast"))
+
+    assert await first_answer_async([slow, fast]) == "fast"
+    await asyncio.sleep(0)
+    assert slow.cancelled()
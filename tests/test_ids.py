@@ -0,0 +1,119 @@
+"""Test the client-side id generators."""
+from __future__ import annotations
+import uuid
+
+import pytest
+
+from surrealdb import Reference
+from surrealdb.ids import (
+    AsyncSequence,
+    Sequence,
+    SequenceBlock,
+    assign,
+    block,
+    record_target,
+    reserve_statement,
+    ulid,
+    uuid7,
+)
+
+
+def test_ulid_is_sortable():
+    """Test ULIDs sort in generation order, even within a millisecond."""
+    values = [ulid() for _ in range(1000)]
+
+    assert values == sorted(values)
+    assert len(set(values)) == 1000
+    assert all(len(value) == 26 for value in values)
+
+
+def test_uuid7_has_version_and_variant():
+    """Test UUIDv7 ids are valid version 7 UUIDs."""
+    value = uuid.UUID(uuid7())
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_sequence_block_hands_out_its_ids():
+    """Test a sequence block hands out each of its ids once."""
+    ids = SequenceBlock(10, 13)
+
+    assert [ids(), ids()] == [10, 11]
+    assert len(ids) == 1
+    assert ids() == 12
+    with pytest.raises(ValueError):
+        ids()
+
+
+def test_sequence_reserves_a_block_when_exhausted():
+    """Test a sequence reserves a new block only when the last one is used."""
+    blocks = iter([SequenceBlock(1, 3), SequenceBlock(7, 9)])
+    reserved = []
+
+    def reserve(size):
+        reserved.append(size)
+        return next(blocks)
+
+    ids = Sequence(reserve, size=2)
+
+    assert [ids() for _ in range(4)] == [1, 2, 7, 8]
+    assert reserved == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_async_sequence_reserves_ahead():
+    """Test an async sequence reserves enough ids before they are generated."""
+    blocks = iter([SequenceBlock(1, 3), SequenceBlock(7, 10)])
+    reserved = []
+
+    async def reserve(size):
+        reserved.append(size)
+        return next(blocks)
+
+    ids = AsyncSequence(reserve, size=2)
+    with pytest.raises(ValueError):
+        ids()
+
+    first, second = await ids.take(1), await ids.take(3)
+
+    assert [first(), second(), second(), second()] == [1, 2, 7, 8]
+    assert reserved == [2, 2]
+    assert len(ids) == 1
+
+
+def test_reserve_statement():
+    """Test the statement reserving ids increments the counter atomically."""
+    assert reserve_statement("users", 100) == (
+        "UPDATE sequence:users SET value += 100 RETURN AFTER;"
+    )
+    with pytest.raises(ValueError):
+        reserve_statement("users", 0)
+
+
+def test_block_from_counter():
+    """Test the block ends with the counter's new value."""
+    reserved = block([{"id": "sequence:users", "value": 300}], 100)
+
+    assert (reserved.start, reserved.stop) == (201, 301)
+
+
+def test_record_target():
+    """Test tables are given a generated id, and record ids are kept."""
+    assert record_target("users", lambda: "john doe") == "users:⟨john doe⟩"
+    assert record_target("users:1", lambda: 2) == "users:1"
+    assert record_target("users", None) == "users"
+
+
+def test_assign_keeps_existing_ids():
+    """Test rows are given ids only if they have none."""
+    references, rows = assign("users", [{"name": "a"}, {"id": 9}], lambda: 1)
+
+    assert references == [Reference("users", 1), Reference("users", 9)]
+    assert rows == [{"id": 1, "name": "a"}, {"id": 9}]
+
+
+def test_assign_requires_a_generator():
+    """Test rows without an id cannot be assigned one without a generator."""
+    with pytest.raises(ValueError):
+        assign("users", [{"name": "a"}], None)
@@ -0,0 +1,89 @@
+"""Test the import cost of the package."""
+from __future__ import annotations
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+import pytest
+
+
+IMPORT_BUDGET = float(os.environ.get("SURREALDB_IMPORT_BUDGET", "4"))
+"""How many times as long as `import json` importing the package may take."""
+
+
+def import_times(runs: int = 5) -> Dict[str, int]:
+    """
+    Measure the cumulative import time of the package, and of `json`.
+
+    `json` is imported in the same interpreter, first, as a reference
+    that scales with the speed of the machine. Each run uses a fresh
+    interpreter, and the fastest run of each module is kept to keep the
+    measurement stable on busy machines.
+
+    Returns: The cumulative import time of `surrealdb` and `json`, in
+        microseconds.
+    """
+    timings: Dict[str, List[int]] = {"json": [], "surrealdb": []}
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import json, surrealdb"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        for line in process.stderr.splitlines():
+            _, cumulative, name = (part.strip() for part in line.split("|"))
+            if name in timings:
+                timings[name].append(int(cumulative))
+
+    return {name: min(values) for name, values in timings.items()}
+
+
+def run(code: str) -> str:
+    """Run code in a fresh interpreter and return its output."""
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+
+def test_import_does_not_load_clients():
+    """Test importing the package does not import the clients, encoder or httpx."""
+    loaded = run(
+        "import sys, surrealdb;"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] == 'httpx'"
+        " or m in ('surrealdb.surrealdb', 'surrealdb.async_surrealdb',"
+        " 'surrealdb.encoder')))"
+    )
+    assert loaded == "[]"
+
+
+def test_clients_are_loaded_on_access():
+    """Test the client classes are imported on first access."""
+    assert run("from surrealdb import SurrealDB; print(SurrealDB.__name__)") == (
+        "SurrealDB"
+    )
+    assert run("import surrealdb; print(surrealdb.AsyncSurrealDB.__module__)") == (
+        "surrealdb.async_surrealdb"
+    )
+    assert run("from surrealdb import Session; print(Session.__module__)") == (
+        "surrealdb.session"
+    )
+
+
+def test_unknown_attribute_raises_attribute_error():
+    """Test unknown attributes still raise an AttributeError."""
+    import surrealdb
+
+    with pytest.raises(AttributeError):
+        surrealdb.DoesNotExist
+
+
+def test_import_time_budget():
+    """Test `import surrealdb` costs at most a few times `import json`."""
+    timings = import_times()
+
+    assert timings["surrealdb"] <= IMPORT_BUDGET * timings["json"], timings
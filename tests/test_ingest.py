@@ -0,0 +1,99 @@
+"""Test the ingest module."""
+from __future__ import annotations
+import asyncio
+
+import pytest
+
+from surrealdb import QueryError
+from surrealdb.ingest import Ingestion
+
+
+async def source(count, delay=0.0, read=None):
+    """Yield numbered records, optionally slowly, noting each one read."""
+    for i in range(count):
+        if delay:
+            await asyncio.sleep(delay)
+        if read is not None:
+            read.append(i)
+        yield {"i": i}
+
+
+@pytest.mark.asyncio
+async def test_batches_on_size():
+    """Test that full batches are written, then the rest."""
+    batches = []
+
+    async def write(batch):
+        batches.append([record["i"] for record in batch])
+
+    acks = [ack async for ack in Ingestion(write, batch_size=4).run(source(10))]
+
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert [(ack.first, ack.offset) for ack in acks] == [(0, 4), (4, 8), (8, 10)]
+    assert acks[-1].last == {"i": 9}
+
+
+@pytest.mark.asyncio
+async def test_batches_on_time():
+    """Test that a batch that fills up slowly is written on an interval."""
+    batches = []
+
+    async def write(batch):
+        batches.append(len(batch))
+
+    ingestion = Ingestion(write, batch_size=100, flush_interval=0.03)
+    [ack async for ack in ingestion.run(source(6, delay=0.01))]
+
+    assert sum(batches) == 6
+    assert len(batches) > 1
+
+
+@pytest.mark.asyncio
+async def test_acks_in_source_order():
+    """Test that a batch is acknowledged only after the batches before it."""
+
+    async def write(batch):
+        await asyncio.sleep(0.03 if batch[0]["i"] == 0 else 0)
+
+    ingestion = Ingestion(write, batch_size=2, max_in_flight=3)
+    acks = [ack.offset async for ack in ingestion.run(source(6))]
+
+    assert acks == [2, 4, 6]
+
+
+@pytest.mark.asyncio
+async def test_source_read_only_as_fast_as_written():
+    """Test that the source is not read while the backlog is full."""
+    read = []
+    release = asyncio.Event()
+
+    async def write(batch):
+        await release.wait()
+
+    run = Ingestion(write, batch_size=2, max_in_flight=2).run(source(100, read=read))
+    task = asyncio.ensure_future(run.__anext__())
+    await asyncio.sleep(0.01)
+
+    assert len(read) == 2 * 2
+
+    release.set()
+    assert (await task).offset == 2
+    await run.aclose()
+
+
+@pytest.mark.asyncio
+async def test_error_stops_after_acknowledged_batches():
+    """Test that a failed batch raises, after the batches before it are acked."""
+
+    async def write(batch):
+        if batch[0]["i"] == 4:
+            raise QueryError("Oops")
+
+    acks = []
+    with pytest.raises(QueryError):
+        async for ack in Ingestion(write, batch_size=2, max_in_flight=1).run(
+            source(10)
+        ):
+            acks.append(ack.offset)
+
+    assert acks == [2, 4]
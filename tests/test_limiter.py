@@ -0,0 +1,117 @@
+"""Test the limiter module."""
+from __future__ import annotations
+import asyncio
+
+import pytest
+
+from surrealdb import AdaptiveLimiter, DeadlineExceeded, Overloaded
+
+
+@pytest.mark.asyncio
+async def test_grows_additively_while_saturated():
+    """Test that the limit grows by one per limit's worth of fast requests."""
+    limiter = AdaptiveLimiter(initial=2, latency_target=1.0)
+
+    for _ in range(4):
+        await limiter.acquire()
+        await limiter.acquire()
+        limiter.release(0.01)
+        limiter.release(0.01)
+
+    assert limiter.limit == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_grow_when_idle():
+    """Test that the limit only grows when every slot is in use."""
+    limiter = AdaptiveLimiter(initial=4, latency_target=1.0)
+
+    for _ in range(20):
+        await limiter.acquire()
+        limiter.release(0.01)
+
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_shrinks_multiplicatively_once_per_round_trip():
+    """Test that slow requests sent together shrink the limit only once."""
+    limiter = AdaptiveLimiter(initial=10, backoff=0.5, latency_target=0.1)
+
+    for _ in range(5):
+        await limiter.acquire()
+    for _ in range(5):
+        limiter.release(0.5, healthy=False)
+
+    assert limiter.limit == 5
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_relative_latency_threshold():
+    """Test that requests far slower than the fastest recent one shrink the limit."""
+    limiter = AdaptiveLimiter(initial=10, backoff=0.5, tolerance=2.0)
+
+    await limiter.acquire()
+    limiter.release(0.01)
+    await limiter.acquire()
+    limiter.release(0.015)
+    assert limiter.limit == 10
+
+    await asyncio.sleep(0.05)
+    await limiter.acquire()
+    limiter.release(0.03)
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_in_order():
+    """Test that requests beyond the limit are let through first come first served."""
+    limiter = AdaptiveLimiter(initial=1, latency_target=1.0)
+    await limiter.acquire()
+    order = []
+
+    async def wait(name):
+        await limiter.acquire()
+        order.append(name)
+
+    tasks = [asyncio.ensure_future(wait(name)) for name in "abc"]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3
+
+    for _ in "abc":
+        limiter.release(0.01)
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue():
+    """Test that requests beyond the queue bound are turned away."""
+    limiter = AdaptiveLimiter(initial=1, max_queue=1)
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded):
+        await limiter.acquire()
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_timeout():
+    """Test that waiting for a slot honours the timeout."""
+    limiter = AdaptiveLimiter(initial=1)
+    await limiter.acquire()
+
+    with pytest.raises(DeadlineExceeded):
+        await limiter.acquire(timeout=0.01)
+
+    assert limiter.queued == 0
+    limiter.release(0.01)
+    assert await limiter.acquire() == 0.0
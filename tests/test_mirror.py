@@ -0,0 +1,195 @@
+"""Test the mirror module."""
+from __future__ import annotations
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from surrealdb import AsyncMirror, Mirror, QueryError, Reference
+
+
+ROWS = [
+    {"id": "countries:nl", "name": "Netherlands", "region": "Europe"},
+    {"id": "countries:jp", "name": "Japan", "region": "Asia"},
+]
+CHANGES = [
+    {
+        "versionstamp": 65536,
+        "changes": [
+            {"update": {"id": "countries:fr", "name": "France", "region": "Europe"}},
+            {"delete": {"id": "countries:jp"}},
+        ],
+    },
+    {
+        "versionstamp": 131072,
+        "changes": [
+            {"update": {"id": "countries:nl", "name": "Holland", "region": "Europe"}},
+        ],
+    },
+]
+
+
+NOW = "2024-01-01T00:00:00Z"
+
+
+def mock_db(rows: List[Dict[str, Any]] = ROWS) -> mock.Mock:
+    """Mock a client serving the server time and the rows, then the changes."""
+    return mock.Mock(
+        batch=mock.Mock(return_value=[NOW, [dict(row) for row in rows]]),
+        query=mock.Mock(return_value=CHANGES),
+    )
+
+
+def test_load_and_get():
+    """Test that the mirror serves loaded rows by id and by indexed field."""
+    mirror = Mirror(mock_db(), "countries", indexes=["region"])
+    mirror.load()
+
+    assert len(mirror) == 2
+    assert mirror.get("countries:nl")["name"] == "Netherlands"
+    assert mirror.get("countries:xx") is None
+    assert [row["id"] for row in mirror.find(region="Asia")] == ["countries:jp"]
+    assert mirror.find(region="Asia", name="Netherlands") == []
+
+
+def test_sync_applies_changes_since_last_sync():
+    """Test that a sync applies updates and deletes, and moves the versionstamp."""
+    db = mock_db()
+    mirror = Mirror(db, "countries", indexes=["region"])
+    mirror.load()
+
+    assert mirror.sync() == 3
+
+    assert "countries:jp" not in mirror
+    assert mirror.get("countries:nl")["name"] == "Holland"
+    assert {row["id"] for row in mirror.find(region="Europe")} == {
+        "countries:nl",
+        "countries:fr",
+    }
+    assert mirror.find(region="Asia") == []
+    assert mirror.versionstamp == 131072
+    db.batch.assert_called_once_with("RETURN time::now()", "SELECT * FROM countries")
+    assert db.query.call_args.args[0] == (
+        f"SHOW CHANGES FOR TABLE countries SINCE <datetime> '{NOW}' LIMIT 1000;"
+    )
+
+    mirror.sync()
+    assert db.query.call_args.args[0] == (
+        "SHOW CHANGES FOR TABLE countries SINCE 131073 LIMIT 1000;"
+    )
+
+
+def test_sync_pages_through_changes():
+    """Test that a sync keeps reading while full pages of changes come back."""
+    db = mock_db()
+    db.query.side_effect = [CHANGES, []]
+    mirror = Mirror(db, "countries", limit=2)
+    mirror.load()
+
+    mirror.sync()
+
+    assert db.query.call_count == 2
+
+
+def test_apply_pushed_changes():
+    """Test that changes pushed from elsewhere can be applied."""
+    mirror = Mirror(mock_db(), "countries")
+
+    assert mirror.apply(CHANGES[:1]) == 2
+    assert mirror.versionstamp == 65536
+    assert list(mirror) == [CHANGES[0]["changes"][0]["update"]]
+
+
+def test_apply_skips_table_definitions():
+    """Test that changes other than row updates and deletes are skipped."""
+    mirror = Mirror(mock_db(), "countries")
+    changeset = {
+        "versionstamp": 1,
+        "changes": [{"define_table": {"name": "countries"}}, CHANGES[0]["changes"][0]],
+    }
+
+    assert mirror.apply([changeset]) == 1
+    assert "countries:fr" in mirror
+
+
+def test_cbor_ids():
+    """Test rows whose ids are read as references are found by string."""
+    db = mock_db(
+        [{**row, "id": Reference("countries", row["id"][10:])} for row in ROWS]
+    )
+    deleted = {"delete": {"id": Reference("countries", "jp")}}
+    db.query.return_value = [{"versionstamp": 1, "changes": [deleted]}]
+    mirror = Mirror(db, "countries", indexes=["region"])
+    mirror.load()
+
+    assert mirror.get("countries:nl")["name"] == "Netherlands"
+    assert "countries:jp" in mirror
+    assert Reference("countries", "jp") in mirror
+
+    mirror.sync()
+
+    assert "countries:jp" not in mirror
+    assert mirror.find(region="Asia") == []
+
+
+def test_load_reads_the_server_time():
+    """Test that the cursor is the server time, also when read as a datetime."""
+    db = mock_db()
+    db.batch.return_value[0] = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    mirror = Mirror(db, "countries")
+    mirror.load()
+
+    mirror.sync()
+
+    assert "SINCE <datetime> '2024-01-01T00:00:00Z'" in db.query.call_args.args[0]
+
+
+def test_find_unhashable_values():
+    """Test that unhashable values are found without the index."""
+    mirror = Mirror(mock_db([{"id": "flags:1", "tags": ["a"]}]), "flags", ["tags"])
+    mirror.load()
+
+    assert mirror.find(tags=["a"]) == [{"id": "flags:1", "tags": ["a"]}]
+
+
+def test_background_sync_keeps_rows_on_error():
+    """Test that a failing background sync keeps the rows and the error."""
+    db = mock_db()
+    db.query.side_effect = QueryError("changefeed expired")
+
+    with Mirror(db, "countries", interval=0.01) as mirror:
+        time.sleep(0.05)
+
+    assert len(mirror) == 2
+    assert isinstance(mirror.last_error, QueryError)
+
+
+def test_background_sync_records_unexpected_errors():
+    """Test that a background sync records errors it does not expect."""
+    db = mock_db()
+    db.query.return_value = [{"versionstamp": 1, "changes": [{"update": {}}]}]
+
+    with Mirror(db, "countries", interval=0.01) as mirror:
+        time.sleep(0.05)
+        assert mirror._thread.is_alive()
+
+    assert isinstance(mirror.last_error, KeyError)
+
+
+@pytest.mark.asyncio
+async def test_async_mirror_syncs_in_background():
+    """Test that the AsyncMirror class loads, then syncs on an interval."""
+    db = mock.Mock(
+        batch=mock.AsyncMock(return_value=[NOW, [dict(row) for row in ROWS]]),
+        query=mock.AsyncMock(return_value=CHANGES),
+    )
+
+    async with AsyncMirror(db, "countries", interval=0.01) as mirror:
+        assert mirror.get("countries:jp") is not None
+        await asyncio.sleep(0.05)
+
+    assert mirror.get("countries:jp") is None
+    assert mirror.versionstamp == 131072
@@ -13,3 +13,11 @@ def test_reference_format():
 
     with pytest.raises(NotImplementedError):
         f"{reference:''}"
+
+
+def test_reference_equality():
+    """Test references compare and hash by table and record id."""
+    assert Reference("users", 1) == Reference("users", 1)
+    assert Reference("users", 1) != Reference("users", 2)
+    assert len({Reference("users", 1), Reference("users", 1)}) == 1
+    assert repr(Reference("users", "a")) == "Reference('users', 'a')"
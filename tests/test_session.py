@@ -0,0 +1,137 @@
+"""Test the Session and AsyncSession classes."""
+from __future__ import annotations
+from unittest import mock
+
+import httpx
+import pytest
+
+from surrealdb import AsyncSession, Record, Reference, Session, SurrealDB, cbor
+
+
+ROWS = [
+    {"id": "users:1", "name": "John Doe", "age": 42},
+    {"id": "users:2", "name": "Jane Doe", "age": 36},
+]
+
+
+def test_record_tracks_changes():
+    """Test records remember which fields changed."""
+    record = Record(ROWS[0])
+    assert not record.dirty
+
+    record["name"] = "Johnny"
+    record.update(age=43)
+    del record["age"]
+    record.setdefault("name", "ignored")
+
+    assert record.changes() == {"age": record.changes()["age"], "name": "Johnny"}
+    assert repr(record.changes()["age"]) == "NONE"
+
+    with pytest.raises(ValueError):
+        record["id"] = "users:3"
+
+
+def test_record_tracks_bulk_changes():
+    """Test clear, popitem and |= mark the fields they change."""
+    record = Record(ROWS[0])
+    record |= {"name": "Johnny"}
+    assert record.changes() == {"name": "Johnny"}
+
+    assert record.popitem() == ("age", 42)
+    assert "age" in record.changes()
+
+    record.clear()
+    assert record == {"id": "users:1"}
+    assert sorted(record.changes()) == ["age", "name"]
+
+    with pytest.raises(KeyError):
+        record.popitem()
+
+
+def test_session_identity_map():
+    """Test records are fetched once, in a single request."""
+    db = mock.Mock()
+    db.query.return_value = [dict(row) for row in ROWS]
+
+    session = Session(db)
+    users = session.get_many(["users:1", "users:2", "users:3"])
+
+    assert session.get("users:1") is users[0]
+    assert session.get(Reference("users", 2)) is users[1]
+    assert users[2] is None
+    db.query.assert_called_once_with("SELECT * FROM users:1, users:2, users:3;")
+
+
+def test_session_flush_sends_changed_fields():
+    """Test flush sends only the changed fields of dirty records."""
+    db = mock.Mock()
+    db.query.return_value = [dict(row) for row in ROWS]
+
+    with Session(db) as session:
+        john, jane = session.get_many(["users:1", "users:2"])
+        john["age"] = 43
+        jane.pop("age")
+        session.add({"id": "users:3", "name": "Unchanged"})
+
+    db.batch.assert_called_once_with(
+        "UPDATE users:1 SET age = 43",
+        "UPDATE users:2 SET age = NONE",
+        transaction=True,
+    )
+    assert not session.dirty
+
+
+def test_session_with_cbor_ids():
+    """Test records whose ids are read as references are found by string."""
+    requests = []
+
+    def answer(request: httpx.Request) -> httpx.Response:
+        requests.append(cbor.loads(request.content)["params"][0])
+        rows = [{**ROWS[0], "id": Reference("users", 1)}]
+        body = cbor.dumps({"id": 1, "result": [{"status": "OK", "result": rows}]})
+        return httpx.Response(200, headers=cbor.HEADERS, content=body)
+
+    transport = httpx.MockTransport(answer)
+    with SurrealDB(protocol="cbor", transport=transport) as db:
+        with Session(db) as session:
+            user = session.get("users:1")
+            assert session.get("users:1") is user
+            assert session.get(Reference("users", 1)) is user
+            user["age"] = 43
+
+    assert requests == [
+        "SELECT * FROM users:1;",
+        "BEGIN TRANSACTION;UPDATE users:1 SET age = 43;COMMIT TRANSACTION;",
+    ]
+
+
+def test_session_does_not_flush_on_error():
+    """Test changes are not saved when the block raises."""
+    db = mock.Mock()
+    db.query.return_value = [dict(ROWS[0])]
+
+    with pytest.raises(RuntimeError):
+        with Session(db) as session:
+            session.get("users:1")["age"] = 1
+            raise RuntimeError
+
+    db.batch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_async_session_flush():
+    """Test the AsyncSession class loads once and flushes changed fields."""
+    db = mock.Mock()
+    db.query = mock.AsyncMock(return_value=[dict(ROWS[0])])
+    db.batch = mock.AsyncMock(return_value=[[ROWS[0]]])
+
+    async with AsyncSession(db) as session:
+        user = await session.get("users:1")
+        assert await session.get("users:1") is user
+        user["name"] = "Johnny"
+
+    db.query.assert_awaited_once()
+    db.batch.assert_awaited_once_with(
+        "UPDATE users:1 SET name = 'Johnny'",
+        transaction=True,
+    )
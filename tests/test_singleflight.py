@@ -0,0 +1,52 @@
+"""Test the singleflight module."""
+from __future__ import annotations
+
+import pytest
+
+from surrealdb.singleflight import AsyncGroup, Group, is_read_only
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT * FROM users;", True),
+        ("select * from users; INFO FOR DB;", True),
+        ("CREATE users SET name = 'test';", False),
+        ("SELECT * FROM users; DELETE users;", False),
+        ("SELECT * FROM (UPDATE users SET age = 1);", False),
+        ("", False),
+    ],
+)
+def test_is_read_only(query, expected):
+    """Test read-only queries are detected conservatively."""
+    assert is_read_only(query) is expected
+
+
+def test_group_propagates_errors():
+    """Test the Group class re-raises errors and forgets the call."""
+    group = Group()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        group.do("key", fail)
+
+    assert group.do("key", lambda: 1) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_group_propagates_errors():
+    """Test the AsyncGroup class re-raises errors and forgets the call."""
+    group = AsyncGroup()
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def succeed():
+        return 1
+
+    with pytest.raises(ValueError):
+        await group.do("key", fail)
+
+    assert await group.do("key", succeed) == 1
@@ -0,0 +1,108 @@
+"""Test the slowlog module."""
+from __future__ import annotations
+import math
+from unittest import mock
+
+import pytest
+
+from surrealdb import SlowQueryLog, cbor
+from surrealdb.slowlog import fingerprint, parse_duration, percentile
+
+
+RESPONSE = mock.Mock(
+    status_code=200,
+    json=mock.Mock(
+        return_value=[{"time": "1.5ms", "status": "OK", "result": [{"id": 1}] * 3}],
+    ),
+)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (
+            "SELECT * FROM users WHERE name = 'Jo' AND age > 30",
+            "SELECT * FROM users WHERE name = ? AND age > ?",
+        ),
+        ("SELECT * FROM users:⟨a b⟩, users:42", "SELECT * FROM users:?, users:?"),
+        ("SELECT   math::sum(x)\n FROM t", "SELECT math::sum(x) FROM t"),
+        (
+            "DELETE t WHERE id IN [1, 2, 3] TIMEOUT 25ms",
+            "DELETE t WHERE id IN [?] TIMEOUT ?",
+        ),
+    ],
+)
+def test_fingerprint(query, expected):
+    """Test literals are normalized out of fingerprints."""
+    assert fingerprint(query) == expected
+
+
+def test_percentile():
+    """Test percentiles use the nearest rank."""
+    assert percentile([3, 1, 2, 4], 0.5) == 2
+    assert percentile(range(1, 101), 0.99) == 99
+    assert math.isnan(percentile([], 0.5))
+
+
+def test_parse_duration():
+    """Test durations reported by the server are parsed to seconds."""
+    assert parse_duration("1.5ms") == pytest.approx(0.0015)
+    assert parse_duration("1m2s") == 62.0
+    assert parse_duration(None) is None
+
+
+def test_observe():
+    """Test only slow queries are logged, and every query is aggregated."""
+    sink = mock.Mock()
+    log = SlowQueryLog(threshold=0.1, maxlen=2, sink=sink)
+
+    assert log.observe("SELECT * FROM users:1", 0.01, RESPONSE) is None
+    for record_id in range(3):
+        log.observe(f"SELECT * FROM users:{record_id}", 0.2, RESPONSE)
+
+    entries = list(log)
+    assert len(entries) == 2
+    assert entries[-1].rows == 3
+    assert entries[-1].server_time == pytest.approx(0.0015)
+    assert sink.call_count == 3
+
+    stats = log.stats()["SELECT * FROM users:?"]
+    assert stats["count"] == 4
+    assert stats["p50"] == 0.2
+
+
+def test_stats_bounded_fingerprints():
+    """Test the least recently seen fingerprints are evicted."""
+    log = SlowQueryLog(max_fingerprints=1)
+    log.observe("SELECT * FROM a", 0.1)
+    log.observe("SELECT * FROM b", 0.1)
+
+    assert list(log.stats()) == ["SELECT * FROM b"]
+
+
+def test_explain_statement():
+    """Test only single SELECT statements are explained."""
+    log = SlowQueryLog(threshold=0, explain=True)
+
+    select = log.observe("SELECT * FROM users;", 1)
+    update = log.observe("UPDATE users SET age = 1;", 1)
+
+    assert log.explain_statement(select) == "SELECT * FROM users EXPLAIN;"
+    assert log.explain_statement(update) is None
+
+
+def test_observe_reads_cbor_responses():
+    """Test the rows of a response in the binary protocol are counted."""
+    response = mock.Mock(
+        status_code=200,
+        json=mock.Mock(side_effect=ValueError),
+        content=cbor.dumps(
+            {"result": [{"time": "1ms", "status": "OK", "result": [{"id": 1}]}]}
+        ),
+    )
+    log = SlowQueryLog(threshold=0.1)
+
+    entry = log.observe("SELECT * FROM users", 0.2, response)
+
+    assert entry.rows == 1
+    assert entry.server_time == pytest.approx(0.001)
@@ -0,0 +1,76 @@
+"""Test the statement module."""
+from __future__ import annotations
+
+import pytest
+
+from surrealdb import Reference
+from surrealdb.statement import count, exists, order_clause, select, where_clause
+
+
+def test_select_defaults_to_every_field():
+    """Test that a plain select keeps its original statement."""
+    assert select("users") == "SELECT * from users;"
+
+
+def test_select_with_every_clause():
+    """Test that clauses are added in the order SurrealQL expects."""
+    assert select(
+        "users",
+        fields=["name", "address.city"],
+        where={"age": 42},
+        order_by="-name",
+        limit=10,
+        start=20,
+        timeout=0.5,
+    ) == (
+        "SELECT name, address.city from users WHERE age = 42 "
+        "ORDER BY name DESC LIMIT 10 START 20 TIMEOUT 500ms;"
+    )
+
+
+def test_select_escapes_fields():
+    """Test that field paths cannot inject SurrealQL."""
+    assert select("users", fields=["a; DELETE users"]) == (
+        "SELECT `a; DELETE users` from users;"
+    )
+
+
+@pytest.mark.parametrize(
+    "where, expected",
+    [
+        (None, ""),
+        ("age > 40", " WHERE age > 40"),
+        (
+            {"name": "x' OR true", "team": Reference("teams", 1)},
+            " WHERE name = 'x\\' OR true' AND team = teams:1",
+        ),
+    ],
+)
+def test_where_clause(where, expected):
+    """Test that conditions are passed through, and values are encoded."""
+    assert where_clause(where) == expected
+
+
+def test_order_clause():
+    """Test that a leading dash sorts in descending order."""
+    assert order_clause(["-age", "name"]) == " ORDER BY age DESC, name ASC"
+
+
+def test_select_rejects_non_integer_limits():
+    """Test that limits cannot inject SurrealQL."""
+    with pytest.raises(ValueError):
+        select("users", limit="1; DELETE users")
+
+
+def test_count():
+    """Test that rows are counted on the server."""
+    assert count("users", "age > 40") == (
+        "SELECT count() FROM users WHERE age > 40 GROUP ALL;"
+    )
+
+
+def test_exists():
+    """Test that only the id of the record is selected."""
+    assert (
+        exists("users:1", timeout=1) == "SELECT id FROM users:1 LIMIT 1 TIMEOUT 1000ms;"
+    )
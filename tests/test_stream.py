@@ -0,0 +1,79 @@
+"""Test the stream module."""
+from __future__ import annotations
+import json
+
+import pytest
+
+from surrealdb import QueryError
+from surrealdb.stream import RowParser
+
+
+RESPONSE = json.dumps(
+    [
+        {
+            "time": "1ms",
+            "status": "OK",
+            "result": [{"id": f"test:{i}", "name": "ü]}\""} for i in range(3)]
+            + [12, [3]],
+        },
+        {"time": "1ms", "status": "OK", "result": []},
+    ]
+).encode()
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64, len(RESPONSE)])
+def test_row_parser(size):
+    """Test rows are parsed the same whatever the chunk boundaries."""
+    parser = RowParser()
+    rows = []
+
+    for start in range(0, len(RESPONSE), size):
+        rows += parser.feed(RESPONSE[start : start + size])  # noqa: E203
+    rows += parser.close()
+
+    assert rows == json.loads(RESPONSE)[0]["result"]
+    assert parser.statement == {"time": "1ms", "status": "OK"}
+
+
+def test_row_parser_yields_rows_early():
+    """Test rows are returned as soon as they are complete."""
+    parser = RowParser()
+
+    assert parser.feed(b'[{"status": "OK", "result": [{"id": 1}, {"id"') == [
+        {"id": 1}
+    ]
+    assert parser.feed(b': 2}]}]') == [{"id": 2}]
+    assert parser.close() == []
+
+
+def test_row_parser_scalar_result():
+    """Test a result that is not an array is returned as a single row."""
+    parser = RowParser()
+
+    assert parser.feed(b'[{"status": "OK", "result": 42}]') == [42]
+
+
+def test_row_parser_raises_query_error():
+    """Test failed statements raise a QueryError."""
+    with pytest.raises(QueryError):
+        RowParser().feed(b'[{"status": "ERR", "detail": "Oops"}]')
+
+
+def test_row_parser_raises_error_result():
+    """Test the error message of a failed statement is raised, not returned."""
+    parser = RowParser()
+
+    with pytest.raises(QueryError) as error:
+        parser.feed(b'[{"status": "ERR", "result": "Table not found", ')
+
+    assert parser.statement == {"status": "ERR", "result": "Table not found"}
+    assert "Table not found" in str(error.value)
+
+
+def test_row_parser_raises_on_incomplete_response():
+    """Test a truncated response raises a QueryError."""
+    parser = RowParser()
+    parser.feed(b'[{"status": "OK", "result": [{"id": 1}')
+
+    with pytest.raises(QueryError):
+        parser.close()
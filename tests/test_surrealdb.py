@@ -1,10 +1,26 @@
 """Test the SurrealDB class."""
 from __future__ import annotations
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
+import httpx
 import pytest
 
-from surrealdb import AuthenticationError, QueryError, SurrealDB
+from surrealdb import (
+    AuthenticationError,
+    ChunkResult,
+    DeadlineExceeded,
+    HedgePolicy,
+    QueryError,
+    Reference,
+    SlowQueryLog,
+    SurrealDB,
+    cbor,
+    deadline,
+)
 
 
 MOCK_200 = mock.Mock(
@@ -25,6 +41,16 @@ MOCK_200 = mock.Mock(
 )
 
 
+def mock_token_response(expires_in: int = 3600) -> mock.Mock:
+    """Mock a successful signin response with a JWT."""
+    claims = json.dumps({"exp": int(time.time()) + expires_in}).encode()
+    token = f"e30.{base64.urlsafe_b64encode(claims).decode().rstrip('=')}.sig"
+    return mock.Mock(
+        status_code=200,
+        json=mock.Mock(return_value={"code": 200, "token": token}),
+    )
+
+
 def test_surrealdb_headers():
     """Test the headers of the SurrealDB class."""
     client = SurrealDB(
@@ -41,16 +67,79 @@ def test_surrealdb_headers():
     }
 
 
-def test_signin():
+@mock.patch("httpx.Client.post")
+def test_signin(mock_post):
     """Test the signin method of the SurrealDB class."""
+    mock_post.return_value = mock_token_response()
+
     with SurrealDB() as client:
         client.signin("admin", "admin")
 
+        mock_post.assert_called_once_with(
+            url="http://localhost:8000/signin",
+            json={"user": "admin", "pass": "admin"},
+            headers={"Accept": "application/json"},
+        )
+        assert client._client.auth is None
+        assert client._client.headers["Authorization"].startswith("Bearer ")
+
 
-def test_signup():
+@mock.patch("httpx.Client.post")
+def test_signup(mock_post):
     """Test the signup method of the SurrealDB class."""
+    mock_post.return_value = mock_token_response()
+
     with SurrealDB() as client:
-        client.signup("admin", "admin")
+        client.signup(
+            namespace="test",
+            database="test",
+            scope="user",
+            email="admin@example.com",
+            password="admin",
+        )
+
+        assert mock_post.call_args.kwargs["url"] == "http://localhost:8000/signup"
+        assert mock_post.call_args.kwargs["json"] == {
+            "ns": "test",
+            "db": "test",
+            "sc": "user",
+            "pass": "admin",
+            "email": "admin@example.com",
+        }
+
+
+@mock.patch("httpx.Client.post")
+def test_signin_raises_authentication_error(mock_post):
+    """Test the signin method of the SurrealDB class with bad credentials."""
+    mock_post.return_value = mock.Mock(
+        status_code=403,
+        json=mock.Mock(return_value={"code": 403, "details": "Denied"}),
+    )
+
+    with SurrealDB() as client:
+        with pytest.raises(AuthenticationError):
+            client.signin("admin", "wrong")
+
+
+@mock.patch("httpx.Client.post")
+def test_query_refreshes_expiring_token(mock_post):
+    """Test the query method signs in again before the token expires."""
+    mock_post.side_effect = [
+        mock_token_response(expires_in=10),
+        mock_token_response(),
+        MOCK_200,
+    ]
+
+    with SurrealDB() as client:
+        client.signin("admin", "admin")
+        client.query("SELECT * FROM test")
+
+    urls = [call.kwargs["url"] for call in mock_post.call_args_list]
+    assert urls == [
+        "http://localhost:8000/signin",
+        "http://localhost:8000/signin",
+        "http://localhost:8000/sql",
+    ]
 
 
 def test_use():
@@ -242,3 +331,611 @@ def test_delete(mock_post):
                 "name": "test",
             },
         ]
+
+
+@mock.patch("httpx.Client.post")
+def test_query_coalesces_concurrent_reads(mock_post):
+    """Test identical concurrent reads share a single request."""
+
+    def slow_post(**_):
+        time.sleep(0.2)
+        return MOCK_200
+
+    mock_post.side_effect = slow_post
+
+    with SurrealDB(namespace="test", database="test", coalesce=True) as client:
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(client.select, ["test"] * 5))
+
+    assert mock_post.call_count == 1
+    assert all(result == results[0] for result in results)
+
+
+@mock.patch("httpx.Client.post")
+def test_query_does_not_coalesce_writes(mock_post):
+    """Test writes are always sent, even with coalescing enabled."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB(namespace="test", database="test", coalesce=True) as client:
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda _: client.create("test", name="test"), range(3)))
+
+    assert mock_post.call_count == 3
+
+
+@mock.patch("httpx.Client.post")
+def test_select_sends_timeout(mock_post):
+    """Test the select method sends its timeout to httpx and the server."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        client.select("test", timeout=0.5)
+
+    assert mock_post.call_args.kwargs["content"] == "SELECT * from test TIMEOUT 500ms;"
+    assert mock_post.call_args.kwargs["timeout"] == 0.5
+
+
+@mock.patch("httpx.Client.post")
+def test_change_uses_deadline(mock_post):
+    """Test the change method sends the ambient deadline to the server."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        with deadline(1.0):
+            client.change("test:1", age=1)
+
+    assert " TIMEOUT " in mock_post.call_args.kwargs["content"]
+    assert mock_post.call_args.kwargs["timeout"] <= 1.0
+
+
+@mock.patch("httpx.Client.post")
+def test_query_raises_deadline_exceeded(mock_post):
+    """Test the query method maps httpx timeouts to DeadlineExceeded."""
+    mock_post.side_effect = httpx.ReadTimeout("timed out")
+
+    with SurrealDB() as client:
+        with pytest.raises(DeadlineExceeded):
+            client.query("SELECT * FROM test", timeout=0.1)
+
+
+@mock.patch("httpx.Client.post")
+def test_query_timeout_message(mock_post):
+    """Test the timed out error names the timeout only when one was set."""
+    mock_post.side_effect = httpx.ReadTimeout("timed out")
+
+    with SurrealDB() as client:
+        with pytest.raises(DeadlineExceeded, match="after 0.1s"):
+            client.query("SELECT * FROM test", timeout=0.1)
+        with pytest.raises(DeadlineExceeded, match="ReadTimeout") as error:
+            client.query("SELECT * FROM test")
+
+    assert "None" not in str(error.value)
+
+
+@mock.patch("httpx.Client.post")
+def test_create_encodes_values(mock_post):
+    """Test the create method encodes values as SurrealQL literals."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        client.create(
+            "note:1",
+            title="It's",
+            done=False,
+            category=Reference("category", "work"),
+            due=None,
+        )
+
+    assert mock_post.call_args.kwargs["content"] == (
+        "CREATE note:1 SET title = 'It\\'s', done = false, "
+        "category = category:work, due = NULL;"
+    )
+
+
+def test_stream():
+    """Test the stream method yields rows as the response is read."""
+    body = json.dumps(MOCK_200.json.return_value).encode()
+
+    def handler(request):
+        assert request.content == b"SELECT * FROM test"
+        return httpx.Response(200, content=iter([body[:20], body[20:]]))
+
+    with SurrealDB() as client:
+        client._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+        assert list(client.stream("SELECT * FROM test")) == [
+            {
+                "id": "1",
+                "name": "test",
+            },
+        ]
+
+
+def test_stream_raises_authentication_error():
+    """Test the stream method raises for rejected requests."""
+    transport = httpx.MockTransport(
+        lambda _: httpx.Response(403, json={"code": 403, "details": "Denied"})
+    )
+
+    with SurrealDB() as client:
+        client._client = httpx.Client(transport=transport)
+
+        with pytest.raises(AuthenticationError):
+            list(client.stream("SELECT * FROM test"))
+
+
+@mock.patch("httpx.Client.post")
+def test_batch(mock_post):
+    """Test the batch method returns the result of every statement."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(
+            return_value=[
+                {"status": "OK", "result": [{"id": "test:1"}]},
+                {"status": "OK", "result": [{"count": 1}]},
+            ],
+        ),
+    )
+
+    with SurrealDB() as client:
+        assert client.batch(
+            "SELECT * FROM test:1;",
+            "SELECT count() FROM test GROUP ALL",
+            transaction=True,
+        ) == [[{"id": "test:1"}], [{"count": 1}]]
+
+    assert mock_post.call_args.kwargs["content"] == (
+        "BEGIN TRANSACTION;SELECT * FROM test:1;"
+        "SELECT count() FROM test GROUP ALL;COMMIT TRANSACTION;"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_batch_raises_query_error(mock_post):
+    """Test the batch method raises if any statement fails."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(
+            return_value=[
+                {"status": "OK", "result": []},
+                {"status": "ERR", "detail": "Oops"},
+            ],
+        ),
+    )
+
+    with SurrealDB() as client:
+        with pytest.raises(QueryError):
+            client.batch("SELECT * FROM test", "SELECT * FROM nope")
+
+
+@mock.patch("httpx.Client.post")
+def test_query_records_slow_queries(mock_post):
+    """Test slow queries are logged, and explained off the request path."""
+    mock_post.return_value = MOCK_200
+    slow_log = SlowQueryLog(threshold=0, explain=True)
+
+    with SurrealDB(slow_log=slow_log) as client:
+        client.select("test")
+        slow_log.close()
+
+    (entry,) = slow_log
+    assert entry.fingerprint == "SELECT * from test;"
+    assert entry.plan == MOCK_200.json.return_value[0]["result"]
+    assert mock_post.call_args.kwargs["content"] == "SELECT * from test EXPLAIN;"
+
+
+@mock.patch("httpx.Client.post")
+def test_mirror(mock_post):
+    """Test the mirror method loads a table, then reads its change feed."""
+    mock_post.side_effect = [
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(
+                return_value=[
+                    {"status": "OK", "result": "2024-01-01T00:00:00Z"},
+                    MOCK_200.json.return_value[0],
+                ],
+            ),
+        ),
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(
+                return_value=[
+                    {
+                        "status": "OK",
+                        "result": [
+                            {"versionstamp": 1, "changes": [{"delete": {"id": "1"}}]}
+                        ],
+                    }
+                ],
+            ),
+        ),
+    ]
+
+    with SurrealDB() as client:
+        mirror = client.mirror("test")
+        mirror.load()
+        assert mirror.get("1") == {"id": "1", "name": "test"}
+
+        mirror.sync()
+        assert len(mirror) == 0
+
+    assert [call.kwargs["content"] for call in mock_post.call_args_list] == [
+        "RETURN time::now();SELECT * FROM test;",
+        "SHOW CHANGES FOR TABLE test SINCE <datetime> '2024-01-01T00:00:00Z'"
+        " LIMIT 1000;",
+    ]
+
+
+@mock.patch("httpx.Client.post")
+def test_select_projection(mock_post):
+    """Test the select method sends only the requested fields and rows."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        client.select("test", fields=["name"], where={"name": "test"}, limit=1)
+
+    assert mock_post.call_args.kwargs["content"] == (
+        "SELECT name from test WHERE name = 'test' LIMIT 1;"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_count(mock_post):
+    """Test the count method returns a number, 0 for an empty table."""
+    mock_post.side_effect = [
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(return_value=[{"status": "OK", "result": [{"count": 3}]}]),
+        ),
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(return_value=[{"status": "OK", "result": []}]),
+        ),
+    ]
+
+    with SurrealDB() as client:
+        assert client.count("test") == 3
+        assert client.count("test", where={"name": "none"}) == 0
+
+
+@mock.patch("httpx.Client.post")
+def test_exists(mock_post):
+    """Test the exists method returns a bool."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        assert client.exists("test:1") is True
+
+    assert mock_post.call_args.kwargs["content"] == "SELECT id FROM test:1 LIMIT 1;"
+
+
+@mock.patch("httpx.Client.post")
+def test_change_many(mock_post):
+    """Test the change_many method sends one request per chunk."""
+    mock_post.side_effect = [
+        MOCK_200,
+        mock.Mock(
+            status_code=200,
+            json=mock.Mock(return_value=[{"status": "ERR", "detail": "Oops"}]),
+        ),
+    ]
+
+    with SurrealDB() as client:
+        results = client.change_many(
+            ["test:1", "test:2", "test:3"], chunk_size=2, name="test"
+        )
+
+    assert [result.ids for result in results] == [["test:1", "test:2"], ["test:3"]]
+    assert results[0].ok
+    assert isinstance(results[1].error, QueryError)
+    assert mock_post.call_args_list[0].kwargs["content"] == (
+        "UPDATE [test:1, test:2] SET name = 'test' RETURN NONE;"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_merge_many(mock_post):
+    """Test the merge_many method merges each chunk in a transaction."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(return_value=[{"status": "OK", "result": []}] * 2),
+    )
+
+    with SurrealDB() as client:
+        (result,) = client.merge_many({"test:1": {"n": 1}, "test:2": {"n": 2}})
+
+    assert result.ok
+    assert mock_post.call_args.kwargs["content"] == (
+        "BEGIN TRANSACTION;UPDATE test:1 MERGE {n: 1} RETURN NONE;"
+        "UPDATE test:2 MERGE {n: 2} RETURN NONE;COMMIT TRANSACTION;"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_tenant(mock_post):
+    """Test tenant views send their own namespace and database."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB(namespace="test", database="test") as client:
+        with client.tenant("acme", "app") as acme:
+            acme.select("test")
+            assert mock_post.call_args.kwargs["headers"] == {"NS": "acme", "DB": "app"}
+
+        client.select("test")
+        assert mock_post.call_args.kwargs["headers"] == {"NS": "test", "DB": "test"}
+        assert acme._client is client._client
+        assert not client._client.is_closed
+
+
+@mock.patch("httpx.Client.post")
+def test_query_namespace_override(mock_post):
+    """Test the query method runs in another database for one call only."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB(namespace="test", database="test") as client:
+        client.query("SELECT * FROM test", database="other")
+
+        assert mock_post.call_args.kwargs["headers"] == {"NS": "test", "DB": "other"}
+        assert client.headers["DB"] == "test"
+
+
+@mock.patch("httpx.Client.post")
+def test_query_hedges_slow_reads(mock_post):
+    """Test a slow read is sent to another node, and the first answer wins."""
+
+    def post(url, **_):
+        time.sleep(0.2 if url == "http://a:8000/sql" else 0)
+        return MOCK_200
+
+    mock_post.side_effect = post
+    policy = HedgePolicy(delay=0.01)
+
+    with SurrealDB(
+        url=["http://a:8000/sql", "http://b:8000/sql"], hedge=policy
+    ) as client:
+        started = time.perf_counter()
+        assert client.select("test") == MOCK_200.json.return_value[0]["result"]
+        assert time.perf_counter() - started < 0.15
+
+        client.create("test", name="test")
+
+    urls = [call.kwargs["url"] for call in mock_post.call_args_list]
+    assert urls == ["http://a:8000/sql", "http://b:8000/sql", "http://a:8000/sql"]
+    assert policy.hedged == 1
+
+
+@mock.patch("httpx.Client.post")
+def test_query_does_not_hedge_concurrent_reads(mock_post):
+    """Test concurrent reads neither queue for a worker nor hedge spuriously."""
+
+    def post(url, **_):
+        time.sleep(0.1)
+        return MOCK_200
+
+    mock_post.side_effect = post
+    policy = HedgePolicy(delay=1.0)
+
+    with SurrealDB(
+        url=["http://a:8000/sql", "http://b:8000/sql"], hedge=policy
+    ) as client, ThreadPoolExecutor(64) as executor:
+        started = time.perf_counter()
+        list(executor.map(lambda _: client.select("test"), range(64)))
+
+        assert time.perf_counter() - started < 0.5
+
+    assert mock_post.call_count == 64
+    assert policy.hedged == 0
+
+
+@mock.patch("httpx.Client.post")
+def test_create_with_id_generator(mock_post):
+    """Test create gives a table target an id from the id generator."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB(id_generator=lambda: "a b") as client:
+        client.create("users", name="test")
+        client.create("users:1", name="test")
+
+    assert [call.kwargs["content"] for call in mock_post.call_args_list] == [
+        "CREATE users:⟨a b⟩ SET name = 'test';",
+        "CREATE users:1 SET name = 'test';",
+    ]
+
+
+@mock.patch("httpx.Client.post")
+def test_create_many(mock_post):
+    """Test create_many inserts every row in one request, returning references."""
+    mock_post.return_value = MOCK_200
+    generated = iter([1, 2])
+
+    with SurrealDB(id_generator=lambda: next(generated)) as client:
+        references = client.create_many(
+            "users", [{"name": "a"}, {"id": 7, "name": "b"}, {"name": "c"}]
+        )
+
+    assert references == [
+        Reference("users", 1),
+        Reference("users", 7),
+        Reference("users", 2),
+    ]
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs["content"] == (
+        "INSERT INTO users [{id: 1, name: 'a'}, {id: 7, name: 'b'}, "
+        "{id: 2, name: 'c'}];"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_sequence_reserves_blocks(mock_post):
+    """Test a sequence reserves a block of ids per request."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(return_value=[{"status": "OK", "result": [{"value": 2}]}]),
+    )
+
+    with SurrealDB() as client:
+        ids = client.sequence("users", block_size=2)
+        assert [ids(), ids()] == [1, 2]
+
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs["content"] == (
+        "UPDATE sequence:users SET value += 2 RETURN AFTER;"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_insert_vectors(mock_post):
+    """Test insert_vectors sends one statement per chunk, returning references."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        references = client.insert_vectors(
+            "docs", [[0.5, 1.0], [1.5, 2.0], [2.5, 3.0]], ["a", "b", "c"], chunk_size=2
+        )
+
+    assert references == [Reference("docs", k) for k in "abc"]
+    assert mock_post.call_count == 2
+    assert mock_post.call_args.kwargs["content"] == (
+        "INSERT INTO docs [{id: docs:c, embedding: [2.5,3.0]}];"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_knn(mock_post):
+    """Test knn searches every query vector in one request."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(
+            return_value=[
+                {"status": "OK", "result": None},
+                {"status": "OK", "result": [{"id": "docs:a", "distance": 0.25}]},
+                {"status": "OK", "result": None},
+                {"status": "OK", "result": [{"id": "docs:b", "distance": 0.5}]},
+            ]
+        ),
+    )
+
+    with SurrealDB() as client:
+        found = client.knn("docs", [[0.0, 1.0], [1.0, 0.0]], k=1)
+
+    assert mock_post.call_count == 1
+    assert [(n.ids, list(n.distances)) for n in found] == [
+        (["docs:a"], [0.25]),
+        (["docs:b"], [0.5]),
+    ]
+
+
+def rpc(request: httpx.Request) -> httpx.Response:
+    """Answer an RPC query with a record, in CBOR."""
+    assert request.url.path == "/rpc"
+    assert request.headers["Content-Type"] == "application/cbor"
+    assert cbor.loads(request.content)["params"] == ["SELECT * FROM users:1;"]
+
+    return httpx.Response(
+        200,
+        content=cbor.dumps(
+            {
+                "id": 1,
+                "result": [
+                    {
+                        "status": "OK",
+                        "result": [{"id": Reference("users", 1), "data": b"\x00"}],
+                    }
+                ],
+            }
+        ),
+        headers={"Content-Type": "application/cbor"},
+    )
+
+
+def test_query_cbor():
+    """Test the cbor protocol posts to /rpc and keeps the types of values."""
+    with SurrealDB(
+        url="http://localhost:8000/sql",
+        protocol="cbor",
+        transport=httpx.MockTransport(rpc),
+    ) as client:
+        assert client.query("SELECT * FROM users:1;") == [
+            {"id": Reference("users", 1), "data": b"\x00"}
+        ]
+        assert list(client.stream("SELECT * FROM users:1;")) == [
+            {"id": Reference("users", 1), "data": b"\x00"}
+        ]
+
+
+def test_query_cbor_error():
+    """Test an RPC error raises a query error."""
+    transport = httpx.MockTransport(
+        lambda _: httpx.Response(
+            200,
+            content=cbor.dumps({"id": 1, "error": {"message": "Parse error"}}),
+            headers={"Content-Type": "application/cbor"},
+        )
+    )
+
+    with SurrealDB(protocol="cbor", transport=transport) as client:
+        with pytest.raises(QueryError):
+            client.query("SELEC;")
+
+
+@mock.patch("httpx.Client.__init__", return_value=None)
+def test_unknown_protocol(mock_client):
+    """Test an unknown protocol raises, before an httpx client is opened."""
+    with pytest.raises(ValueError):
+        SurrealDB(protocol="xml")
+
+    mock_client.assert_not_called()
+
+
+@mock.patch("httpx.Client.post")
+def test_relate_many(mock_post):
+    """Test relate_many sends one transaction of RELATE statements per chunk."""
+    mock_post.return_value = MOCK_200
+
+    with SurrealDB() as client:
+        results = client.relate_many(
+            "knows",
+            [
+                ("users:1", Reference("users", 2), {"since": 2020}),
+                ("users:2", "users:3"),
+            ],
+        )
+
+    assert results == [
+        ChunkResult(["users:1->knows->users:2", "users:2->knows->users:3"])
+    ]
+    assert mock_post.call_args.kwargs["content"] == (
+        "BEGIN TRANSACTION;"
+        "RELATE users:1->knows->users:2 SET since = 2020 RETURN NONE;"
+        "RELATE users:2->knows->users:3 RETURN NONE;"
+        "COMMIT TRANSACTION;"
+    )
+
+
+@mock.patch("httpx.Client.post")
+def test_traverse(mock_post):
+    """Test traverse fetches every hop of every start record in one request."""
+    mock_post.return_value = mock.Mock(
+        status_code=200,
+        json=mock.Mock(
+            return_value=[
+                {
+                    "status": "OK",
+                    "result": [
+                        {"id": "users:1", "hop1": [{"id": "users:2"}]},
+                        {"id": "users:2", "hop1": []},
+                    ],
+                }
+            ]
+        ),
+    )
+
+    with SurrealDB() as client:
+        assert client.traverse(["users:1", "users:2"], "->knows->users") == {
+            "users:1": [[{"id": "users:2"}]],
+            "users:2": [[]],
+        }
+        assert client.traverse([], "->knows->users") == {}
+
+    assert mock_post.call_count == 1
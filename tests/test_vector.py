@@ -0,0 +1,98 @@
+"""Test the vector statements."""
+from __future__ import annotations
+from array import array
+
+import pytest
+
+from surrealdb import Reference
+from surrealdb.vector import (
+    Neighbours,
+    encode_vector,
+    insert,
+    knn,
+    neighbours,
+    operator,
+    references,
+)
+
+
+@pytest.mark.parametrize(
+    "vector, expected",
+    [
+        ([0.5, 1.0, -2], "[0.5,1.0,-2]"),
+        (array("d", [0.1, 1e20]), "[0.1,1e20]"),
+        (array("f", [0.1, 2.0]), "[0.100000001,2.0]"),
+        (memoryview(array("f", [1.0, 2.0, 3.0]))[::2], "[1.0,3.0]"),
+    ],
+)
+def test_encode_vector(vector, expected):
+    """Test vectors are encoded as compact arrays of numbers."""
+    assert encode_vector(vector) == expected
+
+
+@pytest.mark.parametrize(
+    "vector", [[float("nan")], memoryview(b"ab").cast("B", (1, 2))]
+)
+def test_encode_vector_rejects_invalid_vectors(vector):
+    """Test NaN values and multidimensional buffers cannot be encoded."""
+    with pytest.raises(ValueError):
+        encode_vector(vector)
+
+
+def test_operator():
+    """Test the operator searches an index, or every record with a metric."""
+    assert operator(5) == "<|5|>"
+    assert operator(5, ef=40) == "<|5,40|>"
+    assert operator(5, metric="COSINE") == "<|5,COSINE|>"
+    with pytest.raises(ValueError):
+        operator(5, ef=40, metric="COSINE")
+
+
+def test_insert_in_chunks():
+    """Test vectors are inserted by one statement per chunk."""
+    refs = [Reference("docs", 1), Reference("docs", 2), Reference("docs", 3)]
+
+    assert list(insert("docs", refs, [[1.0], [2.0], [3.0]], size=2)) == [
+        "INSERT INTO docs [{id: docs:1, embedding: [1.0]}, "
+        "{id: docs:2, embedding: [2.0]}];",
+        "INSERT INTO docs [{id: docs:3, embedding: [3.0]}];",
+    ]
+
+
+def test_insert_requires_one_id_per_vector():
+    """Test vectors and ids must match one to one."""
+    with pytest.raises(ValueError):
+        list(insert("docs", [Reference("docs", 1)], [[1.0], [2.0]]))
+
+
+def test_references():
+    """Test vectors are given their ids, or generated ones."""
+    assert references("docs", 2, ["a", Reference("x", 1)], None) == [
+        Reference("docs", "a"),
+        Reference("x", 1),
+    ]
+    assert references("docs", 2, None, lambda: 7) == [Reference("docs", 7)] * 2
+    with pytest.raises(ValueError):
+        references("docs", 2, None, None)
+
+
+def test_knn_binds_each_query_vector():
+    """Test each query vector is bound with LET, and searched for."""
+    assert knn("docs", [[1.0], [2.0]], k=3, where={"lang": "en"}) == [
+        "LET $q0 = [1.0]",
+        "SELECT id, vector::distance::knn() AS distance FROM docs"
+        " WHERE embedding <|3|> $q0 AND (lang = 'en') ORDER BY distance",
+        "LET $q1 = [2.0]",
+        "SELECT id, vector::distance::knn() AS distance FROM docs"
+        " WHERE embedding <|3|> $q1 AND (lang = 'en') ORDER BY distance",
+    ]
+
+
+def test_neighbours():
+    """Test the search results are read as ids and distances."""
+    results = [None, [{"id": "docs:1", "distance": 0.5}], None, []]
+
+    assert neighbours(results) == [
+        Neighbours(["docs:1"], array("d", [0.5])),
+        Neighbours([], array("d")),
+    ]